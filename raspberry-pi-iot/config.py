@@ -1,3 +1,5 @@
+import os
+
 class GPIOConfig:
     LED_RED_PIN = 18
     LED_GREEN_PIN = 19
@@ -11,6 +13,10 @@ class GPIOConfig:
 class I2CConfig:
     BUS_NUMBER = 1
     MPU9250_ADDRESS = 0x68
+    # Per-device exponential backoff after a NACK/timeout, and bus reopen
+    BACKOFF_BASE = 0.01
+    BACKOFF_MAX = 2.0
+    RESET_AFTER_ERRORS = 3
 
 class CameraConfig:
     CSI_CAMERA_INDEX = 0
@@ -34,3 +40,155 @@ class WebSocketConfig:
     PING_INTERVAL = 30
     PING_TIMEOUT = 10
     MAX_MESSAGE_SIZE = 1024 * 1024
+    PUSH_PORT = 8081
+    CLIENT_QUEUE_SIZE = 64
+    DEFAULT_IMU_RATE = 10
+    MAX_IMU_RATE = 200
+
+class CSIPipeConfig:
+    COMMAND = "rpicam-vid"
+    PROFILES = [
+        {"width": 320, "height": 240, "quality": 70, "framerate": 15},
+        {"width": 240, "height": 180, "quality": 50, "framerate": 15},
+        {"width": 160, "height": 120, "quality": 40, "framerate": 10},
+    ]
+    READ_CHUNK_SIZE = 64 * 1024
+    MAX_FRAME_BYTES = 1024 * 1024
+    RESTART_DELAY = 0.5
+    MAX_RESTART_DELAY = 5.0
+    FAILED_STARTS_BEFORE_FALLBACK = 3
+
+class USBCaptureConfig:
+    WIDTH = 320
+    HEIGHT = 240
+    FPS = 30
+    FOURCC = "YUYV"
+    BUFFER_SIZE = 1
+    GRAB_SKIP = 1
+    JPEG_QUALITY = 65
+    EXPOSURE = -6
+    DETECTION_INTERVAL = 10
+    MAX_CONSECUTIVE_ERRORS = 30
+    REOPEN_DELAY = 1.0
+
+class FrameRingConfig:
+    CAPACITY = 16
+    JPEG_QUALITY = 65
+
+class IMUFifoConfig:
+    SAMPLE_RATE = 500
+    READ_INTERVAL = 0.02
+    DLPF_CFG = 1
+
+class IMUHistoryConfig:
+    DURATION = 300
+    MAX_RESPONSE_SAMPLES = 20000
+    # Seconds the FIFO sample clock may drift from the wall clock before it is re-anchored
+    MAX_CLOCK_DRIFT = 0.5
+
+class FallDetectorConfig:
+    FREE_FALL_THRESHOLD = 0.5
+    FREE_FALL_MIN_DURATION = 0.06
+    IMPACT_THRESHOLD = 2.5
+    IMPACT_WINDOW = 0.5
+    STILLNESS_DELAY = 0.5
+    STILLNESS_DURATION = 1.0
+    STILLNESS_TOLERANCE = 0.3
+    MIN_CONFIDENCE = 0.6
+
+class OrientationConfig:
+    BETA = 0.1
+
+class MagnetometerConfig:
+    # AK8963 continuous measurement rate (8 or 100 Hz)
+    RATE_HZ = 100
+    CALIBRATION_FILE = os.environ.get("GUARDIT_MAG_CALIBRATION", "mag_calibration.json")
+    CALIBRATION_SECONDS = 30
+    # Spread (uT) each axis must cover before a calibration is accepted
+    MIN_CALIBRATION_SPAN = 20.0
+    # Local magnetic declination added to the heading, degrees east
+    DECLINATION = 0.0
+
+class HardwareConfig:
+    # "pi" drives the real peripherals, "sim" the simulated backend in src/sim
+    BACKEND = os.environ.get("GUARDIT_HARDWARE", "pi")
+    SIM_IMU_SOURCE = os.environ.get("GUARDIT_SIM_IMU", "idle")
+    SIM_IMU_ADDRESS = 0x68
+    SIM_IMU_WHO_AM_I = 0x71
+    SIM_CAMERA_SOURCE = os.environ.get("GUARDIT_SIM_CAMERA", "pattern")
+    SIM_CAMERA_DEVICES = (0, 1)
+    SIM_CAMERA_FPS = 30
+    SIM_SEED = 0
+
+class RecorderConfig:
+    DIRECTORY = os.environ.get("GUARDIT_RECORDINGS", "recordings")
+    MAX_FILE_BYTES = 32 * 1024 * 1024
+    MAX_FILE_SECONDS = 3600
+    MAX_FILES = 12
+    INDEX_INTERVAL = 1.0
+    FLUSH_INTERVAL = 1.0
+
+class MotionGateConfig:
+    # Frames are compared at this width against a running-average background
+    WIDTH = 160
+    PIXEL_THRESHOLD = 25
+    MIN_CHANGED_RATIO = 0.002
+    BACKGROUND_ALPHA = 0.05
+    # Keep detecting this long after motion stops, and re-check static scenes periodically
+    HOLD_SECONDS = 1.5
+    FORCE_INTERVAL = 5.0
+
+class ROIDetectionConfig:
+    # Motion regions grow by this fraction of their size (and at least MARGIN px)
+    # before cropping, so a whole body fits around the part that moved
+    EXPAND_RATIO = 0.5
+    MARGIN = 16
+    # Fall back to a full-frame pass above this crop coverage, and force one every N passes
+    MAX_AREA_RATIO = 0.6
+    FULL_FRAME_EVERY = 10
+
+class DetectionPoolConfig:
+    # Person detector worker processes; 0 runs detection on a thread in the server
+    WORKERS = int(os.environ.get("GUARDIT_DETECTION_WORKERS", "2"))
+    # Largest frame one shared-memory slot holds
+    MAX_FRAME_BYTES = 1280 * 720 * 3
+    RESTART_DELAY = 1.0
+    POLL_INTERVAL = 0.5
+    # A worker still on one frame after this many seconds is hung and gets replaced
+    # (generous: the first frame after a model switch includes loading the model)
+    TASK_TIMEOUT = 10.0
+
+class DNNDetectorConfig:
+    # Model files are looked up here; a model whose files are missing is simply not offered
+    MODEL_DIR = os.environ.get("GUARDIT_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+    CONFIDENCE = 0.5
+    NMS_THRESHOLD = 0.45
+    # Most frames per forward pass in offline detect_batch runs; live detection is one frame per pass
+    BATCH_SIZE = int(os.environ.get("GUARDIT_DNN_BATCH", "1"))
+    MODELS = {
+        # Caffe MobileNet-SSD (VOC classes, person = 15)
+        "mobilenet": {"model": "MobileNetSSD_deploy.caffemodel", "config": "MobileNetSSD_deploy.prototxt",
+                      "size": (300, 300), "scale": 0.007843, "mean": 127.5, "swap_rb": False,
+                      "person_class": 15, "output": "ssd"},
+        # YOLOv8n exported to ONNX (COCO classes, person = 0)
+        "yolov8n": {"model": "yolov8n.onnx", "size": (320, 320), "scale": 1 / 255.0, "mean": 0.0,
+                    "swap_rb": True, "person_class": 0, "output": "yolo"},
+    }
+
+class TrackerConfig:
+    # Minimum overlap between a track's predicted box and a detection to match them
+    IOU_THRESHOLD = 0.3
+    # Detections before a track is reported; a track is dropped after MAX_AGE
+    # seconds unseen or MAX_MISSES detector passes in a row without a match
+    MIN_HITS = 2
+    MAX_AGE = 1.5
+    MAX_MISSES = 3
+    # Kalman noise as a fraction of box height (velocity terms per second)
+    MEASUREMENT_NOISE = 0.05
+    POSITION_NOISE = 0.05
+    VELOCITY_NOISE = 0.5
+    INITIAL_VELOCITY_NOISE = 2.0
+
+class DetectionStreamConfig:
+    # Detection results kept for GET /detection/results?since=<seq>
+    HISTORY = 64
@@ -1,5 +1,4 @@
 import RPi.GPIO as GPIO
-import smbus2
 import time
 import math
 import asyncio
@@ -9,6 +8,8 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Tuple
 import threading
 
+from src.i2c_bus import get_bus
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -83,7 +84,7 @@ class GuardItHardware:
     def init_i2c(self):
         
         try:
-            self.bus = smbus2.SMBus(HardwareConfig.I2C_BUS)
+            self.bus = get_bus(HardwareConfig.I2C_BUS)
             logger.info("✅ I2C bus initialized")
         except Exception as e:
             logger.error(f"❌ I2C initialization failed: {e}")
@@ -1,9 +1,10 @@
-import smbus2
 import time
 
+from src.i2c_bus import get_bus
+
 def identify_imu_sensor():
 
-    bus = smbus2.SMBus(1)
+    bus = get_bus(1)
     
     try:
         who_am_i = bus.read_byte_data(0x68, 0x75)
@@ -1,13 +1,12 @@
-import smbus2
 import time
 import json
 import math
 import threading
 import logging
+from collections import deque
 from dataclasses import dataclass, asdict
 from typing import Optional
 from flask import Flask, jsonify, request, Response
-import RPi.GPIO as GPIO
 
 import cv2
 import numpy as np
@@ -18,6 +17,23 @@ from PIL import Image
 import os
 
 from object_detector import GuardItPersonDetector
+from src.hardware import GPIO, open_video_capture, list_csi_cameras
+from src.i2c_bus import get_bus, I2CBackoffError
+from src.mjpeg_pipe import RpicamMJPEGPipe
+from src.capture_engine import CaptureEngine
+from src.frame_ring import FrameRing
+from src.mjpeg_stream import MJPEGBroadcaster
+from src.push_channel import PushChannel
+from src.imu_fifo import MPUFifoReader, FIFO_RECORD_BYTES
+from src.imu_history import IMUHistory, HISTORY_FIELDS
+from src.fall_detector import FallDetector
+from src.orientation import MadgwickFilter
+from src.imu_recorder import IMURecorder
+from src.scheduler import DeadlineScheduler
+from src.detection_pool import DetectionPool
+from src.frame_mailbox import LatestMailbox
+from src.imu_decoder import IMUDecoder, ACCEL_SENSITIVITY, GYRO_SENSITIVITY, full_scale_bits
+from config import USBCaptureConfig, IMUFifoConfig, IMUHistoryConfig, DetectionPoolConfig, DetectionStreamConfig
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,6 +41,7 @@ logger = logging.getLogger(__name__)
 WIFI_SSID = "Avnit"
 WIFI_PASSWORD = "hihihihi"
 SERVER_PORT = 8080
+PUSH_SERVER_PORT = 8081
 
 import socket
 import subprocess
@@ -32,6 +49,11 @@ import subprocess
 MPU6050_ADDR = 0x68
 MPU6050_ACCEL_XOUT_H = 0x3B
 MPU6050_PWR_MGMT_1 = 0x6B
+MPU6050_GYRO_CONFIG = 0x1B
+MPU6050_ACCEL_CONFIG = 0x1C
+# ±8 g leaves headroom for fall impacts, which saturate the ±2 g power-on range
+IMU_ACCEL_RANGE = 8
+IMU_GYRO_RANGE = 250
 
 BUZZER_PIN = 21
 BUZZER_FREQUENCY = 1000
@@ -41,11 +63,20 @@ LED_RED_PIN = 18
 LED_GREEN_PIN = 19
 LED_BLUE_PIN = 20
 
-FALL_THRESHOLD = 60.0
 MOVEMENT_THRESHOLD = 20.0
 DATA_INTERVAL = 100
+IMU_USE_FIFO = True
+IMU_RECORDING = True
+FIFO_READ_INTERVAL = IMUFifoConfig.READ_INTERVAL * 1000
+LED_REFRESH_INTERVAL = 50
+STATUS_LOG_INTERVAL = 1000
+HARDWARE_TIMEOUT = 2000
 NOTIFICATION_COOLDOWN = 2000
 
+FRAME_EXPOSE_HEADERS = ('ETag, X-Camera, X-Frame-Seq, X-Frame-Timestamp, X-Detection-Enabled, X-Person-Detected, '
+                        'X-Annotated, X-IMU-Fields, X-IMU-Count, X-IMU-Next-Since, X-IMU-Sample-Rate')
+MAX_FRAME_WAIT = 10.0
+
 NOTIFICATION_TYPES = {
     'fall': 'fall',
     'movement': 'movement',
@@ -266,16 +297,11 @@ class CameraManager:
         self.csi_available = False
         self.usb_available = False
         self.usb_device_id = None
-        self.streaming = False
-        self.usb_cap = None
-        self.latest_frame = None
-        self.frame_lock = threading.Lock()
-        self.capture_thread = None
-        self.capture_running = False
+        self.usb_engine = None
         self.csi_streaming = False
-        self.latest_csi_frame = None
-        self.csi_frame_lock = threading.Lock()
-        self.csi_capture_thread = None
+        self.csi_ring = FrameRing()
+        self.broadcasters = {}
+        self.csi_pipe = None
         self.csi_capture_running = False
         
         self.detector = None
@@ -286,8 +312,16 @@ class CameraManager:
         # Async detection thread for non-blocking processing
         self.detection_thread = None
         self.detection_running = False
-        self.detection_frame_queue = None
-        self.detection_queue_lock = threading.Lock()
+        # Newest USB snapshot waiting for the detector; frames it replaces count as drops
+        self.detection_mailbox = LatestMailbox()
+        self.stale_detection_frames = 0
+        self.detection_pool = None
+        self.last_detection_result = None
+        
+        # Per-pass results (boxes, tracks, proximity) keyed by frame seq, for client-side overlays
+        self.detection_results = deque(maxlen=DetectionStreamConfig.HISTORY)
+        self.detection_results_cond = threading.Condition()
+        self.detection_result_callback = None
         
         self._detect_cameras()
         self._initialize_detector()
@@ -309,6 +343,15 @@ class CameraManager:
             self.detector = GuardItPersonDetector()
             logger.info("✅ Object detection initialized")
             
+            # Heavy detector passes run in worker processes so they get their own cores
+            if DetectionPoolConfig.WORKERS > 0:
+                try:
+                    self.detection_pool = DetectionPool(self._on_detection_result)
+                    self.detection_pool.start()
+                except Exception as e:
+                    logger.warning(f"⚠️ Detection pool unavailable, detecting in-process: {e}")
+                    self.detection_pool = None
+            
             # Start async detection thread for non-blocking processing
             self.detection_running = True
             self.detection_thread = threading.Thread(target=self._async_detection_loop, daemon=True)
@@ -327,62 +370,129 @@ class CameraManager:
         last_fps_log = time.time()
         
         while self.detection_running:
+            # Sleeps until a frame is posted, so detection latency is just the detector's run time
+            snapshot = self.detection_mailbox.take()
+            if snapshot is None or not (self.detection_enabled and self.detector):
+                continue
+            
             try:
-                # Only process if detection is enabled and we have a frame to analyze
-                if (self.detection_enabled and self.detector and 
-                    hasattr(self, 'detection_frame_queue') and self.detection_frame_queue is not None):
-                    
-                    with self.detection_queue_lock:
-                        frame_to_process = self.detection_frame_queue
-                        self.detection_frame_queue = None  # Clear queue
-                    
-                    if frame_to_process is not None:
-                        try:
-                            # Process detection on separate thread - non-blocking
-                            detection_triggered, processed_frame = self.detector.process_detection(frame_to_process)
-                            
-                            if detection_triggered and self.detection_callback:
-                                # Determine alert type based on detection context
-                                current_time = time.time() * 1000
-                                if hasattr(self.detector, 'last_proximity_alert_time') and \
-                                   (current_time - self.detector.last_proximity_alert_time) < 1000:
-                                    self.detection_callback("proximity_alert")
-                                else:
-                                    self.detection_callback("suspicious_activity")
-                            
-                            detection_count += 1
-                            
-                            # Log detection performance every 10 seconds
-                            current_time = time.time()
-                            if current_time - last_fps_log >= 10.0:
-                                elapsed = current_time - last_fps_log
-                                detection_fps = detection_count / elapsed if elapsed > 0 else 0
-                                logger.info(f"🔍 Detection FPS: {detection_fps:.1f} | Total detections: {detection_count}")
-                                last_fps_log = current_time
-                                detection_count = 0
-                                
-                        except Exception as e:
-                            logger.debug(f"Async detection processing error: {e}")
+                if self.detection_pool:
+                    # Gate here, detect in a worker; the result arrives in _on_detection_result.
+                    # The ring slot is checked after the copy, so a torn frame is never detected
+                    if self.detector.should_detect(snapshot.frame):
+                        self.detection_pool.submit(snapshot.frame, snapshot.seq, snapshot.timestamp,
+                                                   self.detector.current_model,
+                                                   self.detector.detection_regions(),
+                                                   still_valid=lambda: self._check_detection_frame(snapshot))
+                else:
+                    self._detect_inline(snapshot)
                 
-                # Sleep to prevent CPU overload - detection doesn't need to be super frequent
-                time.sleep(0.1)  # Process detection max 10 times per second
+                detection_count += 1
+                
+                # Log detection performance every 10 seconds
+                current_time = time.time()
+                if current_time - last_fps_log >= 10.0:
+                    elapsed = current_time - last_fps_log
+                    detection_fps = detection_count / elapsed if elapsed > 0 else 0
+                    logger.info(f"🔍 Detection FPS: {detection_fps:.1f} | Total detections: {detection_count}")
+                    last_fps_log = current_time
+                    detection_count = 0
                     
             except Exception as e:
-                logger.debug(f"Async detection loop error: {e}")
-                time.sleep(0.1)
+                logger.debug(f"Async detection processing error: {e}")
         
         logger.info("🔄 Async detection loop stopped")
     
-    def _queue_frame_for_detection(self, frame):
-        """Queue a frame for async detection processing (non-blocking)"""
+    def _check_detection_frame(self, snapshot):
+        """False if the ring overwrote ``snapshot`` while it was being read"""
+        if self.usb_engine and not self.usb_engine.ring.is_current(snapshot):
+            self.stale_detection_frames += 1
+            return False
+        return True
+    
+    def _detect_inline(self, snapshot):
+        """Detect on this thread straight from the ring slot, without copying the frame"""
+        if not self.detector.should_detect(snapshot.frame):
+            return
+        
+        started = time.perf_counter()
+        detected, boxes, confidence = self.detector.detect_person(snapshot.frame,
+                                                                  self.detector.detection_regions())
+        detect_ms = (time.perf_counter() - started) * 1000
+        # A slot overwritten mid-pass may have produced boxes from two frames
+        if not self._check_detection_frame(snapshot):
+            return
+        
+        alert_triggered, proximity_alert = self.detector.evaluate_detection(
+            snapshot.frame.shape, detected, boxes, confidence, frame_time=snapshot.timestamp)
+        self._record_detection(snapshot.seq, snapshot.timestamp, self.detector.current_model, detected,
+                               boxes, confidence, detect_ms, alert_triggered, proximity_alert)
+        if alert_triggered or proximity_alert:
+            self._dispatch_detection_alert(proximity_alert)
+    
+    def _on_detection_result(self, result):
+        """Detection pool callback - applies a worker's result to the shared alert state"""
+        if not self.detector or not self.detection_enabled:
+            return
+        
+        self.detector.record_latency(result.model, result.detect_ms)
+        alert_triggered, proximity_alert = self.detector.evaluate_detection(
+            result.shape, result.detected, result.boxes, result.confidence, frame_time=result.timestamp)
+        self.last_detection_result = result
+        self._record_detection(result.seq, result.timestamp, result.model, result.detected,
+                               result.boxes, result.confidence, result.detect_ms,
+                               alert_triggered, proximity_alert)
+        if alert_triggered or proximity_alert:
+            self._dispatch_detection_alert(proximity_alert)
+    
+    def _record_detection(self, seq, timestamp, model, detected, boxes, confidence, detect_ms,
+                          alert_triggered, proximity_alert):
+        """Store one pass's overlay metadata and hand it to the result listener"""
+        alert = None
+        if proximity_alert:
+            alert = "proximity_alert"
+        elif alert_triggered:
+            alert = "suspicious_activity"
+        
+        entry = {
+            'seq': seq,
+            'timestamp': int(timestamp * 1000),
+            'model': model,
+            'detected': bool(detected),
+            'confidence': round(float(confidence), 3),
+            'detect_ms': round(detect_ms, 1),
+            'boxes': [[int(v) for v in box] for box in boxes],
+            'tracks': self.detector.get_tracks(timestamp),
+            'alert': alert
+        }
+        with self.detection_results_cond:
+            self.detection_results.append(entry)
+            self.detection_results_cond.notify_all()
+        
+        if self.detection_result_callback:
+            self.detection_result_callback(entry)
+    
+    def get_detection_results(self, since=0, wait=0.0):
+        """Results for frames after ``since``, long-polling up to ``wait`` seconds for one"""
+        def newer():
+            return [entry for entry in self.detection_results if entry['seq'] > since]
+        
+        with self.detection_results_cond:
+            results = newer()
+            if not results and wait > 0:
+                self.detection_results_cond.wait_for(newer, timeout=wait)
+                results = newer()
+        return results
+    
+    def _dispatch_detection_alert(self, proximity_alert):
+        
+        if self.detection_callback:
+            self.detection_callback("proximity_alert" if proximity_alert else "suspicious_activity")
+    
+    def _queue_frame_for_detection(self, snapshot):
+        """Hand a USB snapshot to the detection thread (non-blocking, no copy)"""
         if self.detection_enabled and self.detector:
-            try:
-                # Only queue if previous frame has been processed (prevent backlog)
-                with self.detection_queue_lock:
-                    if self.detection_frame_queue is None:  # Only if queue is empty
-                        self.detection_frame_queue = frame.copy()  # Copy frame for safety
-            except Exception as e:
-                logger.debug(f"Frame queuing error: {e}")
+            self.detection_mailbox.put(snapshot)
     
     def _detect_cameras(self):
         
@@ -392,11 +502,7 @@ class CameraManager:
         logger.info("🔍 Testing CSI camera with libcamera...")
         try:
             # Use rpicam-still to check if CSI camera is available
-            result = subprocess.run(
-                ['rpicam-still', '--list-cameras'], 
-                capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and 'imx219' in result.stdout.lower():
+            if 'imx219' in list_csi_cameras(timeout=5).lower():
                 self.csi_available = True
                 logger.info("✅ CSI Camera (IMX219) detected via libcamera")
             else:
@@ -408,7 +514,7 @@ class CameraManager:
         logger.info("🔍 Testing USB camera with OpenCV...")
         for device_id in [0, 1, 2, 3, 4]:  # Test all possible devices
             try:
-                cap = cv2.VideoCapture(device_id, cv2.CAP_V4L2)
+                cap = open_video_capture(device_id, cv2.CAP_V4L2)
                 if cap.isOpened():
                     # Set test resolution and try to get a frame
                     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
@@ -431,256 +537,94 @@ class CameraManager:
         
         logger.info(f"📹 Camera Status - CSI: {self.csi_available}, USB: {self.usb_available}")
 
-    def _background_capture(self):
-        
-        while self.capture_running and self.usb_cap:
-            try:
-                for _ in range(2):
-                    self.usb_cap.grab()
-                ret, frame = self.usb_cap.retrieve()
-                
-                if ret and frame is not None:
-                    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 15])
-                    
-                    with self.frame_lock:
-                        self.latest_frame = buffer.tobytes()
-                
-                time.sleep(0.02)
-            except Exception as e:
-                time.sleep(0.1)
+    def _on_csi_frame(self, jpeg_data):
+        """Publish a JPEG frame parsed from the CSI MJPEG pipe"""
+        self.csi_ring.publish(jpeg=jpeg_data)
+    
+    def get_frame_ring(self, camera):
+        """Frame ring shared by streaming, detection and snapshot consumers"""
+        if camera == 'csi':
+            return self.csi_ring
+        if camera == 'usb' and self.usb_engine:
+            return self.usb_engine.ring
+        return None
     
-    def _background_usb_capture(self):
-
-        cap = cv2.VideoCapture(self.usb_device_id, cv2.CAP_V4L2)
-        try:
-            # Ultra-optimized settings for minimum latency
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)  # Slightly larger for better quality
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Single frame buffer
-            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M','J','P','G'))
-            cap.set(cv2.CAP_PROP_FPS, 30)  # Optimized FPS
-            cap.set(cv2.CAP_PROP_EXPOSURE, -7)  # Very fast exposure
-            cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)  # Auto exposure off
-            cap.set(cv2.CAP_PROP_AUTOFOCUS, 0)  # Auto focus off
-            
-            frame_count = 0
-            detection_interval = 5  # Run detection more frequently for proximity alerts
-            
-            while self.capture_running and cap.isOpened():
-                try:
-                    # Aggressive frame skipping for real-time performance
-                    for _ in range(3):
-                        cap.grab()  # Skip buffered frames
-                    ret, frame = cap.retrieve()
-                    
-                    if ret and frame is not None:
-                        detection_triggered = False
-                        processed_frame = frame
-                        
-                        if (self.detection_enabled and self.detector and 
-                            frame_count % detection_interval == 0):
-                            try:
-                                detection_triggered, processed_frame = self.detector.process_detection(frame)
-                                
-                                if detection_triggered and self.detection_callback:
-                                    # Determine alert type based on detection context
-                                    # Check if it's a proximity alert or general suspicious activity
-                                    current_time = time.time() * 1000
-                                    if hasattr(self.detector, 'last_proximity_alert_time') and \
-                                       (current_time - self.detector.last_proximity_alert_time) < 1000:
-                                        self.detection_callback("proximity_alert")
-                                    else:
-                                        self.detection_callback("suspicious_activity")
-                            
-                            except Exception as e:
-                                logger.debug(f"Detection processing error: {e}")
-                        
-                        frame_to_encode = processed_frame if self.detection_enabled else frame
-                        
-                        # Ultra-fast JPEG encoding
-                        encode_params = [cv2.IMWRITE_JPEG_QUALITY, 70, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
-                        _, buffer = cv2.imencode('.jpg', frame_to_encode, encode_params)
-                        
-                        with self.frame_lock:
-                            self.latest_frame = buffer.tobytes()
-                        
-                        frame_count += 1
-                    
-                    # No sleep for maximum speed
-                except Exception as e:
-                    time.sleep(0.005)  # Minimal sleep on error
+    def get_broadcaster(self, camera):
+        """Shared MJPEG broadcaster for a camera, starting its capture on demand"""
+        if camera == 'usb':
+            started = self.start_streaming()
+        elif camera == 'csi':
+            started = self.start_csi_streaming()
+        else:
+            return None
         
-        except Exception as e:
-            logger.error(f"USB capture setup error: {e}")
-        finally:
-            if cap.isOpened():
-                cap.release()
-
-    def _background_csi_capture(self):
-        """HYBRID CSI capture - Use rpicam-jpeg for better reliability and speed"""
-        frame_count = 0
-        consecutive_errors = 0
-        max_consecutive_errors = 3
+        ring = self.get_frame_ring(camera)
+        if not started or ring is None:
+            return None
         
-        try:
-            logger.info("🔧 HYBRID CSI capture started - testing reliable approaches")
-            
-            start_time = time.time()
-            last_performance_log = start_time
-            
-            # First, test if basic capture works
-            try:
-                test_result = subprocess.run([
-                    'rpicam-still', '--list-cameras'
-                ], capture_output=True, text=True, timeout=3)
-                
-                if test_result.returncode != 0:
-                    logger.error("❌ CSI camera not available")
-                    return
-                    
-                logger.info("✅ CSI camera confirmed available")
-            except Exception as e:
-                logger.error(f"❌ CSI camera test failed: {e}")
-                return
-            
-            # Try multiple command approaches for reliability
-            command_variants = [
-                # Approach 1: Standard rpicam-still
-                [
-                    'rpicam-still',
-                    '--immediate',
-                    '--nopreview', 
-                    '--width', '320',
-                    '--height', '240',
-                    '--quality', '70',
-                    '--timeout', '200',
-                    '--output', '-'
-                ],
-                # Approach 2: Faster, lower quality  
-                [
-                    'rpicam-still',
-                    '--immediate',
-                    '--nopreview',
-                    '--width', '240',
-                    '--height', '180', 
-                    '--quality', '50',
-                    '--timeout', '100',
-                    '--output', '-'
-                ],
-                # Approach 3: Even simpler
-                [
-                    'rpicam-still',
-                    '--nopreview',
-                    '--width', '160',
-                    '--height', '120',
-                    '--quality', '40',
-                    '--timeout', '50',
-                    '--output', '-'
-                ]
-            ]
-            
-            current_cmd_index = 0
-            cmd = command_variants[current_cmd_index]
-            
-            while self.csi_capture_running:
-                try:
-                    current_time = time.time()
-                    
-                    # Try capture with current command
-                    result = subprocess.run(cmd, capture_output=True, timeout=1.0)
-                    
-                    if result.returncode == 0 and result.stdout:
-                        consecutive_errors = 0
-                        jpeg_data = result.stdout
-                        
-                        # LOCKLESS update for speed
-                        self.latest_csi_frame = jpeg_data
-                        frame_count += 1
-                        
-                    else:
-                        consecutive_errors += 1
-                        
-                        # If current approach fails too much, try next variant
-                        if consecutive_errors > max_consecutive_errors:
-                            current_cmd_index = (current_cmd_index + 1) % len(command_variants)
-                            cmd = command_variants[current_cmd_index]
-                            logger.warning(f"🔄 Switching to CSI command variant {current_cmd_index + 1}")
-                            consecutive_errors = 0
-                            time.sleep(0.5)
-                    
-                    # Performance logging every 5 seconds
-                    if current_time - last_performance_log >= 5.0:
-                        elapsed = current_time - start_time
-                        fps = frame_count / elapsed if elapsed > 0 else 0
-                        logger.info(f"🔧 HYBRID CSI FPS: {fps:.1f} | Variant: {current_cmd_index + 1} | Frames: {frame_count}")
-                        last_performance_log = current_time
-                
-                    # Adaptive sleep based on performance
-                    if fps > 5:
-                        time.sleep(0.1)   # Fast mode - 10 FPS max
-                    elif fps > 2:
-                        time.sleep(0.2)   # Medium mode - 5 FPS max  
-                    else:
-                        time.sleep(0.5)   # Slow mode - 2 FPS max
-                    
-                except subprocess.TimeoutExpired:
-                    consecutive_errors += 1
-                    logger.debug("CSI capture timeout")
-                    
-                except Exception as loop_error:
-                    consecutive_errors += 1
-                    logger.debug(f"CSI capture error: {loop_error}")
-                    
-                    if consecutive_errors > max_consecutive_errors * 2:
-                        logger.error("❌ Too many CSI errors - pausing")
-                        time.sleep(2)
-                        consecutive_errors = 0
-                    
-        except Exception as e:
-            logger.error(f"🔧 HYBRID CSI initialization error: {e}")
-        finally:
-            self.csi_capture_running = False
-            logger.info(f"🔧 HYBRID CSI capture stopped after {frame_count} frames")
+        broadcaster = self.broadcasters.get(camera)
+        if broadcaster is None or broadcaster.ring is not ring:
+            broadcaster = MJPEGBroadcaster(ring)
+            self.broadcasters[camera] = broadcaster
+        return broadcaster
     
-    def start_streaming(self):
+    def is_camera_streaming(self, camera):
         
+        return self.streaming if camera == 'usb' else self.csi_streaming
+    
+    def start_streaming(self):
+        """Start the shared USB capture engine"""
         if self.streaming:
             return True
-            
-        self.capture_running = True
-        self.capture_thread = threading.Thread(target=self._background_usb_capture, daemon=True)
-        self.capture_thread.start()
-        self.streaming = True
+        
+        if not self.usb_available:
+            logger.error("❌ No USB camera available for streaming")
+            return False
+        
+        if self.usb_engine is None:
+            self.usb_engine = CaptureEngine(self.usb_device_id)
+            self.usb_engine.add_listener(self._on_usb_frame)
+        
+        self.usb_engine.start()
+        logger.info("✅ USB capture engine started")
         return True
     
     def stop_streaming(self):
         
-        if not self.streaming:
-            return
-            
-        self.capture_running = False
-        if self.capture_thread and self.capture_thread.is_alive():
-            self.capture_thread.join(timeout=3)
-        self.streaming = False
+        if self.usb_engine:
+            self.usb_engine.stop()
     
-    def get_latest_frame(self):
+    @property
+    def streaming(self):
         
-        if not self.streaming:
-            # For non-streaming mode, use optimized direct capture
-            return self.capture_usb_image(width=160, height=120)[0]
+        return self.usb_engine is not None and self.usb_engine.running
+    
+    def _on_usb_frame(self, snapshot):
+        """Capture engine listener - hands every Nth frame to the detector"""
+        if snapshot.seq % USBCaptureConfig.DETECTION_INTERVAL == 0:
+            self._queue_frame_for_detection(snapshot)
+    
+    def get_usb_capture(self):
+        """Latest USB FrameSnapshot, starting the capture engine on demand"""
+        if not self.streaming and not self.start_streaming():
+            return None
         
-        with self.frame_lock:
-            if self.latest_frame:
-                return self.latest_frame
+        snapshot = self.usb_engine.latest()
+        if snapshot is None:
+            snapshot = self.usb_engine.wait_for_frame(timeout=1.0)
+        return snapshot
+    
+    def get_latest_frame(self):
         
-        return None
+        if not self.usb_engine:
+            return None
+        return self.usb_engine.encode_jpeg(self.get_usb_capture())
     
     def get_latest_frame_fast(self):
-        """Optimized method for fastest frame retrieval"""
-        if self.streaming:
-            with self.frame_lock:
-                return self.latest_frame
-        return None
+        
+        if not self.streaming:
+            return None
+        return self.usb_engine.latest_jpeg()
     
     def start_csi_streaming(self):
         
@@ -693,14 +637,11 @@ class CameraManager:
             return True
         
         try:
+            # One long-lived rpicam-vid process replaces per-frame rpicam-still calls
             self.csi_capture_running = True
-            self.csi_capture_thread = threading.Thread(target=self._background_csi_capture, daemon=True)
-            self.csi_capture_thread.start()
-            
-            # Much shorter wait - streaming should start almost immediately
-            time.sleep(0.2)
+            self.csi_pipe = RpicamMJPEGPipe(on_frame=self._on_csi_frame)
+            self.csi_pipe.start()
             
-            # Don't test frame on startup - just assume it will work
             self.csi_streaming = True
             logger.info("✅ CSI streaming started")
             return True
@@ -716,8 +657,9 @@ class CameraManager:
             return
             
         self.csi_capture_running = False
-        if self.csi_capture_thread and self.csi_capture_thread.is_alive():
-            self.csi_capture_thread.join(timeout=3)
+        if self.csi_pipe:
+            self.csi_pipe.stop()
+            self.csi_pipe = None
         self.csi_streaming = False
     
     def get_csi_frame(self):
@@ -728,9 +670,9 @@ class CameraManager:
             self.start_csi_streaming()
             time.sleep(0.1)  # Brief wait for stream to start
         
-        # LOCKLESS direct access for maximum speed
-        if self.latest_csi_frame:
-            return self.latest_csi_frame
+        jpeg_data = self.csi_ring.latest_jpeg()
+        if jpeg_data:
+            return jpeg_data
         
         # Fallback to direct capture only if streaming fails
         image_data, error = self.capture_csi_image(width=160, height=120)
@@ -744,8 +686,17 @@ class CameraManager:
         if not self.csi_streaming:
             self.start_csi_streaming()
         
-        # LOCKLESS direct access - maximum speed like USB camera
-        return self.latest_csi_frame
+        return self.csi_ring.latest_jpeg()
+    
+    def get_csi_capture(self):
+        """Latest CSI FrameSnapshot, starting the pipe on demand"""
+        if not self.csi_streaming and not self.start_csi_streaming():
+            return None
+        
+        snapshot = self.csi_ring.latest()
+        if snapshot is None:
+            snapshot = self.csi_ring.wait_for(timeout=1.0)
+        return snapshot
     
     def capture_csi_image(self, width=640, height=480):
         
@@ -754,7 +705,7 @@ class CameraManager:
         
         try:
             # Use OpenCV for direct CSI capture
-            cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+            cap = open_video_capture(0, cv2.CAP_V4L2)
             
             if not cap.isOpened():
                 return None, "Failed to open CSI camera"
@@ -786,198 +737,26 @@ class CameraManager:
         if not self.usb_available:
             return None, "USB camera not available"
         
-        cap = cv2.VideoCapture(self.usb_device_id, cv2.CAP_V4L2)
-        try:
-            # Optimized settings for speed
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, min(width, 160))
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, min(height, 120))
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M','J','P','G'))
-            cap.set(cv2.CAP_PROP_FPS, 60)
-            cap.set(cv2.CAP_PROP_EXPOSURE, -6)  # Faster exposure
-            
-            # Skip a few frames to get fresh data
-            for _ in range(3):
-                cap.grab()
-            
-            ret, frame = cap.read()
-            if ret and frame is not None:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 50])  # Better quality
-                image_b64 = base64.b64encode(buffer.tobytes()).decode('utf-8')
-                return image_b64, None
-            else:
-                return None, "Failed to capture USB camera frame"
-        
-        except Exception as e:
-            return None, f"USB capture error: {e}"
-        finally:
-            cap.release()
+        jpeg_data = self.get_latest_frame()
+        if jpeg_data:
+            return base64.b64encode(jpeg_data).decode('utf-8'), None
+        return None, "Failed to capture USB camera frame"
     
     def start_usb_streaming(self):
         
-        if not self.usb_available:
-            return False
-        
-        if self.usb_cap is None:
-            self.usb_cap = cv2.VideoCapture(self.usb_device_id, cv2.CAP_V4L2)
-            # Optimized settings for low latency streaming
-            self.usb_cap.set(cv2.CAP_PROP_FRAME_WIDTH, 160)
-            self.usb_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 120)
-            self.usb_cap.set(cv2.CAP_PROP_FPS, 60)
-            self.usb_cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.usb_cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M','J','P','G'))
-            self.usb_cap.set(cv2.CAP_PROP_EXPOSURE, -6)  # Faster exposure
-        
-        self.streaming = True
-        
-        if not self.capture_running:
-            self.capture_running = True
-            self.capture_thread = threading.Thread(target=self._background_capture, daemon=True)
-            self.capture_thread.start()
-        
-        return True
+        return self.start_streaming()
     
     def stop_usb_streaming(self):
         
-        self.streaming = False
-        self.capture_running = False
-        
-        if self.capture_thread and self.capture_thread.is_alive():
-            self.capture_thread.join(timeout=1.0)
-        
-        if self.usb_cap:
-            self.usb_cap.release()
-            self.usb_cap = None
-        
-        with self.frame_lock:
-            self.latest_frame = None
+        self.stop_streaming()
     
     def get_usb_frame(self):
         
-        if not self.streaming:
-            return None
-        
-        with self.frame_lock:
-            if self.latest_frame:
-                frame_b64 = base64.b64encode(self.latest_frame).decode('utf-8')
-                return frame_b64
+        jpeg_data = self.get_latest_frame_fast()
+        if jpeg_data:
+            return base64.b64encode(jpeg_data).decode('utf-8')
         return None
     
-    def get_latest_frame_fast(self):
-        """EXTREME SPEED frame retrieval - NO LOCKS for maximum performance"""
-        if not self.streaming or not self.latest_frame:
-            return None
-        
-        # Direct access WITHOUT lock - maximum speed
-        return self.latest_frame
-    
-    def start_streaming(self):
-        """Start high-speed streaming with minimal startup delay"""
-        if self.streaming:
-            logger.info("✅ Streaming already active")
-            return True
-            
-        if not self.usb_available:
-            logger.error("❌ No USB camera available for streaming")
-            return False
-            
-        try:
-            logger.info("🚀 Starting high-speed streaming...")
-            self.streaming = True
-            self.capture_running = True
-            self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-            self.capture_thread.start()
-            
-            # Minimal startup delay - just enough for thread to start
-            time.sleep(0.1)
-            
-            logger.info("✅ High-speed streaming started")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to start streaming: {e}")
-            self.streaming = False
-            self.capture_running = False
-            return False
-    
-    def _capture_loop(self):
-        """FREEZE-FREE 12+ FPS capture loop - bulletproof against iOS app freezes"""
-        cap = None
-        consecutive_errors = 0
-        max_consecutive_errors = 5
-        try:
-            cap = cv2.VideoCapture(self.usb_device_id, cv2.CAP_V4L2)
-            if not cap.isOpened():
-                logger.error(f"Failed to open USB camera {self.usb_device_id}")
-                self.streaming = False
-                return
-            
-            # CRITICAL: Bulletproof camera settings to prevent freezes
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)   # Stable resolution
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)  # Stable resolution
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)      # CRITICAL: Single frame buffer
-            cap.set(cv2.CAP_PROP_FPS, 30)            # Request 30 FPS
-            
-            # Use YUYV format - more stable than MJPEG on Pi
-            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('Y','U','Y','V'))
-            
-            # Disable ALL auto-adjustments for consistent, freeze-free timing
-            cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)   # Manual exposure
-            cap.set(cv2.CAP_PROP_EXPOSURE, -6)       # Fast but stable exposure  
-            cap.set(cv2.CAP_PROP_AUTOFOCUS, 0)       # No autofocus delays
-            cap.set(cv2.CAP_PROP_AUTO_WB, 0)         # No auto white balance delays
-            cap.set(cv2.CAP_PROP_GAIN, 0)            # No auto gain delays
-            
-            logger.info("🛡️ FREEZE-FREE USB capture started - bulletproof mode")
-            
-            frame_count = 0
-            start_time = time.time()
-            last_performance_log = start_time
-            last_health_check = start_time
-            
-            # Pre-allocate encode parameters for consistent performance
-            encode_params = [cv2.IMWRITE_JPEG_QUALITY, 65]  # Good quality/speed balance
-            
-            while self.capture_running and self.streaming:
-                # CRITICAL: Only grab, don't decode unnecessary frames
-                cap.grab()  # Discard old frame
-                
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    # ASYNC DETECTION: Queue frame for processing without blocking capture
-                    if frame_count % 10 == 0:  # Only queue every 10th frame for detection
-                        self._queue_frame_for_detection(frame)
-                    
-                    # NO DETECTION PROCESSING IN MAIN LOOP - maintains 12+ FPS
-                    # Encode original frame immediately for maximum speed 
-                    _, buffer = cv2.imencode('.jpg', frame, encode_params)
-                    jpeg_data = buffer.tobytes()
-                    
-                    # Update latest frame - NO LOCK for speed
-                    self.latest_frame = jpeg_data
-                    
-                    frame_count += 1
-                    
-                    # Performance logging every 2 seconds
-                    current_time = time.time()
-                    if current_time - last_performance_log >= 2.0:
-                        elapsed = current_time - start_time
-                        fps = frame_count / elapsed if elapsed > 0 else 0
-                        logger.info(f"� LOCKED FPS: {fps:.1f} | Target: 10+ FPS | Frames: {frame_count}")
-                        last_performance_log = current_time
-                
-                # NO SLEEP - let CPU run at full speed
-                    
-        except Exception as e:
-            logger.error(f"🎯 LOCKED capture loop error: {e}")
-        finally:
-            if cap:
-                cap.release()
-            self.streaming = False
-            self.capture_running = False
-            logger.info(f"🎯 LOCKED capture loop stopped after {frame_count} frames")
-            logger.info(f"� EXTREME capture loop stopped after {frame_count} frames")
-    
     def get_camera_status(self):
         
         return {
@@ -985,8 +764,16 @@ class CameraManager:
             'usb_available': self.usb_available,
             'usb_device_id': self.usb_device_id,
             'streaming': self.streaming,
+            'usb_engine': self.usb_engine.get_stats() if self.usb_engine else None,
+            'csi_streaming': self.csi_streaming,
+            'csi_pipe': self.csi_pipe.get_stats() if self.csi_pipe else None,
+            'csi_ring': self.csi_ring.get_stats(),
+            'mjpeg_clients': {camera: b.get_stats() for camera, b in self.broadcasters.items()},
             'detection_enabled': self.detection_enabled,
-            'detector_status': self.detector.get_status() if self.detector else None
+            'detector_status': self.detector.get_status() if self.detector else None,
+            'detection_pool': self.detection_pool.get_stats() if self.detection_pool else None,
+            'detection_mailbox': dict(self.detection_mailbox.get_stats(),
+                                      stale_frames=self.stale_detection_frames)
         }
     
     def enable_detection(self):
@@ -1001,6 +788,7 @@ class CameraManager:
     def disable_detection(self):
         
         self.detection_enabled = False
+        self.detection_mailbox.clear()
         if self.detector:
             self.detector.disable_detection()
     
@@ -1008,24 +796,50 @@ class CameraManager:
         
         self.detection_callback = callback
     
+    def set_detection_result_callback(self, callback):
+        
+        self.detection_result_callback = callback
+    
+    def annotate_jpeg(self, snapshot):
+        """USB frame with tracked people drawn on it - only for clients that ask for overlays"""
+        frame = self.usb_engine.ring.get_frame(snapshot) if self.usb_engine else None
+        if frame is None or not self.detector:
+            return None
+        annotated = self.detector.annotate_frame(frame, self.detector.get_tracks(snapshot.timestamp))
+        ok, buffer = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, USBCaptureConfig.JPEG_QUALITY])
+        return buffer.tobytes() if ok else None
+    
     def set_detection_model(self, model_name):
         
         if self.detector:
             return self.detector.set_model(model_name)
         return False
     
+    def get_tracks(self):
+        """Tracked people predicted to the newest USB frame, keyed by its sequence number"""
+        snapshot = self.usb_engine.latest() if self.usb_engine else None
+        seq, timestamp = (snapshot.seq, snapshot.timestamp) if snapshot else (None, time.time())
+        return {
+            'seq': seq,
+            'timestamp': timestamp,
+            'tracks': self.detector.get_tracks(timestamp) if self.detector else []
+        }
+    
     def cleanup(self):
         """Clean up camera resources and stop all threads"""
         # Stop detection thread first
         if hasattr(self, 'detection_running'):
             self.detection_running = False
+        self.detection_mailbox.close()
         if hasattr(self, 'detection_thread') and self.detection_thread:
             if self.detection_thread.is_alive():
                 self.detection_thread.join(timeout=2)
+        if self.detection_pool:
+            self.detection_pool.stop()
+            self.detection_pool = None
         
         self.stop_streaming()
         self.stop_csi_streaming()
-        self.capture_running = False
         self.csi_capture_running = False
 
 class GuardItIMUServer:
@@ -1039,12 +853,28 @@ class GuardItIMUServer:
         self.last_notification_time = 0
         self.last_hardware_trigger_time = 0
         self.start_time = time.time()
+        self.boot_id = format(int(self.start_time), 'x')
         
         self.bus = None
+        self.fifo = None
+        self.decoder = IMUDecoder(IMU_ACCEL_RANGE, IMU_GYRO_RANGE, chip='mpu6050')
+        self.history = None
+        self.fall_detector = None
+        self.recorder = None
+        self.orientation = MadgwickFilter()
+        self.pending_fall = None
+        self.last_fall = None
+        self.peak_gyro_magnitude = 0.0
         self.buzzer = None
         self.led = None
         self.camera = None
         self.running = False
+        self.last_pushed_alert = (False, "")
+        # Held for each IMU tick, so rate changes never land mid-batch
+        self.imu_lock = threading.Lock()
+        self.scheduler = DeadlineScheduler("imu-scheduler")
+        
+        self.push = PushChannel(port=PUSH_SERVER_PORT)
         
         self.app = Flask(__name__)
         self.setup_routes()
@@ -1055,6 +885,7 @@ class GuardItIMUServer:
         
         if self.camera:
             self.camera.set_detection_callback(self.handle_detection_alert)
+            self.camera.set_detection_result_callback(self.handle_detection_result)
             # Auto-enable object detection on startup for immediate proximity alerts
             if self.camera.enable_detection():
                 logger.info("🚨 Object detection auto-enabled on startup")
@@ -1064,9 +895,21 @@ class GuardItIMUServer:
         if not self.init_mpu6050():
             raise Exception("MPU6050 initialization failed")
         
+        self.history = IMUHistory.for_rate(self.get_imu_sample_rate())
+        self.fall_detector = FallDetector(self.get_imu_sample_rate())
+        if IMU_RECORDING:
+            self.recorder = IMURecorder(self.get_imu_sample_rate(), IMU_ACCEL_RANGE, IMU_GYRO_RANGE, 'mpu6050')
+        
+        self.push.start()
+        
         self.running = True
-        self.data_thread = threading.Thread(target=self.main_loop, daemon=True)
-        self.data_thread.start()
+        # IMU sampling, indicator refresh and status logging share one deadline-driven thread
+        self.scheduler.add_job("imu", self.get_imu_read_interval() / 1000, self.sample_imu)
+        # One IMU push per tick, so clients cannot be offered more than the tick rate
+        self.push.set_max_imu_rate(1000 / self.get_imu_read_interval())
+        self.scheduler.add_job("indicators", LED_REFRESH_INTERVAL / 1000, self.update_indicators)
+        self.scheduler.add_job("status_log", STATUS_LOG_INTERVAL / 1000, self.log_status)
+        self.scheduler.start()
 
     def init_gpio(self):
         
@@ -1098,7 +941,7 @@ class GuardItIMUServer:
     def init_mpu6050(self) -> bool:
         
         try:
-            self.bus = smbus2.SMBus(1)
+            self.bus = get_bus(1)
             
             self.bus.write_byte_data(MPU6050_ADDR, MPU6050_PWR_MGMT_1, 0)
             
@@ -1106,6 +949,18 @@ class GuardItIMUServer:
             if who_am_i not in [0x68, 0x70, 0x71, 0x73]:
                 return False
             
+            self.bus.write_byte_data(MPU6050_ADDR, MPU6050_GYRO_CONFIG,
+                                     full_scale_bits(IMU_GYRO_RANGE, GYRO_SENSITIVITY))
+            self.bus.write_byte_data(MPU6050_ADDR, MPU6050_ACCEL_CONFIG,
+                                     full_scale_bits(IMU_ACCEL_RANGE, ACCEL_SENSITIVITY))
+            
+            if IMU_USE_FIFO:
+                fifo = MPUFifoReader(self.bus, MPU6050_ADDR)
+                if fifo.configure():
+                    self.fifo = fifo
+                else:
+                    logger.warning("⚠️ IMU FIFO unavailable - falling back to register polling")
+            
             return True
             
         except Exception as e:
@@ -1123,10 +978,22 @@ class GuardItIMUServer:
         def status():
             return jsonify(self.get_status_info())
         
+        @self.app.route("/scheduler", methods=["GET", "POST"])
+        def scheduler():
+            if request.method == "POST":
+                data = request.get_json(silent=True) or {}
+                result = self.set_job_interval(data.get('job', 'imu'), data.get('interval_ms'))
+                return jsonify(result), (400 if "error" in result else 200)
+            return jsonify(self.scheduler.get_stats())
+        
         @self.app.route("/imu", methods=["GET"])
         def imu():
             return jsonify(self.get_imu_data_json())
         
+        @self.app.route("/imu/history", methods=["GET"])
+        def imu_history():
+            return self.get_imu_history_response()
+        
         @self.app.route("/data", methods=["GET"])
         def data():
             return jsonify(self.get_imu_data_json())
@@ -1141,6 +1008,8 @@ class GuardItIMUServer:
         
         @self.app.route("/camera/csi", methods=["GET"])
         def capture_csi():
+            if self.wants_binary_frame():
+                return self.get_camera_jpeg_response('csi')
             width = request.args.get('width', 640, type=int)
             height = request.args.get('height', 480, type=int)
             return self.get_csi_image(width, height)
@@ -1153,8 +1022,25 @@ class GuardItIMUServer:
         @self.app.route("/camera/usb", methods=["GET"])
         def capture_usb():
             """Main USB camera endpoint - optimized for 10+ FPS"""
+            if self.wants_binary_frame():
+                return self.get_camera_jpeg_response('usb')
             return self.get_usb_image_optimized()
         
+        @self.app.route("/camera/usb/jpeg", methods=["GET"])
+        def capture_usb_jpeg():
+            """USB frame as raw image/jpeg - metadata in X-Frame-* headers"""
+            return self.get_camera_jpeg_response('usb')
+        
+        @self.app.route("/camera/csi/jpeg", methods=["GET"])
+        def capture_csi_jpeg():
+            """CSI frame as raw image/jpeg - metadata in X-Frame-* headers"""
+            return self.get_camera_jpeg_response('csi')
+        
+        @self.app.route("/camera/<camera_type>/stream", methods=["GET"])
+        def stream_camera(camera_type):
+            """multipart/x-mixed-replace MJPEG stream shared by all clients"""
+            return self.get_camera_stream_response(camera_type)
+        
         @self.app.route("/camera/both", methods=["GET"])
         def capture_both():
             width = request.args.get('width', 640, type=int)
@@ -1212,6 +1098,19 @@ class GuardItIMUServer:
             model_name = request.json.get('model', 'hog') if request.json else 'hog'
             return jsonify(self.set_detection_model(model_name))
         
+        @self.app.route("/detection/results", methods=["GET"])
+        def detection_results():
+            return jsonify(self.get_detection_results())
+        
+        @self.app.route("/detection/tracks", methods=["GET"])
+        def detection_tracks():
+            return jsonify(self.get_detection_tracks())
+        
+        @self.app.route("/detection/gate", methods=["POST"])
+        def set_motion_gate():
+            data = request.get_json(silent=True) or {}
+            return jsonify(self.set_motion_gate(data))
+        
         @self.app.route("/proximity/enable", methods=["POST"])
         def enable_proximity_alerts():
             return jsonify(self.enable_proximity_alerts())
@@ -1250,7 +1149,8 @@ class GuardItIMUServer:
         def after_request(response):
             response.headers.add('Access-Control-Allow-Origin', '*')
             response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+            response.headers.add('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+            response.headers.add('Access-Control-Expose-Headers', FRAME_EXPOSE_HEADERS)
             return response
     
     def handle_cors(self):
@@ -1285,7 +1185,8 @@ class GuardItIMUServer:
             "ip": local_ip,
             "port": SERVER_PORT,
             "status": "running",
-            "endpoints": ["/status", "/imu", "/data", "/sensor", "/camera", "/camera/csi", "/camera/csi/fast", "/camera/usb", "/camera/both", "/notification/suspicious_activity", "/notification/proximity_alert", "/detection/enable", "/detection/disable", "/detection/status", "/detection/model", "/proximity/enable", "/proximity/disable", "/proximity/threshold", "/proximity/status", "/buzzer/status", "/buzzer", "/buzzer/trigger", "/buzzer/test"],
+            "push_channel": f"ws://{local_ip}:{PUSH_SERVER_PORT}",
+            "endpoints": ["/status", "/scheduler", "/imu", "/imu/history", "/data", "/sensor", "/camera", "/camera/csi", "/camera/csi/fast", "/camera/usb", "/camera/usb/jpeg", "/camera/csi/jpeg", "/camera/usb/stream", "/camera/csi/stream", "/camera/both", "/notification/suspicious_activity", "/notification/proximity_alert", "/detection/enable", "/detection/disable", "/detection/status", "/detection/model", "/detection/results", "/detection/tracks", "/detection/gate", "/proximity/enable", "/proximity/disable", "/proximity/threshold", "/proximity/status", "/buzzer/status", "/buzzer", "/buzzer/trigger", "/buzzer/test"],
             "camera_status": self.camera.get_camera_status() if self.camera else {}
         }
     
@@ -1297,15 +1198,135 @@ class GuardItIMUServer:
             "ip": local_ip,
             "rssi": -50,
             "uptime": int(time.time() - self.start_time),
-            "last_data_time": self.last_data_time
+            "last_data_time": self.last_data_time,
+            "imu_sampling": self.get_imu_sampling_info(),
+            "imu_history": self.history.get_stats() if self.history else {},
+            "fall_detector": self.fall_detector.get_stats() if self.fall_detector else {},
+            "imu_recorder": self.recorder.get_stats() if self.recorder else {},
+            "i2c": self.bus.get_stats() if self.bus else {},
+            "scheduler": self.scheduler.get_stats(),
+            "push_channel": self.push.get_stats()
         }
     
+    def get_imu_sample_rate(self) -> float:
+        """Samples per second: the FIFO rate, or one sample per IMU tick when polling"""
+        return self.fifo.sample_rate if self.fifo else 1000 / self.get_imu_read_interval()
+    
+    def apply_imu_sample_rate(self):
+        """Bring everything sized or timed by the sample rate up to date after it changed"""
+        sample_rate = self.get_imu_sample_rate()
+        with self.imu_lock:
+            if self.history:
+                self.history.resize(IMUHistory.capacity_for(sample_rate))
+            if self.fall_detector:
+                self.fall_detector.set_sample_rate(sample_rate)
+            if self.recorder:
+                # Starts a new file, since the header rate times every sample in it
+                self.recorder.set_sample_rate(sample_rate)
+        logger.info(f"⏱️ IMU sample rate now {sample_rate:.1f} Hz")
+    
+    def get_imu_read_interval(self) -> float:
+        """Current period of the IMU job in ms"""
+        job = self.scheduler.jobs.get("imu")
+        if job:
+            return job.interval * 1000
+        return FIFO_READ_INTERVAL if self.fifo else DATA_INTERVAL
+    
+    def set_job_interval(self, name: str, interval_ms) -> dict:
+        """Change a scheduled job's period at runtime"""
+        if name not in self.scheduler.jobs:
+            return {"error": f"Unknown job '{name}'", "jobs": list(self.scheduler.jobs)}
+        try:
+            interval_ms = float(interval_ms)
+        except (TypeError, ValueError):
+            return {"error": "interval_ms must be a number"}
+        
+        max_interval = 60000.0
+        if name == "imu" and self.fifo:
+            # Drain before the FIFO is half full so a slow tick cannot overflow it
+            max_interval = self.fifo.fifo_size / FIFO_RECORD_BYTES / self.fifo.sample_rate * 1000 / 2
+        if not 1.0 <= interval_ms <= max_interval:
+            return {"error": f"interval_ms must be between 1 and {max_interval:.0f}"}
+        
+        self.scheduler.set_interval(name, interval_ms / 1000)
+        if name == "imu":
+            self.push.set_max_imu_rate(1000 / interval_ms)
+            if not self.fifo:
+                # Polling takes one sample per tick, so the sample rate changed too
+                self.apply_imu_sample_rate()
+        logger.info(f"⏱️ Job '{name}' now runs every {interval_ms:.0f} ms")
+        return {"success": True, "job": name, "interval_ms": interval_ms}
+    
+    def get_imu_sampling_info(self) -> dict:
+        
+        if self.fifo:
+            return {"mode": "fifo", **self.fifo.get_stats()}
+        return {"mode": "poll", "sample_rate": self.get_imu_sample_rate()}
+    
     def get_imu_data_json(self) -> dict:
         
         data_dict = asdict(self.current_data)
         data_dict["timestamp"] = int(time.time() * 1000)
+        data_dict["orientation"] = self.orientation.get_state()
         return data_dict
     
+    def get_imu_history_response(self):
+        """Columnar slice of the IMU history as JSON or packed binary"""
+        if not self.history:
+            return jsonify({"success": False, "error": "IMU history not available"}), 503
+        
+        fields_arg = request.args.get('fields')
+        fields = [f.strip() for f in fields_arg.split(',') if f.strip()] if fields_arg else list(HISTORY_FIELDS)
+        unknown = [f for f in fields if f not in HISTORY_FIELDS]
+        if unknown or not fields:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+                "available_fields": list(HISTORY_FIELDS)
+            }), 400
+        
+        output_format = request.args.get('format', 'json')
+        if output_format not in ('json', 'binary'):
+            return jsonify({"success": False, "error": "format must be 'json' or 'binary'"}), 400
+        
+        try:
+            since_ms = float(request.args.get('since', 0))
+            limit = int(request.args.get('limit', IMUHistoryConfig.MAX_RESPONSE_SAMPLES))
+        except ValueError:
+            return jsonify({"success": False, "error": "since and limit must be numeric"}), 400
+        limit = max(1, min(limit, IMUHistoryConfig.MAX_RESPONSE_SAMPLES))
+        
+        columns = self.history.since(since_ms, fields, limit)
+        timestamps_ms = columns['timestamps']
+        count = len(timestamps_ms)
+        next_since = float(timestamps_ms[-1]) if count else since_ms
+        sample_rate = self.get_imu_sample_rate()
+        
+        if output_format == 'binary':
+            # float64 millisecond timestamps, then one float32 column per field (little-endian)
+            body = b''.join([timestamps_ms.astype('<f8').tobytes()] +
+                            [columns[field].astype('<f4').tobytes() for field in fields])
+            response = Response(body, mimetype='application/octet-stream')
+            response.headers['X-IMU-Fields'] = ','.join(fields)
+            response.headers['X-IMU-Count'] = str(count)
+            response.headers['X-IMU-Next-Since'] = repr(next_since)
+            response.headers['X-IMU-Sample-Rate'] = str(sample_rate)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        
+        result = {
+            "success": True,
+            "fields": fields,
+            "count": count,
+            "more": count == limit,
+            "next_since": next_since,
+            "sample_rate": sample_rate,
+            "timestamps": np.round(timestamps_ms, 3).tolist()
+        }
+        for field in fields:
+            result[field] = np.round(columns[field].astype(np.float64), 4).tolist()
+        return jsonify(result)
+    
     def get_camera_status(self) -> dict:
         
         if not self.camera:
@@ -1333,14 +1354,13 @@ class GuardItIMUServer:
                 if not self.camera.start_csi_streaming():
                     return Response('{"error":"Failed to start CSI streaming"}', mimetype='application/json')
             
-            # LOCKLESS CSI frame access for maximum speed (like USB camera)
-            frame_data = self.camera.latest_csi_frame
+            snapshot, not_modified = self.get_frame_snapshot('csi')
+            if not_modified:
+                return self.frame_not_modified_response('csi', snapshot)
+            frame_data = snapshot.jpeg if snapshot else None
             
             if frame_data:
                 try:
-                    # Cache good frame for freeze recovery
-                    self.camera._last_good_csi_frame = frame_data
-                    
                     # Ultra-fast base64 encoding
                     image_b64 = base64.b64encode(frame_data).decode('utf-8')
                     
@@ -1350,6 +1370,8 @@ class GuardItIMUServer:
                         "image": image_b64,
                         "format": "jpeg",
                         "timestamp": int(time.time() * 1000),
+                        "frame_seq": snapshot.seq,
+                        "capture_timestamp": int(snapshot.timestamp * 1000),
                         "streaming": True,
                         "libcamera": True,  # Indicate using libcamera
                         "ultra_fast": True  # Indicate lockless access
@@ -1360,6 +1382,7 @@ class GuardItIMUServer:
                     response.headers['Pragma'] = 'no-cache'
                     response.headers['Expires'] = '0'
                     response.headers['Access-Control-Allow-Origin'] = '*'
+                    response.set_etag(self.frame_etag(response_data["camera"], snapshot))
                     return response
                     
                 except Exception as encode_error:
@@ -1423,28 +1446,18 @@ class GuardItIMUServer:
                     return Response('{"error":"Failed to start streaming"}', mimetype='application/json')
                 # NO SLEEP - immediate response for freeze-free operation
             
-            # SAFE frame access with minimal lock time to prevent freezes
-            frame_data = None
-            try:
-                # Ultra-fast lock acquisition with timeout to prevent freezes
-                if self.camera.frame_lock.acquire(timeout=0.01):  # 10ms max wait
-                    try:
-                        frame_data = self.camera.latest_frame
-                    finally:
-                        self.camera.frame_lock.release()
-                else:
-                    # Lock timeout - use last known good frame or return error
-                    logger.debug("Frame lock timeout - returning cached response")
-                    frame_data = getattr(self.camera, '_last_good_frame', None)
-            except Exception as lock_error:
-                logger.debug(f"Frame lock error: {lock_error}")
-                frame_data = getattr(self.camera, '_last_good_frame', None)
+            # Every request reads the frame published by the shared capture engine
+            snapshot, not_modified = self.get_frame_snapshot('usb')
+            if not_modified:
+                return self.frame_not_modified_response('usb', snapshot)
+            annotated = self.wants_annotated_frame('usb')
+            if annotated:
+                frame_data = self.camera.annotate_jpeg(snapshot) if snapshot else None
+            else:
+                frame_data = self.camera.usb_engine.encode_jpeg(snapshot)
             
             if frame_data:
                 try:
-                    # Cache good frame for freeze recovery
-                    self.camera._last_good_frame = frame_data
-                    
                     # Ultra-fast base64 encoding
                     image_b64 = base64.b64encode(frame_data).decode('utf-8')
                     
@@ -1454,6 +1467,9 @@ class GuardItIMUServer:
                         "image": image_b64,
                         "format": "jpeg",
                         "timestamp": int(time.time() * 1000),
+                        "frame_seq": snapshot.seq,
+                        "capture_timestamp": int(snapshot.timestamp * 1000),
+                        "annotated": annotated,
                         "streaming": True
                     }
                     
@@ -1462,6 +1478,8 @@ class GuardItIMUServer:
                     response.headers['Pragma'] = 'no-cache'
                     response.headers['Expires'] = '0'
                     response.headers['Access-Control-Allow-Origin'] = '*'
+                    if not annotated:
+                        response.set_etag(self.frame_etag(response_data["camera"], snapshot))
                     return response
                     
                 except Exception as encode_error:
@@ -1481,6 +1499,126 @@ class GuardItIMUServer:
             logger.error(f"USB camera endpoint error: {e}")
             return jsonify({"success": False, "error": str(e), "camera": "usb"})
     
+    def frame_etag(self, camera, snapshot):
+        
+        return f"{camera}-{self.boot_id}-{snapshot.seq}"
+    
+    def get_frame_cursor(self, camera):
+        """Sequence number the client already has, from ?since= or If-None-Match"""
+        since = request.args.get('since', type=int)
+        if since is not None:
+            return since
+        
+        prefix = f"{camera}-{self.boot_id}-"
+        for etag in request.if_none_match.as_set():
+            if etag.startswith(prefix) and etag[len(prefix):].isdigit():
+                return int(etag[len(prefix):])
+        return 0
+    
+    def get_frame_snapshot(self, camera):
+        """Latest snapshot for a frame request, honouring since/ETag cursors.
+        
+        Returns (snapshot, not_modified). With ?wait=<seconds> the request
+        long-polls until a newer frame is published or the wait expires.
+        """
+        snapshot = self.camera.get_usb_capture() if camera == 'usb' else self.camera.get_csi_capture()
+        ring = self.camera.get_frame_ring(camera)
+        cursor = self.get_frame_cursor(camera)
+        
+        # A cursor ahead of the ring comes from an earlier capture session
+        if not cursor or ring is None or cursor > ring.head_seq:
+            return snapshot, False
+        
+        if snapshot is None or snapshot.seq <= cursor:
+            # Ask the ring again even without a wait: a frame published after the
+            # snapshot above was taken must not be answered with a 304
+            wait = min(max(request.args.get('wait', 0.0, type=float), 0.0), MAX_FRAME_WAIT)
+            snapshot = ring.wait_for(cursor, timeout=wait)
+            if snapshot is None or snapshot.seq <= cursor:
+                return snapshot, True
+        
+        return snapshot, False
+    
+    def frame_not_modified_response(self, camera, snapshot):
+        
+        response = Response(status=304)
+        response.headers['X-Camera'] = camera
+        if snapshot:
+            response.headers['X-Frame-Seq'] = str(snapshot.seq)
+            response.set_etag(self.frame_etag(camera, snapshot))
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    def wants_annotated_frame(self, camera):
+        """Server-side overlays are opt-in (?annotate=1); clients normally draw /detection/results"""
+        return camera == 'usb' and request.args.get('annotate', '0').lower() in ('1', 'true', 'yes')
+    
+    def wants_binary_frame(self):
+        """True when the client explicitly prefers image/jpeg over the JSON envelope"""
+        return request.accept_mimetypes.best_match(['application/json', 'image/jpeg']) == 'image/jpeg'
+    
+    def get_camera_jpeg_response(self, camera):
+        """Serve the latest frame as image/jpeg with no base64/JSON wrapping"""
+        if not self.camera:
+            return jsonify({"success": False, "error": "Camera not initialized"}), 503
+        
+        try:
+            snapshot, not_modified = self.get_frame_snapshot(camera)
+            if not_modified:
+                return self.frame_not_modified_response(camera, snapshot)
+            
+            annotated = self.wants_annotated_frame(camera)
+            if annotated:
+                jpeg_data = self.camera.annotate_jpeg(snapshot) if snapshot else None
+            else:
+                ring = self.camera.get_frame_ring(camera)
+                jpeg_data = ring.get_jpeg(snapshot) if ring else None
+            
+            if not jpeg_data:
+                return jsonify({
+                    "success": False,
+                    "error": "No frame available",
+                    "camera": camera,
+                    "timestamp": int(time.time() * 1000)
+                }), 503
+            
+            detector = self.camera.detector
+            response = Response(jpeg_data, mimetype='image/jpeg')
+            response.headers['X-Camera'] = camera
+            response.headers['X-Frame-Seq'] = str(snapshot.seq)
+            response.headers['X-Frame-Timestamp'] = str(int(snapshot.timestamp * 1000))
+            response.headers['X-Detection-Enabled'] = '1' if self.camera.detection_enabled else '0'
+            response.headers['X-Person-Detected'] = '1' if detector and detector.person_detected else '0'
+            response.headers['X-Annotated'] = '1' if annotated else '0'
+            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+            # Annotated bytes differ from the clean frame with the same seq, so they get no ETag
+            if not annotated:
+                response.set_etag(self.frame_etag(camera, snapshot))
+            return response
+            
+        except Exception as e:
+            logger.error(f"{camera} JPEG endpoint error: {e}")
+            return jsonify({"success": False, "error": str(e), "camera": camera}), 500
+    
+    def get_camera_stream_response(self, camera):
+        
+        if camera not in ('usb', 'csi'):
+            return jsonify({"success": False, "error": "Invalid camera type"}), 400
+        if not self.camera:
+            return jsonify({"success": False, "error": "Camera not initialized"}), 503
+        
+        broadcaster = self.camera.get_broadcaster(camera)
+        if broadcaster is None:
+            return jsonify({"success": False, "error": f"{camera} camera not streaming", "camera": camera}), 503
+        
+        stream = broadcaster.stream(
+            lambda: self.running and self.camera.is_camera_streaming(camera)
+        )
+        response = Response(stream, mimetype=broadcaster.content_type)
+        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
     def get_both_images(self, width=640, height=480) -> dict:
         
         if not self.camera:
@@ -1516,10 +1654,19 @@ class GuardItIMUServer:
         
         return result
     
+    def handle_detection_result(self, entry):
+        
+        self.push.publish('detection_results', entry)
+    
     def handle_detection_alert(self, alert_type):
         """Enhanced detection alert handler with proximity support"""
         current_time = time.time() * 1000
         
+        self.push.publish('detection', {
+            "alertType": alert_type,
+            "timestamp": int(current_time)
+        })
+        
         if alert_type == "suspicious_activity":
             if (current_time - self.last_notification_time) > NOTIFICATION_COOLDOWN:
                 self.current_data.alert = True
@@ -1575,9 +1722,29 @@ class GuardItIMUServer:
         return {
             "detection_enabled": camera_status.get('detection_enabled', False),
             "detector_status": camera_status.get('detector_status', None),
+            "detection_pool": camera_status.get('detection_pool', None),
             "camera_streaming": camera_status.get('streaming', False)
         }
     
+    def get_detection_results(self) -> dict:
+        """Detection results newer than ?since=<seq>; ?wait=<seconds> long-polls for the next one"""
+        if not self.camera:
+            return {"error": "Camera not initialized"}
+        
+        since = request.args.get('since', 0, type=int)
+        wait = min(max(request.args.get('wait', 0.0, type=float), 0.0), MAX_FRAME_WAIT)
+        results = self.camera.get_detection_results(since, wait)
+        return {
+            "results": results,
+            "last_seq": results[-1]['seq'] if results else since
+        }
+    
+    def get_detection_tracks(self) -> dict:
+        
+        if not self.camera:
+            return {"error": "Camera not initialized"}
+        return self.camera.get_tracks()
+    
     def set_detection_model(self, model_name) -> dict:
         """Set the detection model"""
         if not self.camera:
@@ -1588,6 +1755,22 @@ class GuardItIMUServer:
         else:
             return {"error": f"Failed to set detection model to {model_name}"}
     
+    def set_motion_gate(self, params: dict) -> dict:
+        """Enable/disable or tune the motion gate in front of person detection"""
+        if not self.camera or not self.camera.detector:
+            return {"error": "Camera or detector not initialized"}
+        
+        try:
+            ok = self.camera.detector.set_motion_gate(
+                enabled=params.get('enabled'),
+                pixel_threshold=int(params['pixel_threshold']) if 'pixel_threshold' in params else None,
+                min_changed_ratio=float(params['min_changed_ratio']) if 'min_changed_ratio' in params else None)
+        except (TypeError, ValueError):
+            ok = False
+        if ok:
+            return {"success": True, "motion_gate": self.camera.detector.motion_gate.get_stats()}
+        return {"error": "Invalid motion gate settings (pixel_threshold 1-254, min_changed_ratio 0.0-1.0)"}
+    
     def enable_proximity_alerts(self) -> dict:
         """Enable proximity-based alerts"""
         if not self.camera or not self.camera.detector:
@@ -1650,39 +1833,16 @@ class GuardItIMUServer:
             data = self.bus.read_i2c_block_data(MPU6050_ADDR, MPU6050_ACCEL_XOUT_H, 14)
             
             if len(data) >= 14:
-                ax_raw = (data[0] << 8) | data[1]
-                ay_raw = (data[2] << 8) | data[3]
-                az_raw = (data[4] << 8) | data[5]
-                
-                temp_raw = (data[6] << 8) | data[7]
-                
-                gx_raw = (data[8] << 8) | data[9]
-                gy_raw = (data[10] << 8) | data[11]
-                gz_raw = (data[12] << 8) | data[13]
-                
-                def to_signed_16(val):
-                    return val if val < 32768 else val - 65536
-                
-                ax_raw = to_signed_16(ax_raw)
-                ay_raw = to_signed_16(ay_raw)
-                az_raw = to_signed_16(az_raw)
-                temp_raw = to_signed_16(temp_raw)
-                gx_raw = to_signed_16(gx_raw)
-                gy_raw = to_signed_16(gy_raw)
-                gz_raw = to_signed_16(gz_raw)
-                
-                self.current_data.ax = ax_raw / 16384.0
-                self.current_data.ay = ay_raw / 16384.0
-                self.current_data.az = az_raw / 16384.0
-                self.current_data.temp = temp_raw / 340.0 + 36.53
-                self.current_data.gx = gx_raw / 131.0
-                self.current_data.gy = gy_raw / 131.0
-                self.current_data.gz = gz_raw / 131.0
+                raw = bytes(data)
+                if self.recorder:
+                    self.recorder.append(raw, time.time())
+                self.apply_imu_batch(self.decoder.decode(raw))
                 
                 current_time = time.time() * 1000
                 if hasattr(self, 'last_debug_time'):
                     if current_time - self.last_debug_time > 5000:
-                        logger.debug(f"Gyro: {gx_raw}, {gy_raw}, {gz_raw} | Temp: {temp_raw}")
+                        logger.debug(f"Gyro: {self.current_data.gx:.2f}, {self.current_data.gy:.2f}, "
+                                     f"{self.current_data.gz:.2f} | Temp: {self.current_data.temp:.1f}")
                         self.last_debug_time = current_time
                 else:
                     self.last_debug_time = current_time
@@ -1690,38 +1850,76 @@ class GuardItIMUServer:
                 logger.warning("Insufficient IMU data received")
                 logger.warning("Not working")
                 
+        except I2CBackoffError:
+            # The bus manager is backing off after an error; skip this tick quietly
+            pass
         except Exception as e:
             logger.error(f"Error reading IMU data: {e}")
     
+    def read_imu_fifo(self):
+        """Drain the IMU FIFO and decode every buffered sample in one pass"""
+        overflows = self.fifo.overflows
+        try:
+            raw = self.fifo.read_batch()
+            batch = self.decoder.decode(raw)
+        except I2CBackoffError:
+            return
+        except Exception as e:
+            logger.error(f"Error reading IMU FIFO: {e}")
+            return
+        finally:
+            # A reset FIFO dropped samples, so the history's sample clock has a gap
+            if self.fifo.overflows != overflows and self.history:
+                self.history.resync()
+        
+        if len(batch):
+            sample_interval = 1.0 / self.fifo.sample_rate
+            if self.recorder:
+                self.recorder.append(raw, time.time(), sample_interval)
+            self.apply_imu_batch(batch, sample_interval)
+    
+    def apply_imu_batch(self, batch, sample_interval=0.0):
+        """Publish the newest sample, record the batch and keep its peaks for detection"""
+        if self.history:
+            self.history.append(batch, time.time(), sample_interval)
+        
+        ax, ay, az = batch.accel[-1].tolist()
+        gx, gy, gz = batch.gyro[-1].tolist()
+        self.current_data.ax = ax
+        self.current_data.ay = ay
+        self.current_data.az = az
+        self.current_data.temp = float(batch.temp[-1])
+        self.current_data.gx = gx
+        self.current_data.gy = gy
+        self.current_data.gz = gz
+        
+        self.orientation.update(batch.accel, batch.gyro, sample_interval or self.get_imu_read_interval() / 1000)
+        
+        if self.fall_detector:
+            fall = self.fall_detector.update(batch.accel_magnitude())
+            if fall:
+                self.pending_fall = fall
+        
+        # The gyro peak catches rotations that fall between the samples shown to clients
+        self.peak_gyro_magnitude = float(batch.gyro_magnitude().max())
+    
     def detect_events(self):
         
-        accel_magnitude = math.sqrt(
-            self.current_data.ax * self.current_data.ax +
-            self.current_data.ay * self.current_data.ay +
-            self.current_data.az * self.current_data.az
-        )
-        
-        gyro_magnitude = math.sqrt(
-            self.current_data.gx * self.current_data.gx +
-            self.current_data.gy * self.current_data.gy +
-            self.current_data.gz * self.current_data.gz
-        )
+        gyro_magnitude = self.peak_gyro_magnitude
+        fall, self.pending_fall = self.pending_fall, None
         
         current_time = time.time() * 1000
         
         can_send_notification = (current_time - self.last_notification_time) > NOTIFICATION_COOLDOWN
         
-        if accel_magnitude > FALL_THRESHOLD and not self.fall_detected:
-            self.fall_detected = True
-            if can_send_notification:
-                self.current_data.alert = True
-                self.current_data.alertType = "fall"
-                self.last_alert_time = current_time
-                self.last_notification_time = current_time
-            else:
-                logger.debug("Fall detected but still in notification cooldown")
-        elif accel_magnitude <= FALL_THRESHOLD:
-            self.fall_detected = False
+        self.fall_detected = fall is not None
+        if fall:
+            self.last_fall = fall.to_dict()
+            # A confirmed fall outranks the movement alert its own tumble usually raised
+            self.current_data.alert = True
+            self.current_data.alertType = "fall"
+            self.last_alert_time = current_time
+            self.last_notification_time = current_time
         
         if gyro_magnitude > MOVEMENT_THRESHOLD and not self.movement_detected:
             self.movement_detected = True
@@ -1740,9 +1938,14 @@ class GuardItIMUServer:
         if should_trigger_hardware:
             self.last_hardware_trigger_time = current_time
         
-        hardware_timeout = 2000
-        time_since_trigger = current_time - self.last_hardware_trigger_time
-        hardware_should_be_active = time_since_trigger < hardware_timeout
+        if self.current_data.alert and current_time - self.last_alert_time > 2000:
+            self.current_data.alert = False
+            self.current_data.alertType = ""
+    
+    def update_indicators(self):
+        """Scheduled LED/buzzer refresh from the latest detection state"""
+        time_since_trigger = time.time() * 1000 - self.last_hardware_trigger_time
+        hardware_should_be_active = time_since_trigger < HARDWARE_TIMEOUT
         
         if hardware_should_be_active:
             if self.led:
@@ -1754,22 +1957,35 @@ class GuardItIMUServer:
                 self.led.green()
             if self.buzzer and self.buzzer.is_active:
                 self.buzzer.stop_tone()
+    
+    def log_status(self):
+        """Scheduled one-line sensor summary"""
+        current_time = time.time() * 1000
+        cooldown_remaining = max(0, NOTIFICATION_COOLDOWN - (current_time - self.last_notification_time))
+        alert_status = f"{self.current_data.alertType}" if self.current_data.alert else "None"
+        logger.debug(f"Accel: {self.current_data.ax:.2f}, {self.current_data.ay:.2f}, {self.current_data.az:.2f} | "
+              f"Gyro: {self.current_data.gx:.2f}, {self.current_data.gy:.2f}, {self.current_data.gz:.2f} | "
+              f"Temp: {self.current_data.temp:.1f}°C | Alert: {alert_status} | "
+              f"Cooldown: {cooldown_remaining/1000:.1f}s")
+    
+    def push_imu_state(self):
+        """Push the latest sample and any alert transition to WebSocket clients"""
+        if not self.push.clients:
+            self.last_pushed_alert = (self.current_data.alert, self.current_data.alertType)
+            return
         
-        if self.current_data.alert and current_time - self.last_alert_time > 2000:
-            self.current_data.alert = False
-            self.current_data.alertType = ""
+        self.push.publish('imu', self.get_imu_data_json())
         
-        if hasattr(self, 'last_print_time'):
-            if current_time - self.last_print_time > 1000:
-                cooldown_remaining = max(0, NOTIFICATION_COOLDOWN - (current_time - self.last_notification_time))
-                alert_status = f"{self.current_data.alertType}" if self.current_data.alert else "None"
-                logger.debug(f"Accel: {self.current_data.ax:.2f}, {self.current_data.ay:.2f}, {self.current_data.az:.2f} | "
-                      f"Gyro: {self.current_data.gx:.2f}, {self.current_data.gy:.2f}, {self.current_data.gz:.2f} | "
-                      f"Temp: {self.current_data.temp:.1f}°C | Alert: {alert_status} | "
-                      f"Cooldown: {cooldown_remaining/1000:.1f}s")
-                self.last_print_time = current_time
-        else:
-            self.last_print_time = current_time
+        alert_state = (self.current_data.alert, self.current_data.alertType)
+        if alert_state != self.last_pushed_alert:
+            self.push.publish('alert', {
+                "alert": alert_state[0],
+                "alertType": alert_state[1],
+                "previousAlertType": self.last_pushed_alert[1],
+                "fall": self.last_fall if alert_state[1] == "fall" else None,
+                "timestamp": int(time.time() * 1000)
+            })
+            self.last_pushed_alert = alert_state
     
     def trigger_loud_buzzer(self):
         
@@ -1885,17 +2101,16 @@ class GuardItIMUServer:
                 "error": str(e)
             }
     
-    def main_loop(self):
-        
-        while self.running:
-            current_time = time.time() * 1000
-            
-            if current_time - self.last_data_time >= DATA_INTERVAL:
+    def sample_imu(self):
+        """Scheduled IMU tick: read, detect events and push to clients"""
+        with self.imu_lock:
+            if self.fifo:
+                self.read_imu_fifo()
+            else:
                 self.read_imu_data()
-                self.detect_events()
-                self.last_data_time = current_time
-            
-            time.sleep(0.01)
+            self.detect_events()
+        self.last_data_time = time.time() * 1000
+        self.push_imu_state()
     
     def run_server(self):
         
@@ -1910,23 +2125,37 @@ class GuardItIMUServer:
         finally:
             self.cleanup()
     
-    def cleanup(self):
+    def _cleanup_step(self, name, step):
         
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"❌ Cleanup of {name} failed: {e}")
+    
+    def cleanup(self):
+        """Release everything; a failing step must not skip the rest (e.g. flushing the recorder)"""
         self.running = False
+        self._cleanup_step("scheduler", self.scheduler.stop)
+        self._cleanup_step("push channel", self.push.stop)
+        
+        if self.fifo:
+            self._cleanup_step("IMU FIFO", self.fifo.disable)
+        if self.bus:
+            self._cleanup_step("I2C bus", self.bus.close)
+            self.bus = None
+        if self.recorder:
+            self._cleanup_step("IMU recorder", self.recorder.close)
         
         if self.camera:
-            if self.camera.streaming:
-                self.camera.stop_streaming()
-            if self.camera.csi_streaming:
-                self.camera.stop_csi_streaming()
-            self.camera.cleanup()
+            # Stops streaming, the detection thread and the detection worker processes
+            self._cleanup_step("camera", self.camera.cleanup)
         
         if self.buzzer:
-            self.buzzer.cleanup()
+            self._cleanup_step("buzzer", self.buzzer.cleanup)
         if self.led:
-            self.led.cleanup()
+            self._cleanup_step("LED", self.led.cleanup)
         
-        GPIO.cleanup()
+        self._cleanup_step("GPIO", GPIO.cleanup)
 
 def main():
     
@@ -1947,10 +2176,8 @@ def main():
     finally:
         try:
             if 'server' in locals() and hasattr(server, 'camera') and server.camera:
-                if server.camera.streaming:
-                    server.camera.stop_streaming()
-                if server.camera.csi_streaming:
-                    server.camera.stop_csi_streaming()
+                # Stops streaming, the detection thread and the detection worker processes
+                server.camera.cleanup()
             
             GPIO.cleanup()
             logger.info("🧹 Cleanup completed")
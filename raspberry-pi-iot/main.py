@@ -13,7 +13,7 @@ from pydantic import BaseModel
 from src.mpu9250 import MPU9250
 from src.hardware_controller import HardwareController, Colors, Notes
 from src.camera_manager import CameraManager
-from config import ServerConfig, SensorConfig
+from config import ServerConfig, SensorConfig, MagnetometerConfig
 
 logging.basicConfig(
     level=logging.INFO,
@@ -110,7 +110,7 @@ async def broadcast_sensor_data():
                         except Exception:
                             disconnected_clients.add(client)
                     
-                    websocket_clients -= disconnected_clients
+                    websocket_clients.difference_update(disconnected_clients)
             
             await asyncio.sleep(1.0 / SensorConfig.IMU_SAMPLE_RATE)
             
@@ -190,6 +190,20 @@ async def get_imu_data():
         logger.error(f"Error reading IMU data: {e}")
         raise HTTPException(status_code=500, detail="Failed to read IMU data")
 
+@app.post("/imu/magnetometer/calibrate")
+async def calibrate_magnetometer(duration: float = MagnetometerConfig.CALIBRATION_SECONDS):
+    if not imu_sensor or not imu_sensor.is_initialized or not imu_sensor.mag_available:
+        raise HTTPException(status_code=503, detail="Magnetometer not available")
+    
+    try:
+        calibration = await imu_sensor.calibrate_magnetometer(duration)
+        return {
+            "status": "success",
+            "calibration": calibration
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/led")
 async def control_led(request: LEDRequest):
     
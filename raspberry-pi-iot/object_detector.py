@@ -5,18 +5,34 @@ from collections import deque
 import threading
 import logging
 
+from config import ROIDetectionConfig
+from src.detection_roi import plan_crops
+from src.dnn_detector import DNNPersonDetector, load_dnn_models
+from src.motion_gate import MotionGate
+from src.person_tracker import PersonTracker
+
 logger = logging.getLogger(__name__)
 
 class GuardItPersonDetector:
 
+    # Models that scan the whole frame and are worth skipping on static scenes
+    # (DNN models too); background subtraction must see every frame to keep its model current
+    GATED_MODELS = ('hog', 'cascade')
+    
+    # Box colour, line thickness and label per proximity class
+    PROXIMITY_STYLES = {
+        'too_close': ((0, 0, 255), 3, "TOO CLOSE!"),
+        'close': ((0, 165, 255), 2, "CLOSE"),
+        'safe': ((0, 255, 0), 2, "SAFE")
+    }
+
     def __init__(self):
         self.detection_enabled = True
         self.person_detected = False
         self.last_detection_time = 0
         self.detection_cooldown = 2000
         self.detection_threshold = 0.3
-        self.person_tracks = {}
-        self.track_id = 0
+        self.tracker = PersonTracker()
         self.last_cleanup_time = 0
         self.cleanup_interval = 5000
         
@@ -27,6 +43,14 @@ class GuardItPersonDetector:
         self.close_distance_threshold = 0.4  # Objects closer than 40% of frame trigger alert (more sensitive)
         self.minimum_object_size = 0.08  # Lower minimum size ratio (more sensitive)
         
+        self.motion_gate = MotionGate()
+        self.hog_passes = 0
+        self.hog_full_passes = 0
+        self.hog_roi_passes = 0
+        self.hog_scanned_area = 0.0
+        self.hog_time = 0.0
+        self.model_latency = {}
+        
         self.models = {}
         self._initialize_models()
         
@@ -60,28 +84,47 @@ class GuardItPersonDetector:
             logger.info("✅ Background Subtraction detector loaded")
         except Exception as e:
             logger.warning(f"❌ Failed to load Background Subtraction: {e}")
-    
-    def detect_person(self, frame):
         
+        for name, net in load_dnn_models().items():
+            self.models[name] = net
+            logger.info(f"✅ DNN detector '{name}' loaded")
+    
+    def detect_person(self, frame, regions=None):
+        """Detect people, optionally scanning only around ``regions`` (x1, y1, x2, y2)"""
         if not self.detection_enabled or self.current_model not in self.models:
             return False, [], 0.0
         
+        model = self.current_model
+        started = time.perf_counter()
         try:
-            if self.current_model == 'hog':
-                return self._detect_hog(frame)
-            elif self.current_model == 'cascade':
+            if model == 'hog':
+                return self._detect_hog(frame, regions)
+            elif model == 'cascade':
                 return self._detect_cascade(frame)
-            elif self.current_model == 'background':
+            elif model == 'background':
                 return self._detect_background(frame)
+            elif isinstance(self.models[model], DNNPersonDetector):
+                return self.models[model].detect(frame)
         except Exception as e:
             logger.error(f"Detection error: {e}")
             return False, [], 0.0
+        finally:
+            self.record_latency(model, (time.perf_counter() - started) * 1000)
         
         return False, [], 0.0
     
-    def _detect_hog(self, frame):
+    def record_latency(self, model, detect_ms):
+        """Per-model detector run time, also fed results computed in worker processes"""
+        stats = self.model_latency.setdefault(model, {'frames': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+        stats['frames'] += 1
+        stats['total_ms'] += detect_ms
+        stats['max_ms'] = max(stats['max_ms'], detect_ms)
+        stats['last_ms'] = detect_ms
+    
+    def _detect_hog(self, frame, regions=None):
         
         try:
+            started = time.perf_counter()
             height, width = frame.shape[:2]
             scale_factor = min(640 / width, 480 / height)
             if scale_factor < 1.0:
@@ -92,24 +135,48 @@ class GuardItPersonDetector:
                 frame_resized = frame
                 scale_factor = 1.0
             
-            boxes, weights = self.models['hog'].detectMultiScale(
-                frame_resized, 
-                winStride=(8, 8),
-                padding=(8, 8),
-                scale=1.05,
-                useMeanshiftGrouping=False
-            )
+            # Scan only around the changed areas, with a periodic full-frame pass
+            # so people who stopped moving are not lost
+            resized_height, resized_width = frame_resized.shape[:2]
+            self.hog_passes += 1
+            crops = None
+            if regions and self.hog_passes % ROIDetectionConfig.FULL_FRAME_EVERY != 0:
+                scaled_regions = [tuple(int(v * scale_factor) for v in region) for region in regions]
+                crops = plan_crops(scaled_regions, resized_width, resized_height)
+            if crops is None:
+                crops = [(0, 0, resized_width, resized_height)]
+                self.hog_full_passes += 1
+            else:
+                self.hog_roi_passes += 1
+            self.hog_scanned_area += (sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in crops) /
+                                      (resized_width * resized_height))
             
-            if len(boxes) > 0:
+            all_boxes = []
+            all_weights = []
+            for x1, y1, x2, y2 in crops:
+                boxes, weights = self.models['hog'].detectMultiScale(
+                    frame_resized[y1:y2, x1:x2], 
+                    winStride=(8, 8),
+                    padding=(8, 8),
+                    scale=1.05,
+                    useMeanshiftGrouping=False
+                )
+                for (x, y, w, h), weight in zip(boxes, np.ravel(weights)):
+                    all_boxes.append([x + x1, y + y1, w, h])
+                    all_weights.append(float(weight))
+            self.hog_time += time.perf_counter() - started
+            
+            if len(all_boxes) > 0:
+                boxes = np.array(all_boxes)
                 if scale_factor != 1.0:
                     boxes = boxes / scale_factor
                     boxes = boxes.astype(int)
                 
                 converted_boxes = []
-                for (x, y, w, h) in boxes:
+                for (x, y, w, h) in boxes.tolist():
                     converted_boxes.append([x, y, x + w, y + h])
                 
-                max_confidence = float(np.max(weights)) if len(weights) > 0 else 1.0
+                max_confidence = max(all_weights) if all_weights else 1.0
                 return True, converted_boxes, max_confidence
         
         except Exception as e:
@@ -178,11 +245,59 @@ class GuardItPersonDetector:
         
         return False, [], 0.0
     
-    def process_detection(self, frame):
-        """Enhanced detection with proximity alerts"""
+    def _is_gated(self):
+        
+        return (self.current_model in self.GATED_MODELS or
+                isinstance(self.models.get(self.current_model), DNNPersonDetector))
+    
+    def should_detect(self, frame):
+        """Motion gate check: False when nothing in the scene has changed"""
+        if not self._is_gated() or self.motion_gate.check(frame):
+            return True
+        # A static scene still contains whoever was tracked in it
+        self.tracker.hold(time.time())
+        return False
+    
+    def detection_regions(self):
+        """Changed areas of the last gated frame plus where tracked people are
+        expected, or None to scan the whole frame"""
+        if not self._is_gated() or self.motion_gate.regions is None:
+            return None
+        return self.motion_gate.regions + [tuple(box) for box in self.tracker.boxes_at(time.time())]
+    
+    def process_detection(self, frame, annotate=False):
+        """Enhanced detection with proximity alerts; draws on a copy only if ``annotate``"""
         current_time = time.time() * 1000
         
-        detected, boxes, confidence = self.detect_person(frame)
+        # Skip the detector when nothing in the scene has changed
+        if not self.should_detect(frame):
+            return False, frame
+        
+        detected, boxes, confidence = self.detect_person(frame, self.detection_regions())
+        alert_triggered, proximity_alert = self.evaluate_detection(frame.shape, detected, boxes,
+                                                                   confidence, current_time)
+        
+        processed_frame = frame
+        if annotate:
+            processed_frame = self._draw_detections(frame, boxes, detected, confidence, proximity_alert)
+        
+        # Return both alert types
+        return alert_triggered or proximity_alert, processed_frame
+    
+    def evaluate_detection(self, frame_shape, detected, boxes, confidence, current_time=None,
+                           frame_time=None):
+        """Apply alert thresholds and cooldowns to one detection result.
+        
+        Returns (alert_triggered, proximity_alert). Kept separate from
+        ``detect_person`` so results computed in worker processes update the
+        same alert and track state. ``frame_time`` is the frame's capture
+        time in seconds, used to place the result on the track timeline.
+        """
+        if current_time is None:
+            current_time = time.time() * 1000
+        
+        self.tracker.update(boxes if detected else [], confidence,
+                            frame_time if frame_time is not None else current_time / 1000, frame_shape)
         
         alert_triggered = False
         proximity_alert = False
@@ -199,25 +314,21 @@ class GuardItPersonDetector:
         
         # Proximity detection alert
         if detected and self.proximity_alert_enabled:
-            proximity_alert = self._check_proximity_alert(frame, boxes, current_time)
-        
-        # Draw detections on frame
-        processed_frame = self._draw_detections(frame, boxes, detected, confidence, proximity_alert)
+            proximity_alert = self._check_proximity_alert(frame_shape, boxes, current_time)
         
         # Cleanup old tracks
         if (current_time - self.last_cleanup_time) > self.cleanup_interval:
             self._cleanup_tracks(current_time)
             self.last_cleanup_time = current_time
         
-        # Return both alert types
-        return alert_triggered or proximity_alert, processed_frame
+        return alert_triggered, proximity_alert
     
-    def _check_proximity_alert(self, frame, boxes, current_time):
+    def _check_proximity_alert(self, frame_shape, boxes, current_time):
         """Check if any detected object is too close to the camera"""
         if not boxes:
             return False
             
-        frame_height, frame_width = frame.shape[:2]
+        frame_height, frame_width = frame_shape[:2]
         frame_area = frame_width * frame_height
         
         # Check each detected object for proximity
@@ -247,43 +358,42 @@ class GuardItPersonDetector:
         
         return False
     
-    def _draw_detections(self, frame, boxes, detected, confidence, proximity_alert=False):
+    def proximity_class(self, box, frame_shape):
+        """('too_close' | 'close' | 'safe', size ratio) from the box's share of the frame"""
+        x1, y1, x2, y2 = box
+        frame_height, frame_width = frame_shape[:2]
+        size_ratio = (x2 - x1) * (y2 - y1) / (frame_width * frame_height)
+        
+        # Larger objects in frame = closer to camera
+        if size_ratio > self.close_distance_threshold:
+            return 'too_close', size_ratio
+        elif size_ratio > (self.close_distance_threshold * 0.6):  # 60% of threshold
+            return 'close', size_ratio
+        return 'safe', size_ratio
+    
+    def annotate_frame(self, frame, tracks, proximity_alert=False):
+        """Copy of ``frame`` with tracked people drawn on it, for clients that ask for it"""
+        boxes = [track['box'] for track in tracks]
+        labels = [f"Person #{track['id']} ({track['confidence']:.2f})" for track in tracks]
+        return self._draw_detections(frame, boxes, bool(tracks), 0.0, proximity_alert, labels)
+    
+    def _draw_detections(self, frame, boxes, detected, confidence, proximity_alert=False, labels=None):
         """Enhanced drawing with proximity indicators"""
         frame_copy = frame.copy()
-        frame_height, frame_width = frame.shape[:2]
-        frame_area = frame_width * frame_height
         
         for i, box in enumerate(boxes):
             x1, y1, x2, y2 = box
             
-            # Calculate object size for proximity indication
-            obj_width = x2 - x1
-            obj_height = y2 - y1
-            obj_area = obj_width * obj_height
-            size_ratio = obj_area / frame_area
-            
             # Choose color based on proximity
-            if size_ratio > self.close_distance_threshold:
-                # Red for objects that are too close
-                color = (0, 0, 255)
-                thickness = 3
-                proximity_text = "TOO CLOSE!"
-            elif size_ratio > (self.close_distance_threshold * 0.6):  # 60% of threshold
-                # Orange for moderately close objects
-                color = (0, 165, 255)
-                thickness = 2
-                proximity_text = "CLOSE"
-            else:
-                # Green for distant objects
-                color = (0, 255, 0)
-                thickness = 2
-                proximity_text = "SAFE"
+            proximity, size_ratio = self.proximity_class(box, frame.shape)
+            color, thickness, proximity_text = self.PROXIMITY_STYLES[proximity]
             
             # Draw bounding box
             cv2.rectangle(frame_copy, (x1, y1), (x2, y2), color, thickness)
             
             # Draw detection info
-            cv2.putText(frame_copy, f"Person ({confidence:.2f})", 
+            label = labels[i] if labels else f"Person ({confidence:.2f})"
+            cv2.putText(frame_copy, label, 
                        (x1, y1 - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
             
             # Draw proximity info
@@ -306,14 +416,16 @@ class GuardItPersonDetector:
     
     def _cleanup_tracks(self, current_time):
         
-        tracks_to_remove = []
-        for track_id, track_data in self.person_tracks.items():
-            if hasattr(track_data, 'last_seen'):
-                if (current_time - track_data['last_seen']) > 10000:
-                    tracks_to_remove.append(track_id)
-        
-        for track_id in tracks_to_remove:
-            del self.person_tracks[track_id]
+        self.tracker.prune(current_time / 1000)
+    
+    def get_tracks(self, timestamp=None):
+        """Tracked people with boxes predicted to ``timestamp`` (seconds, default now)"""
+        tracks = self.tracker.tracks_at(time.time() if timestamp is None else timestamp)
+        if self.tracker.frame_size:
+            width, height = self.tracker.frame_size
+            for track in tracks:
+                track['proximity'] = self.proximity_class(track['box'], (height, width))[0]
+        return tracks
     
     def enable_detection(self):
         
@@ -343,12 +455,54 @@ class GuardItPersonDetector:
             'available_models': list(self.models.keys()),
             'person_detected': self.person_detected,
             'last_detection_time': self.last_detection_time,
-            'active_tracks': len(self.person_tracks),
+            'active_tracks': len(self.tracker),
+            'tracker': self.tracker.get_stats(),
             'proximity_alert_enabled': self.proximity_alert_enabled,
             'proximity_threshold': self.close_distance_threshold,
-            'last_proximity_alert': self.last_proximity_alert_time
+            'last_proximity_alert': self.last_proximity_alert_time,
+            'motion_gate': self.motion_gate.get_stats(),
+            'hog': self.get_hog_stats(),
+            'latency': self.get_latency_stats(),
+            'dnn': {name: model.get_stats() for name, model in self.models.items()
+                    if isinstance(model, DNNPersonDetector)}
+        }
+    
+    def get_hog_stats(self):
+        
+        passes = self.hog_passes or 1
+        return {
+            'passes': self.hog_passes,
+            'full_frame_passes': self.hog_full_passes,
+            'roi_passes': self.hog_roi_passes,
+            'avg_scanned_area': round(self.hog_scanned_area / passes, 3),
+            'avg_detect_ms': round(self.hog_time / passes * 1000, 1)
         }
     
+    def get_latency_stats(self):
+        
+        return {model: {
+            'frames': stats['frames'],
+            'avg_ms': round(stats['total_ms'] / stats['frames'], 1),
+            'max_ms': round(stats['max_ms'], 1),
+            'last_ms': round(stats['last_ms'], 1)
+        } for model, stats in self.model_latency.items()}
+    
+    def set_motion_gate(self, enabled=None, pixel_threshold=None, min_changed_ratio=None):
+        """Enable/disable or tune the motion gate in front of the detector"""
+        if pixel_threshold is not None and not 0 < pixel_threshold < 255:
+            return False
+        if min_changed_ratio is not None and not 0.0 <= min_changed_ratio <= 1.0:
+            return False
+        
+        if enabled is not None:
+            self.motion_gate.enabled = bool(enabled)
+        if pixel_threshold is not None:
+            self.motion_gate.pixel_threshold = pixel_threshold
+        if min_changed_ratio is not None:
+            self.motion_gate.min_changed_ratio = min_changed_ratio
+        logger.info(f"Motion gate updated: {self.motion_gate.get_stats()}")
+        return True
+    
     def set_proximity_threshold(self, threshold):
         """Set proximity alert threshold (0.0 - 1.0)"""
         if 0.0 <= threshold <= 1.0:
@@ -5,6 +5,7 @@ import threading
 from typing import Optional, Iterator
 import time
 from config import CameraConfig
+from src.hardware import open_video_capture
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,7 @@ class CameraManager:
         success = True
         
         try:
-            self.csi_camera = cv2.VideoCapture(CameraConfig.CSI_CAMERA_INDEX)
+            self.csi_camera = open_video_capture(CameraConfig.CSI_CAMERA_INDEX, cv2.CAP_ANY)
             if self.csi_camera.isOpened():
                 self.csi_camera.set(cv2.CAP_PROP_FRAME_WIDTH, CameraConfig.FRAME_WIDTH)
                 self.csi_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CameraConfig.FRAME_HEIGHT)
@@ -40,7 +41,7 @@ class CameraManager:
             success = False
         
         try:
-            self.usb_camera = cv2.VideoCapture(CameraConfig.USB_CAMERA_INDEX)
+            self.usb_camera = open_video_capture(CameraConfig.USB_CAMERA_INDEX, cv2.CAP_ANY)
             if self.usb_camera.isOpened():
                 self.usb_camera.set(cv2.CAP_PROP_FRAME_WIDTH, CameraConfig.FRAME_WIDTH)
                 self.usb_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CameraConfig.FRAME_HEIGHT)
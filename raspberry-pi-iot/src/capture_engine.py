@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+from config import USBCaptureConfig
+from src.frame_ring import FrameRing, FrameSnapshot
+from src.hardware import open_video_capture
+
+logger = logging.getLogger(__name__)
+
+class CaptureEngine:
+    """Owns one cv2.VideoCapture device and publishes sequence-numbered frames.
+
+    A single background thread reads the device into a FrameRing; every
+    consumer (HTTP endpoints, detection) reads from that ring or registers
+    a listener instead of opening the device itself.
+    """
+
+    def __init__(self, device_id: int,
+                 width: int = USBCaptureConfig.WIDTH,
+                 height: int = USBCaptureConfig.HEIGHT,
+                 fps: int = USBCaptureConfig.FPS,
+                 fourcc: str = USBCaptureConfig.FOURCC,
+                 jpeg_quality: int = USBCaptureConfig.JPEG_QUALITY):
+
+        self.device_id = device_id
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.ring = FrameRing(jpeg_quality=jpeg_quality)
+
+        self.running = False
+        self.thread = None
+        self._listeners: List[Callable[[FrameSnapshot], None]] = []
+
+        self.started_at = 0.0
+        self.frames_captured = 0
+        self.read_errors = 0
+        self.reopen_count = 0
+        self.last_read_ms = 0.0
+
+    def add_listener(self, callback: Callable[[FrameSnapshot], None]):
+
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[FrameSnapshot], None]):
+
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self) -> bool:
+
+        if self.running:
+            return True
+
+        self.running = True
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=3)
+        self.thread = None
+        self.ring.wake_all()
+
+    def _open(self):
+
+        cap = open_video_capture(self.device_id, cv2.CAP_V4L2)
+        if not cap.isOpened():
+            cap.release()
+            return None
+
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, USBCaptureConfig.BUFFER_SIZE)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+
+        # Fixed exposure/focus/white balance keep frame timing stable
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1)
+        cap.set(cv2.CAP_PROP_EXPOSURE, USBCaptureConfig.EXPOSURE)
+        cap.set(cv2.CAP_PROP_AUTOFOCUS, 0)
+        cap.set(cv2.CAP_PROP_AUTO_WB, 0)
+        cap.set(cv2.CAP_PROP_GAIN, 0)
+        return cap
+
+    def _run(self):
+
+        logger.info(f"📹 Capture engine started on device {self.device_id} "
+                    f"({self.width}x{self.height} {self.fourcc} @ {self.fps} FPS)")
+        cap = None
+        frame = None
+        consecutive_errors = 0
+
+        try:
+            while self.running:
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        logger.error(f"Failed to open camera device {self.device_id}")
+                        time.sleep(USBCaptureConfig.REOPEN_DELAY)
+                        continue
+
+                read_start = time.monotonic()
+                for _ in range(USBCaptureConfig.GRAB_SKIP):
+                    cap.grab()
+                # Reuse the previous read buffer; the ring copies into its own slots
+                ret, frame = cap.read(frame)
+
+                if not ret or frame is None:
+                    self.read_errors += 1
+                    consecutive_errors += 1
+                    if consecutive_errors >= USBCaptureConfig.MAX_CONSECUTIVE_ERRORS:
+                        logger.warning(f"⚠️ Camera device {self.device_id} stalled - reopening")
+                        cap.release()
+                        cap = None
+                        consecutive_errors = 0
+                        self.reopen_count += 1
+                        time.sleep(USBCaptureConfig.REOPEN_DELAY)
+                    else:
+                        time.sleep(0.005)
+                    frame = None
+                    continue
+
+                consecutive_errors = 0
+                self.last_read_ms = (time.monotonic() - read_start) * 1000
+                self._publish(frame)
+
+        except Exception as e:
+            logger.error(f"Capture engine error on device {self.device_id}: {e}")
+        finally:
+            if cap is not None:
+                cap.release()
+            self.running = False
+            logger.info(f"📹 Capture engine stopped after {self.frames_captured} frames")
+
+    def _publish(self, frame: np.ndarray):
+
+        seq = self.ring.publish(frame=frame)
+        self.frames_captured += 1
+
+        if self._listeners:
+            snapshot = self.ring.get(seq)
+            if snapshot is None:
+                return
+            for listener in self._listeners:
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    logger.debug(f"Capture listener error: {e}")
+
+    def latest(self) -> Optional[FrameSnapshot]:
+
+        return self.ring.latest()
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[FrameSnapshot]:
+
+        return self.ring.wait_for(after_seq, timeout)
+
+    def encode_jpeg(self, snapshot: Optional[FrameSnapshot]) -> Optional[bytes]:
+
+        return self.ring.get_jpeg(snapshot)
+
+    def latest_jpeg(self) -> Optional[bytes]:
+
+        return self.ring.latest_jpeg()
+
+    def get_stats(self) -> dict:
+
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        latest = self.ring.latest()
+        return {
+            'device_id': self.device_id,
+            'running': self.running,
+            'width': self.width,
+            'height': self.height,
+            'fourcc': self.fourcc,
+            'frames': self.frames_captured,
+            'fps': round(self.frames_captured / elapsed, 1) if elapsed > 0 else 0.0,
+            'latest_seq': latest.seq if latest else 0,
+            'frame_age_ms': round((time.time() - latest.timestamp) * 1000, 1) if latest else None,
+            'read_ms': round(self.last_read_ms, 1),
+            'read_errors': self.read_errors,
+            'reopens': self.reopen_count,
+            'ring': self.ring.get_stats()
+        }
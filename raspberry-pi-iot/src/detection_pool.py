@@ -0,0 +1,277 @@
+"""Person detection in worker processes fed through shared memory.
+
+Each worker owns one slot of a shared-memory block sized for the largest
+frame. The server copies a frame into an idle worker's slot and sends only
+a small task tuple (sequence number, shape, model, regions) over that
+worker's queue; the worker runs the detector on a NumPy view of the slot
+and returns a ``DetectionResult`` tagged with the frame's sequence number.
+When every worker is busy the frame is dropped rather than queued, so
+results always refer to recent frames. Workers that die, or spend longer
+than ``TASK_TIMEOUT`` on one frame, are restarted.
+"""
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from config import DetectionPoolConfig
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DetectionResult:
+
+    seq: int
+    timestamp: float
+    shape: Tuple[int, ...]
+    detected: bool
+    boxes: list
+    confidence: float
+    model: str
+    worker: int
+    detect_ms: float
+    hog_stats: dict = field(default_factory=dict)
+
+def _worker_main(worker_id: int, shm_name: str, offset: int, tasks, results):
+
+    # Ctrl-C is handled by the server, which stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    import cv2
+    cv2.setNumThreads(1)
+    from object_detector import GuardItPersonDetector
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    detector = GuardItPersonDetector()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, timestamp, shape, dtype, model, regions = task
+            if detector.current_model != model:
+                detector.set_model(model)
+
+            frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            started = time.perf_counter()
+            detected, boxes, confidence = detector.detect_person(frame, regions)
+            detect_ms = (time.perf_counter() - started) * 1000
+            del frame
+
+            results.put(DetectionResult(seq, timestamp, tuple(shape), bool(detected),
+                                        [[int(v) for v in box] for box in boxes], float(confidence),
+                                        model, worker_id, detect_ms, detector.get_hog_stats()))
+    finally:
+        shm.close()
+
+class _Worker:
+
+    def __init__(self, worker_id: int, offset: int):
+
+        self.id = worker_id
+        self.offset = offset
+        self.process = None
+        self.tasks = None
+        self.busy_seq: Optional[int] = None
+        self.task_started = 0.0
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.completed = 0
+        self.total_detect_ms = 0.0
+        self.hog_stats = {}
+
+class DetectionPool:
+
+    def __init__(self, on_result: Callable[[DetectionResult], None],
+                 workers: int = DetectionPoolConfig.WORKERS,
+                 max_frame_bytes: int = DetectionPoolConfig.MAX_FRAME_BYTES,
+                 task_timeout: float = DetectionPoolConfig.TASK_TIMEOUT):
+
+        self.on_result = on_result
+        self.task_timeout = task_timeout
+        self.slot_bytes = max_frame_bytes
+        # spawn, not fork: the server process is full of threads and open devices
+        self._ctx = mp.get_context('spawn')
+        self._shm = shared_memory.SharedMemory(create=True, size=max_frame_bytes * workers)
+        self._results = self._ctx.Queue()
+        self._workers = [_Worker(i, i * max_frame_bytes) for i in range(workers)]
+        self._lock = threading.Lock()
+        self._collector = None
+        self.running = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped_busy = 0
+        self.dropped_oversize = 0
+        self.dropped_torn = 0
+        self.crashes = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.last_seq = 0
+
+    def _spawn(self, worker: _Worker):
+
+        worker.tasks = self._ctx.Queue()
+        worker.process = self._ctx.Process(target=_worker_main, name=f"detector-{worker.id}",
+                                           args=(worker.id, self._shm.name, worker.offset,
+                                                 worker.tasks, self._results),
+                                           daemon=True)
+        worker.process.start()
+        worker.busy_seq = None
+        worker.started_at = time.monotonic()
+
+    def start(self):
+
+        self.running = True
+        for worker in self._workers:
+            self._spawn(worker)
+        self._collector = threading.Thread(target=self._collect, name="detection-results", daemon=True)
+        self._collector.start()
+        logger.info(f"🧠 Detection pool started with {len(self._workers)} worker process(es)")
+
+    def submit(self, frame: np.ndarray, seq: int, timestamp: float, model: str,
+               regions: Optional[list] = None, still_valid: Optional[Callable[[], bool]] = None) -> bool:
+        """Hand ``frame`` to an idle worker; False if it was dropped.
+
+        ``still_valid`` is called once the frame is in shared memory; if
+        ``frame`` is a view of a buffer that may have been overwritten during
+        the copy, it returns False and the torn copy is not detected.
+        """
+        if frame.nbytes > self.slot_bytes:
+            self.dropped_oversize += 1
+            return False
+
+        with self._lock:
+            worker = next((w for w in self._workers
+                           if w.busy_seq is None and w.process and w.process.is_alive()), None)
+            if worker is None:
+                self.dropped_busy += 1
+                return False
+            worker.busy_seq = seq
+            worker.task_started = time.monotonic()
+
+        slot = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf, offset=worker.offset)
+        slot[...] = frame
+        del slot
+        if still_valid is not None and not still_valid():
+            with self._lock:
+                worker.busy_seq = None
+            self.dropped_torn += 1
+            return False
+        worker.tasks.put((seq, timestamp, frame.shape, frame.dtype.str, model, regions))
+        self.submitted += 1
+        return True
+
+    def _collect(self):
+
+        while self.running:
+            try:
+                result = self._results.get(timeout=DetectionPoolConfig.POLL_INTERVAL)
+            except queue.Empty:
+                result = None
+            except (EOFError, OSError):
+                if not self.running:
+                    return
+                result = None
+
+            if result is not None:
+                worker = self._workers[result.worker]
+                with self._lock:
+                    # A worker killed for hanging may have finished just before; its
+                    # replacement could already be busy with another frame
+                    if worker.busy_seq == result.seq:
+                        worker.busy_seq = None
+                worker.completed += 1
+                worker.total_detect_ms += result.detect_ms
+                worker.hog_stats = result.hog_stats
+                self.completed += 1
+                self.last_seq = result.seq
+                try:
+                    self.on_result(result)
+                except Exception as e:
+                    logger.error(f"Detection result handler failed: {e}")
+
+            self._check_workers()
+
+    def _check_workers(self):
+
+        now = time.monotonic()
+        for worker in self._workers:
+            if not self.running:
+                return
+            if (worker.process is not None and worker.busy_seq is not None and
+                    now - worker.task_started > self.task_timeout and worker.process.is_alive()):
+                self.timeouts += 1
+                logger.warning(f"⚠️ Detection worker {worker.id} stuck on frame {worker.busy_seq} "
+                               f"for {now - worker.task_started:.1f}s - terminating")
+                worker.process.terminate()
+                worker.process.join(1.0)
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join(1.0)
+                worker.process = None
+                with self._lock:
+                    worker.busy_seq = None
+                worker.restart_at = now + DetectionPoolConfig.RESTART_DELAY
+            if worker.process is not None and not worker.process.is_alive():
+                self.crashes += 1
+                logger.warning(f"⚠️ Detection worker {worker.id} exited "
+                               f"(code {worker.process.exitcode}) - restarting")
+                worker.process = None
+                with self._lock:
+                    worker.busy_seq = None
+                worker.restart_at = now + DetectionPoolConfig.RESTART_DELAY
+            if worker.process is None and now >= worker.restart_at:
+                self._spawn(worker)
+                self.restarts += 1
+
+    def stop(self, timeout: float = 2.0):
+
+        self.running = False
+        try:
+            for worker in self._workers:
+                if worker.process and worker.process.is_alive():
+                    worker.tasks.put(None)
+            for worker in self._workers:
+                if worker.process:
+                    worker.process.join(timeout)
+                    if worker.process.is_alive():
+                        worker.process.terminate()
+                        worker.process.join(timeout)
+            if self._collector:
+                self._collector.join(timeout)
+        finally:
+            # Shared memory outlives the process unless unlinked, even if shutdown is interrupted
+            self._shm.close()
+            self._shm.unlink()
+
+    def get_stats(self) -> dict:
+
+        return {
+            'workers': len(self._workers),
+            'alive': sum(1 for w in self._workers if w.process and w.process.is_alive()),
+            'busy': sum(1 for w in self._workers if w.busy_seq is not None),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped_busy': self.dropped_busy,
+            'dropped_oversize': self.dropped_oversize,
+            'dropped_torn': self.dropped_torn,
+            'crashes': self.crashes,
+            'timeouts': self.timeouts,
+            'restarts': self.restarts,
+            'last_seq': self.last_seq,
+            'per_worker': [{
+                'id': w.id,
+                'pid': w.process.pid if w.process else None,
+                'completed': w.completed,
+                'avg_detect_ms': round(w.total_detect_ms / w.completed, 1) if w.completed else 0.0,
+                'hog': w.hog_stats
+            } for w in self._workers]
+        }
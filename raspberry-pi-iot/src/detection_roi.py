@@ -0,0 +1,84 @@
+"""Turn motion regions into detector-sized crops.
+
+Regions are (x1, y1, x2, y2) in pixels of the image the detector scans.
+Each one is grown so a whole person fits around the part that moved,
+padded to at least one detection window, aligned to the HOG cell grid,
+and overlapping crops are merged so no area is scanned twice.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from config import ROIDetectionConfig
+
+Region = Tuple[int, int, int, int]
+
+# Default people detector window and cell stride
+HOG_WINDOW = (64, 128)
+HOG_CELL = 8
+
+def expand_region(region: Region, width: int, height: int,
+                  window: Tuple[int, int] = HOG_WINDOW,
+                  expand_ratio: float = ROIDetectionConfig.EXPAND_RATIO,
+                  margin: int = ROIDetectionConfig.MARGIN,
+                  cell: int = HOG_CELL) -> Region:
+
+    x1, y1, x2, y2 = region
+    grow_x = max(margin, int((x2 - x1) * expand_ratio))
+    grow_y = max(margin, int((y2 - y1) * expand_ratio))
+    x1, y1, x2, y2 = x1 - grow_x, y1 - grow_y, x2 + grow_x, y2 + grow_y
+
+    # At least one window plus padding on each side, centred on the region
+    min_w, min_h = window[0] + 2 * margin, window[1] + 2 * margin
+    if x2 - x1 < min_w:
+        cx = (x1 + x2) // 2
+        x1, x2 = cx - min_w // 2, cx + min_w - min_w // 2
+    if y2 - y1 < min_h:
+        cy = (y1 + y2) // 2
+        y1, y2 = cy - min_h // 2, cy + min_h - min_h // 2
+
+    # Snap outwards to the cell grid, then shift back inside the image
+    x1, y1 = x1 // cell * cell, y1 // cell * cell
+    x2, y2 = -(-x2 // cell) * cell, -(-y2 // cell) * cell
+    if x1 < 0:
+        x1, x2 = 0, x2 - x1
+    if y1 < 0:
+        y1, y2 = 0, y2 - y1
+    if x2 > width:
+        x1, x2 = max(0, x1 - (x2 - width)), width
+    if y2 > height:
+        y1, y2 = max(0, y1 - (y2 - height)), height
+    return x1, y1, x2, y2
+
+def _overlaps(a: Region, b: Region) -> bool:
+
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def merge_regions(regions: Sequence[Region]) -> List[Region]:
+    """Union overlapping boxes until none overlap"""
+    merged = [tuple(region) for region in regions]
+    changed = True
+    while changed:
+        changed = False
+        result: List[Region] = []
+        for region in merged:
+            for i, other in enumerate(result):
+                if _overlaps(region, other):
+                    result[i] = (min(region[0], other[0]), min(region[1], other[1]),
+                                 max(region[2], other[2]), max(region[3], other[3]))
+                    changed = True
+                    break
+            else:
+                result.append(region)
+        merged = result
+    return merged
+
+def plan_crops(regions: Optional[Sequence[Region]], width: int, height: int,
+               window: Tuple[int, int] = HOG_WINDOW,
+               max_area_ratio: float = ROIDetectionConfig.MAX_AREA_RATIO) -> Optional[List[Region]]:
+    """Crops to scan, or None when a single full-frame pass is cheaper"""
+    if not regions:
+        return None
+    crops = merge_regions([expand_region(region, width, height, window) for region in regions])
+    area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in crops)
+    if area > max_area_ratio * width * height:
+        return None
+    return crops
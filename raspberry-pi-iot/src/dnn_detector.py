@@ -0,0 +1,166 @@
+"""CPU person detection with OpenCV's DNN module.
+
+A ``DNNPersonDetector`` wraps one network described by an entry of
+``DNNDetectorConfig.MODELS``. The input blob is allocated once at the
+configured batch size and refilled in place, so no blob is allocated per
+frame; each forward pass uses only as many slots as it has frames. The
+live detection path hands over one frame at a time, so ``batch_size``
+above 1 only pays off for offline ``detect_batch`` calls over many frames.
+Two output layouts are understood: SSD ``DetectionOutput`` rows
+(image_id, label, confidence, x1, y1, x2, y2 normalised) and the YOLOv8
+(4 + classes) x anchors tensor in input pixels.
+"""
+import logging
+import os
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from config import DNNDetectorConfig
+
+logger = logging.getLogger(__name__)
+
+Detection = Tuple[bool, List[List[int]], float]
+
+class DNNPersonDetector:
+
+    def __init__(self, name: str, spec: dict,
+                 model_dir: str = DNNDetectorConfig.MODEL_DIR,
+                 batch_size: int = DNNDetectorConfig.BATCH_SIZE,
+                 confidence: float = DNNDetectorConfig.CONFIDENCE,
+                 nms_threshold: float = DNNDetectorConfig.NMS_THRESHOLD):
+
+        self.name = name
+        self.output_format = spec['output']
+        self.person_class = spec['person_class']
+        self.batch_size = max(1, batch_size)
+        self.confidence = confidence
+        self.nms_threshold = nms_threshold
+
+        config_path = os.path.join(model_dir, spec['config']) if spec.get('config') else ''
+        self.net = cv2.dnn.readNet(os.path.join(model_dir, spec['model']), config_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.output_names = self.net.getUnconnectedOutLayersNames()
+
+        # Same preprocessing as cv2.dnn.blobFromImage, into buffers reused every frame
+        width, height = spec['size']
+        self.input_size = (width, height)
+        self.swap_rb = spec.get('swap_rb', False)
+        self.scale = np.float32(spec.get('scale', 1.0))
+        self.mean = np.asarray(spec.get('mean', 0.0), dtype=np.float32)
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._pixels = np.empty((height, width, 3), dtype=np.float32)
+        self._blob = np.zeros((self.batch_size, 3, height, width), dtype=np.float32)
+
+        self.frames = 0
+        self.batches = 0
+        self.total_time = 0.0
+        self.last_batch_ms = 0.0
+
+    def _fill(self, slot: int, frame: np.ndarray):
+
+        cv2.resize(frame, self.input_size, dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        pixels = self._pixels
+        np.copyto(pixels, self._resized[..., ::-1] if self.swap_rb else self._resized, casting='unsafe')
+        if self.mean.any():
+            np.subtract(pixels, self.mean, out=pixels)
+        np.multiply(pixels, self.scale, out=pixels)
+        np.copyto(self._blob[slot], pixels.transpose(2, 0, 1))
+
+    def detect(self, frame: np.ndarray) -> Detection:
+
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[Detection]:
+        """Detect people in each frame, ``batch_size`` frames per forward pass"""
+        results: List[Detection] = []
+        for start in range(0, len(frames), self.batch_size):
+            chunk = frames[start:start + self.batch_size]
+            started = time.perf_counter()
+            for slot, frame in enumerate(chunk):
+                self._fill(slot, frame)
+            # A short chunk (always, on the live path) must not pay for a full batch
+            self.net.setInput(self._blob[:len(chunk)])
+            outputs = self.net.forward(self.output_names)
+            if self.output_format == 'ssd':
+                results.extend(self._parse_ssd(outputs[0], chunk))
+            else:
+                results.extend(self._parse_yolo(outputs[0], chunk))
+
+            elapsed = time.perf_counter() - started
+            self.total_time += elapsed
+            self.last_batch_ms = elapsed * 1000
+            self.batches += 1
+            self.frames += len(chunk)
+        return results
+
+    def _parse_ssd(self, output: np.ndarray, frames: Sequence[np.ndarray]) -> List[Detection]:
+
+        rows = output.reshape(-1, 7)
+        rows = rows[(rows[:, 1] == self.person_class) & (rows[:, 2] >= self.confidence)]
+        results = []
+        for index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            mine = rows[rows[:, 0] == index]
+            boxes = []
+            for x1, y1, x2, y2 in np.clip(mine[:, 3:7], 0.0, 1.0).tolist():
+                boxes.append([int(x1 * width), int(y1 * height), int(x2 * width), int(y2 * height)])
+            confidence = float(mine[:, 2].max()) if len(mine) else 0.0
+            results.append((bool(boxes), boxes, confidence))
+        return results
+
+    def _parse_yolo(self, output: np.ndarray, frames: Sequence[np.ndarray]) -> List[Detection]:
+
+        input_width, input_height = self.input_size
+        results = []
+        for index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            predictions = output[index]
+            scores = predictions[4 + self.person_class]
+            keep = np.flatnonzero(scores >= self.confidence)
+            if len(keep) == 0:
+                results.append((False, [], 0.0))
+                continue
+
+            cx, cy, w, h = predictions[:4, keep]
+            sx, sy = width / input_width, height / input_height
+            xywh = np.stack([(cx - w / 2) * sx, (cy - h / 2) * sy, w * sx, h * sy], axis=1)
+            kept_scores = scores[keep]
+            indices = cv2.dnn.NMSBoxes(xywh.tolist(), kept_scores.tolist(), self.confidence, self.nms_threshold)
+
+            boxes = []
+            for i in np.ravel(indices):
+                x, y, bw, bh = xywh[i]
+                boxes.append([max(0, int(x)), max(0, int(y)), min(width, int(x + bw)), min(height, int(y + bh))])
+            confidence = float(kept_scores[np.ravel(indices)].max()) if boxes else 0.0
+            results.append((bool(boxes), boxes, confidence))
+        return results
+
+    def get_stats(self) -> dict:
+
+        return {
+            'batch_size': self.batch_size,
+            'input_size': list(self.input_size),
+            'frames': self.frames,
+            'batches': self.batches,
+            'avg_batch_ms': round(self.total_time / self.batches * 1000, 1) if self.batches else 0.0,
+            'avg_frame_ms': round(self.total_time / self.frames * 1000, 1) if self.frames else 0.0,
+            'last_batch_ms': round(self.last_batch_ms, 1)
+        }
+
+def load_dnn_models(model_dir: str = DNNDetectorConfig.MODEL_DIR) -> Dict[str, DNNPersonDetector]:
+    """Every configured model whose files are present in ``model_dir``"""
+    models = {}
+    for name, spec in DNNDetectorConfig.MODELS.items():
+        files = [spec['model']] + ([spec['config']] if spec.get('config') else [])
+        if not all(os.path.exists(os.path.join(model_dir, f)) for f in files):
+            logger.debug(f"DNN model '{name}' not found in {model_dir}")
+            continue
+        try:
+            models[name] = DNNPersonDetector(name, spec, model_dir)
+        except Exception as e:
+            logger.warning(f"❌ Failed to load DNN model '{name}': {e}")
+    return models
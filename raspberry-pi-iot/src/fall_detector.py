@@ -0,0 +1,161 @@
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import numpy as np
+
+from config import FallDetectorConfig
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each phase in the confidence of a fall that passed the free-fall check
+FREE_FALL_WEIGHT = 0.3
+IMPACT_WEIGHT = 0.4
+STILLNESS_WEIGHT = 0.3
+
+@dataclass
+class FallEvent:
+
+    timestamp: float
+    confidence: float
+    impact_g: float
+    free_fall_ms: float
+    stillness_g: float
+
+    def to_dict(self) -> dict:
+
+        data = asdict(self)
+        data['timestamp'] = int(self.timestamp * 1000)
+        return data
+
+class FallDetector:
+    """Sliding-window fall detector over the accelerometer magnitude stream.
+
+    A fall is an impact peak preceded by a free-fall phase and followed by
+    stillness near 1 g. Each batch is appended to a short magnitude window
+    and every impact whose post-impact window is complete is scored with
+    vectorised NumPy operations; detections carry a 0-1 confidence.
+    """
+
+    def __init__(self, sample_rate: float,
+                 free_fall_threshold: float = FallDetectorConfig.FREE_FALL_THRESHOLD,
+                 free_fall_min_duration: float = FallDetectorConfig.FREE_FALL_MIN_DURATION,
+                 impact_threshold: float = FallDetectorConfig.IMPACT_THRESHOLD,
+                 impact_window: float = FallDetectorConfig.IMPACT_WINDOW,
+                 stillness_delay: float = FallDetectorConfig.STILLNESS_DELAY,
+                 stillness_duration: float = FallDetectorConfig.STILLNESS_DURATION,
+                 stillness_tolerance: float = FallDetectorConfig.STILLNESS_TOLERANCE,
+                 min_confidence: float = FallDetectorConfig.MIN_CONFIDENCE):
+
+        self.free_fall_threshold = free_fall_threshold
+        self.free_fall_min_duration = free_fall_min_duration
+        self.impact_threshold = impact_threshold
+        self.stillness_tolerance = stillness_tolerance
+        self.min_confidence = min_confidence
+        self.impact_window = impact_window
+        self.stillness_delay = stillness_delay
+        self.stillness_duration = stillness_duration
+
+        self._evaluated = 0
+        self.total_samples = 0
+        self.set_sample_rate(sample_rate)
+
+        self.candidates = 0
+        self.detections = 0
+        self.last_event: Optional[FallEvent] = None
+
+    def set_sample_rate(self, sample_rate: float):
+        """Resize the sample windows; buffered samples at the old rate are discarded"""
+        self.sample_rate = sample_rate
+        self.pre_samples = max(1, int(round(self.impact_window * sample_rate)))
+        self.delay_samples = int(round(self.stillness_delay * sample_rate))
+        self.still_samples = max(1, int(round(self.stillness_duration * sample_rate)))
+        self.post_samples = self.delay_samples + self.still_samples
+        self._window = np.empty(0, dtype=np.float32)
+
+    def update(self, accel_magnitude: np.ndarray, end_time: Optional[float] = None) -> Optional[FallEvent]:
+        """Feed a batch of accel magnitudes (g); returns a FallEvent when one completes"""
+        if end_time is None:
+            end_time = time.time()
+
+        window = np.concatenate((self._window, accel_magnitude.astype(np.float32, copy=False)))
+        self.total_samples += len(accel_magnitude)
+        window_start = self.total_samples - len(window)
+
+        # Impacts are only scored once their stillness window has arrived
+        first = max(self._evaluated, window_start + self.pre_samples)
+        last = self.total_samples - self.post_samples
+        event = None
+
+        if last > first:
+            segment = window[first - window_start:last - window_start]
+            impacts = np.flatnonzero(segment > self.impact_threshold)
+            if len(impacts):
+                self.candidates += 1
+                impact = first + int(impacts[np.argmax(segment[impacts])])
+                event = self._score(window, window_start, impact, end_time)
+                # Skip the rest of this impact's window whether or not it scored
+                self._evaluated = impact + self.post_samples
+            else:
+                self._evaluated = last
+
+        keep = self.pre_samples + self.post_samples + 1
+        self._window = window[-keep:].copy() if len(window) > keep else window
+
+        if event:
+            self.detections += 1
+            self.last_event = event
+            logger.info(f"🚨 Fall detected (confidence {event.confidence:.2f}, "
+                        f"impact {event.impact_g:.1f} g, free fall {event.free_fall_ms:.0f} ms)")
+        return event
+
+    def _score(self, window: np.ndarray, window_start: int, impact: int, end_time: float) -> Optional[FallEvent]:
+
+        offset = impact - window_start
+        impact_g = float(window[offset])
+
+        before = window[offset - self.pre_samples:offset]
+        low = np.concatenate(([False], before < self.free_fall_threshold, [False]))
+        edges = np.flatnonzero(np.diff(low.astype(np.int8)))
+        longest_run = int((edges[1::2] - edges[0::2]).max()) if len(edges) else 0
+        free_fall_s = longest_run / self.sample_rate
+        # A hard knock or a device dropped on a table has no free-fall phase;
+        # the weighted score below only grades falls that have one
+        if free_fall_s < self.free_fall_min_duration:
+            return None
+
+        still_start = offset + self.delay_samples
+        after = window[still_start:still_start + self.still_samples]
+        stillness_g = float(np.abs(after - 1.0).mean())
+
+        free_fall_score = min(1.0, free_fall_s / (2 * self.free_fall_min_duration))
+        impact_score = min(1.0, impact_g / (2 * self.impact_threshold))
+        stillness_score = max(0.0, 1.0 - stillness_g / self.stillness_tolerance)
+        confidence = (FREE_FALL_WEIGHT * free_fall_score +
+                      IMPACT_WEIGHT * impact_score +
+                      STILLNESS_WEIGHT * stillness_score)
+
+        if confidence < self.min_confidence:
+            return None
+
+        samples_ago = self.total_samples - 1 - impact
+        return FallEvent(
+            timestamp=end_time - samples_ago / self.sample_rate,
+            confidence=round(confidence, 3),
+            impact_g=round(impact_g, 2),
+            free_fall_ms=round(free_fall_s * 1000, 1),
+            stillness_g=round(stillness_g, 3)
+        )
+
+    def get_stats(self) -> dict:
+
+        return {
+            'sample_rate': self.sample_rate,
+            'impact_threshold': self.impact_threshold,
+            'free_fall_threshold': self.free_fall_threshold,
+            'min_confidence': self.min_confidence,
+            'candidates': self.candidates,
+            'detections': self.detections,
+            'last_event': self.last_event.to_dict() if self.last_event else None
+        }
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Any, Optional
+
+class LatestMailbox:
+    """Single-slot hand-off that always holds the newest item.
+
+    ``put`` swaps a reference into the slot and wakes the consumer; an item
+    still waiting there is overwritten and counted as dropped, so the
+    consumer never works through a backlog. ``take`` blocks on a condition
+    until an item arrives, so an idle consumer costs nothing and a new item
+    is picked up as soon as the previous one is finished.
+    """
+
+    def __init__(self):
+
+        self._cond = threading.Condition()
+        self._item: Any = None
+        self._closed = False
+
+        self.posted = 0
+        self.taken = 0
+        self.dropped = 0
+        self.total_wait = 0.0
+        self._posted_at = 0.0
+
+    def put(self, item: Any) -> bool:
+        """Offer ``item``; True if it replaced one the consumer never took"""
+        with self._cond:
+            replaced = self._item is not None
+            if replaced:
+                self.dropped += 1
+            self._item = item
+            self._posted_at = time.monotonic()
+            self.posted += 1
+            self._cond.notify()
+        return replaced
+
+    def take(self, timeout: Optional[float] = None) -> Any:
+        """Wait for and remove the newest item; None on timeout or close"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._item is not None or self._closed, timeout):
+                return None
+            item, self._item = self._item, None
+            if item is not None:
+                self.taken += 1
+                self.total_wait += time.monotonic() - self._posted_at
+            return item
+
+    def clear(self):
+
+        with self._cond:
+            self._item = None
+
+    def close(self):
+        """Release a blocked ``take``; later takes return None immediately"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+
+        return {
+            'posted': self.posted,
+            'taken': self.taken,
+            'dropped': self.dropped,
+            'avg_wait_ms': round(self.total_wait / self.taken * 1000, 2) if self.taken else 0.0
+        }
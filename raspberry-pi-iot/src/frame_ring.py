@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from config import FrameRingConfig
+
+logger = logging.getLogger(__name__)
+
+class FrameSlot:
+
+    __slots__ = ('seq', 'timestamp', 'frame', 'has_frame', 'jpeg', 'lock')
+
+    def __init__(self):
+
+        self.seq = 0
+        self.timestamp = 0.0
+        self.frame: Optional[np.ndarray] = None
+        self.has_frame = False
+        self.jpeg: Optional[bytes] = None
+        self.lock = threading.Lock()
+
+@dataclass
+class FrameSnapshot:
+
+    seq: int
+    timestamp: float
+    frame: Optional[np.ndarray]
+    jpeg: Optional[bytes]
+
+class FrameRing:
+    """Fixed-capacity ring of the last N frames of one camera.
+
+    Slots and their raw frame arrays are allocated once and overwritten in
+    place. Readers read a slot and re-check its sequence number afterwards
+    (seqlock style), so a snapshot is either consistent or reported as
+    overwritten. Snapshots reference slot memory rather than copying it;
+    use ``is_current`` or copy the frame if it must outlive the ring.
+    """
+
+    def __init__(self, capacity: int = FrameRingConfig.CAPACITY,
+                 jpeg_quality: int = FrameRingConfig.JPEG_QUALITY):
+
+        self.capacity = capacity
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self._slots: List[FrameSlot] = [FrameSlot() for _ in range(capacity)]
+        self._cond = threading.Condition()
+        self.head_seq = 0
+
+        self.frames_written = 0
+        self.jpeg_encodes = 0
+        self.jpeg_decodes = 0
+        self.stale_reads = 0
+
+    def publish(self, frame: Optional[np.ndarray] = None, jpeg: Optional[bytes] = None,
+                timestamp: Optional[float] = None) -> int:
+
+        seq = self.head_seq + 1
+        slot = self._slots[seq % self.capacity]
+
+        # The slot lock is only contended if a reader is still encoding a frame
+        # that is a full ring behind the writer
+        with slot.lock:
+            # Invalidate the slot first so concurrent readers detect the overwrite
+            slot.seq = 0
+            if frame is not None:
+                if slot.frame is None or slot.frame.shape != frame.shape or slot.frame.dtype != frame.dtype:
+                    slot.frame = np.empty_like(frame)
+                np.copyto(slot.frame, frame)
+            slot.has_frame = frame is not None
+            slot.jpeg = jpeg
+            slot.timestamp = timestamp if timestamp is not None else time.time()
+            slot.seq = seq
+
+        with self._cond:
+            self.head_seq = seq
+            self.frames_written += 1
+            self._cond.notify_all()
+        return seq
+
+    def _read_slot(self, seq: int) -> Optional[FrameSnapshot]:
+
+        if seq <= 0 or seq <= self.head_seq - self.capacity:
+            return None
+
+        slot = self._slots[seq % self.capacity]
+        snapshot = FrameSnapshot(slot.seq, slot.timestamp,
+                                 slot.frame if slot.has_frame else None, slot.jpeg)
+        if snapshot.seq != seq or slot.seq != seq:
+            self.stale_reads += 1
+            return None
+        return snapshot
+
+    def latest(self) -> Optional[FrameSnapshot]:
+
+        return self._read_slot(self.head_seq)
+
+    def get(self, seq: int) -> Optional[FrameSnapshot]:
+
+        return self._read_slot(seq)
+
+    def since(self, after_seq: int = 0) -> List[FrameSnapshot]:
+
+        head = self.head_seq
+        first = max(after_seq + 1, head - self.capacity + 1, 1)
+        snapshots = []
+        for seq in range(first, head + 1):
+            snapshot = self._read_slot(seq)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def wait_for(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[FrameSnapshot]:
+
+        with self._cond:
+            if self.head_seq <= after_seq:
+                self._cond.wait_for(lambda: self.head_seq > after_seq, timeout=timeout)
+        return self.latest()
+
+    def wake_all(self):
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def is_current(self, snapshot: FrameSnapshot) -> bool:
+        """True while the slot behind ``snapshot`` has not been overwritten"""
+        return self._slots[snapshot.seq % self.capacity].seq == snapshot.seq
+
+    def get_jpeg(self, snapshot: Optional[FrameSnapshot]) -> Optional[bytes]:
+
+        if snapshot is None:
+            return None
+        if snapshot.jpeg is not None:
+            return snapshot.jpeg
+
+        slot = self._slots[snapshot.seq % self.capacity]
+        # Encoded at most once per frame no matter how many readers ask for it
+        with slot.lock:
+            if slot.seq == snapshot.seq and slot.jpeg is not None:
+                snapshot.jpeg = slot.jpeg
+                return slot.jpeg
+            if snapshot.frame is None:
+                return None
+
+            ok, buffer = cv2.imencode('.jpg', snapshot.frame, self.encode_params)
+            if not ok or slot.seq != snapshot.seq:
+                self.stale_reads += 1
+                return None
+
+            jpeg = buffer.tobytes()
+            slot.jpeg = jpeg
+            self.jpeg_encodes += 1
+
+        snapshot.jpeg = jpeg
+        return jpeg
+
+    def get_frame(self, snapshot: Optional[FrameSnapshot]) -> Optional[np.ndarray]:
+        """Raw frame for ``snapshot``, decoding the JPEG if only that was published"""
+        if snapshot is None:
+            return None
+        if snapshot.frame is not None:
+            return snapshot.frame
+        if snapshot.jpeg is None:
+            return None
+
+        frame = cv2.imdecode(np.frombuffer(snapshot.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        self.jpeg_decodes += 1
+        snapshot.frame = frame
+        return frame
+
+    def latest_jpeg(self) -> Optional[bytes]:
+
+        return self.get_jpeg(self.latest())
+
+    def get_stats(self) -> dict:
+
+        return {
+            'capacity': self.capacity,
+            'head_seq': self.head_seq,
+            'frames_written': self.frames_written,
+            'jpeg_encodes': self.jpeg_encodes,
+            'jpeg_decodes': self.jpeg_decodes,
+            'stale_reads': self.stale_reads
+        }
@@ -0,0 +1,49 @@
+"""Hardware backend selection.
+
+Modules import ``GPIO`` and ``smbus2`` from here instead of ``RPi.GPIO`` and
+``smbus2`` directly, and open cameras through ``open_video_capture``. With
+``GUARDIT_HARDWARE=sim`` every peripheral comes from ``src/sim`` so the
+servers boot and run unchanged on any Linux machine.
+"""
+import logging
+import os
+import subprocess
+import sys
+from typing import List
+
+import cv2
+
+from config import HardwareConfig, CSIPipeConfig
+
+logger = logging.getLogger(__name__)
+
+SIMULATED = HardwareConfig.BACKEND == 'sim'
+
+if SIMULATED:
+    from src.sim import gpio as GPIO
+    from src.sim import i2c as smbus2
+    from src.sim.camera import SimVideoCapture
+    logger.info("🧪 Using simulated hardware backend")
+else:
+    import RPi.GPIO as GPIO
+    import smbus2
+
+SIM_RPICAM_VID = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sim', 'rpicam_vid.py')
+
+def open_video_capture(device_id: int, api_preference: int = cv2.CAP_V4L2):
+
+    if SIMULATED:
+        return SimVideoCapture(device_id, api_preference)
+    return cv2.VideoCapture(device_id, api_preference)
+
+def csi_pipe_command() -> List[str]:
+    """Command prefix for the long-lived MJPEG process behind the CSI pipe"""
+    if SIMULATED:
+        return [sys.executable, SIM_RPICAM_VID]
+    return [CSIPipeConfig.COMMAND]
+
+def list_csi_cameras(timeout: float = 5) -> str:
+    """Output of ``rpicam-still --list-cameras`` (or its simulated equivalent)"""
+    command = [sys.executable, SIM_RPICAM_VID] if SIMULATED else ['rpicam-still']
+    result = subprocess.run(command + ['--list-cameras'], capture_output=True, text=True, timeout=timeout)
+    return result.stdout if result.returncode == 0 else ''
@@ -1,9 +1,9 @@
-import RPi.GPIO as GPIO
 import time
 import asyncio
 import logging
 from typing import Tuple, Optional
 from config import GPIOConfig
+from src.hardware import GPIO
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,213 @@
+"""Shared I2C bus manager.
+
+One ``I2CBusManager`` per bus number owns the SMBus handle. Devices use it
+in place of ``smbus2.SMBus`` (same method names), so every transaction from
+every thread is serialised, timed and counted per device address. Several
+block reads can go out as one combined ``i2c_rdwr`` with ``read_blocks``.
+A device that NACKs or times out is backed off exponentially, and repeated
+failures reopen the bus handle.
+"""
+import errno
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import I2CConfig
+from src.hardware import smbus2
+
+logger = logging.getLogger(__name__)
+
+class I2CBackoffError(OSError):
+    """Raised without touching the bus while a device is backed off"""
+
+    def __init__(self, address: int, remaining: float):
+
+        super().__init__(errno.EAGAIN, f"I2C device 0x{address:02X} backed off for {remaining * 1000:.0f} ms")
+        self.address = address
+        self.remaining = remaining
+
+class DeviceStats:
+
+    def __init__(self):
+
+        self.transactions = 0
+        self.bytes = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.backoffs = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.backoff_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+
+        return {
+            'transactions': self.transactions,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'consecutive_errors': self.consecutive_errors,
+            'backoffs': self.backoffs,
+            'avg_latency_ms': round(self.total_latency / self.transactions * 1000, 3) if self.transactions else 0.0,
+            'max_latency_ms': round(self.max_latency * 1000, 3),
+            'backed_off': self.backoff_until > time.monotonic(),
+            'last_error': self.last_error
+        }
+
+class I2CBusManager:
+
+    def __init__(self, bus_number: int = I2CConfig.BUS_NUMBER,
+                 backoff_base: float = I2CConfig.BACKOFF_BASE,
+                 backoff_max: float = I2CConfig.BACKOFF_MAX,
+                 reset_after: int = I2CConfig.RESET_AFTER_ERRORS):
+
+        self.bus_number = bus_number
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.reset_after = reset_after
+
+        self._lock = threading.RLock()
+        self._bus = smbus2.SMBus(bus_number)
+        self._users = 0
+
+        self.devices: Dict[int, DeviceStats] = {}
+        self.started = time.monotonic()
+        self.busy_time = 0.0
+        self.wait_time = 0.0
+        self.resets = 0
+
+    def _device(self, address: int) -> DeviceStats:
+
+        stats = self.devices.get(address)
+        if stats is None:
+            stats = self.devices[address] = DeviceStats()
+        return stats
+
+    def _run(self, addresses: Sequence[int], nbytes: int, operation):
+        """Run ``operation(bus)`` under the bus lock with backoff, timing and stats"""
+        now = time.monotonic()
+        for address in addresses:
+            stats = self._device(address)
+            if stats.backoff_until > now:
+                raise I2CBackoffError(address, stats.backoff_until - now)
+
+        waited = time.perf_counter()
+        with self._lock:
+            started = time.perf_counter()
+            self.wait_time += started - waited
+            try:
+                result = operation(self._bus)
+            except OSError as e:
+                self._record_error(addresses, e)
+                raise
+            finally:
+                latency = time.perf_counter() - started
+                self.busy_time += latency
+
+            for address in addresses:
+                stats = self.devices[address]
+                stats.transactions += 1
+                stats.bytes += nbytes // len(addresses)
+                stats.total_latency += latency
+                stats.max_latency = max(stats.max_latency, latency)
+                stats.consecutive_errors = 0
+            return result
+
+    def _record_error(self, addresses: Sequence[int], error: OSError):
+
+        reset = False
+        for address in addresses:
+            stats = self.devices[address]
+            stats.errors += 1
+            stats.consecutive_errors += 1
+            stats.last_error = str(error)
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (stats.consecutive_errors - 1))
+            stats.backoff_until = time.monotonic() + delay
+            stats.backoffs += 1
+            reset = reset or stats.consecutive_errors % self.reset_after == 0
+            logger.debug(f"I2C 0x{address:02X} error ({error}), backing off {delay * 1000:.0f} ms")
+        if reset:
+            self.reset()
+
+    def reset(self):
+        """Reopen the bus handle, e.g. after a device wedged the adapter"""
+        with self._lock:
+            try:
+                self._bus.close()
+            except OSError:
+                pass
+            self._bus = smbus2.SMBus(self.bus_number)
+            self.resets += 1
+            logger.warning(f"⚠️ I2C bus {self.bus_number} reset after repeated errors")
+
+    @contextmanager
+    def transaction(self):
+        """Hold the bus across several calls that must not interleave with other threads"""
+        with self._lock:
+            yield self
+
+    def read_byte_data(self, i2c_addr: int, register: int) -> int:
+
+        return self._run((i2c_addr,), 1, lambda bus: bus.read_byte_data(i2c_addr, register))
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int):
+
+        self._run((i2c_addr,), 1, lambda bus: bus.write_byte_data(i2c_addr, register, value))
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int) -> List[int]:
+
+        return self._run((i2c_addr,), length, lambda bus: bus.read_i2c_block_data(i2c_addr, register, length))
+
+    def write_i2c_block_data(self, i2c_addr: int, register: int, data: List[int]):
+
+        self._run((i2c_addr,), len(data), lambda bus: bus.write_i2c_block_data(i2c_addr, register, data))
+
+    def i2c_rdwr(self, *i2c_msgs):
+
+        addresses = sorted({msg.addr for msg in i2c_msgs})
+        nbytes = sum(len(msg) for msg in i2c_msgs)
+        self._run(addresses, nbytes, lambda bus: bus.i2c_rdwr(*i2c_msgs))
+
+    def read_blocks(self, requests: Sequence[Tuple[int, int, int]]) -> List[bytes]:
+        """Read several (address, register, length) blocks in one combined transfer"""
+        messages = []
+        for address, register, length in requests:
+            messages.append(smbus2.i2c_msg.write(address, [register]))
+            messages.append(smbus2.i2c_msg.read(address, length))
+        self.i2c_rdwr(*messages)
+        return [bytes(msg) for msg in messages[1::2]]
+
+    def close(self):
+        """Release one user's hold on the bus; the handle closes with the last user"""
+        with _managers_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            _managers.pop(self.bus_number, None)
+        with self._lock:
+            self._bus.close()
+
+    def get_stats(self) -> dict:
+
+        elapsed = time.monotonic() - self.started
+        return {
+            'bus': self.bus_number,
+            'utilization': round(self.busy_time / elapsed, 4) if elapsed > 0 else 0.0,
+            'lock_wait_ms': round(self.wait_time * 1000, 1),
+            'resets': self.resets,
+            'devices': {f"0x{address:02X}": stats.to_dict() for address, stats in sorted(self.devices.items())}
+        }
+
+_managers_lock = threading.Lock()
+_managers: Dict[int, I2CBusManager] = {}
+
+def get_bus(bus_number: int = I2CConfig.BUS_NUMBER) -> I2CBusManager:
+    """Shared manager for ``bus_number``; pair every call with ``close()``"""
+    with _managers_lock:
+        manager = _managers.get(bus_number)
+        if manager is None:
+            manager = _managers[bus_number] = I2CBusManager(bus_number)
+        manager._users += 1
+        return manager
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import SensorConfig
+
+# LSB per unit for each full-scale setting (datasheet values)
+ACCEL_SENSITIVITY = {2: 16384.0, 4: 8192.0, 8: 4096.0, 16: 2048.0}
+GYRO_SENSITIVITY = {250: 131.0, 500: 65.5, 1000: 32.8, 2000: 16.4}
+
+# Temperature sensitivity (LSB/°C) and offset (°C) per chip family
+TEMP_PARAMS = {
+    'mpu6050': (340.0, 36.53),
+    'mpu9250': (333.87, 21.0)
+}
+
+# Register block starting at ACCEL_XOUT_H: accel XYZ, temp, gyro XYZ
+SAMPLE_BYTES = 14
+SAMPLE_WORDS = 7
+
+def full_scale_bits(full_scale: int, table: dict) -> int:
+    """FS_SEL / AFS_SEL value for the GYRO_CONFIG / ACCEL_CONFIG registers"""
+    return sorted(table).index(full_scale) << 3
+
+@dataclass
+class IMUBatch:
+
+    accel: np.ndarray
+    gyro: np.ndarray
+    temp: np.ndarray
+
+    def __len__(self) -> int:
+
+        return len(self.temp)
+
+    def accel_magnitude(self) -> np.ndarray:
+
+        return np.sqrt(np.einsum('ij,ij->i', self.accel, self.accel))
+
+    def gyro_magnitude(self) -> np.ndarray:
+
+        return np.sqrt(np.einsum('ij,ij->i', self.gyro, self.gyro))
+
+class IMUDecoder:
+    """Converts raw big-endian MPU register blocks into scaled NumPy arrays.
+
+    ``decode`` handles any number of contiguous 14-byte samples (a single
+    register burst or a whole FIFO drain) with one ``frombuffer`` view and
+    one multiply-add, instead of per-sample Python arithmetic.
+    """
+
+    def __init__(self, accel_range: int = SensorConfig.ACCEL_RANGE,
+                 gyro_range: int = SensorConfig.GYRO_RANGE,
+                 chip: str = 'mpu9250'):
+
+        if accel_range not in ACCEL_SENSITIVITY:
+            raise ValueError(f"Unsupported accelerometer range: ±{accel_range} g")
+        if gyro_range not in GYRO_SENSITIVITY:
+            raise ValueError(f"Unsupported gyroscope range: ±{gyro_range} dps")
+
+        self.accel_range = accel_range
+        self.gyro_range = gyro_range
+        self.accel_scale = 1.0 / ACCEL_SENSITIVITY[accel_range]
+        self.gyro_scale = 1.0 / GYRO_SENSITIVITY[gyro_range]
+        temp_sensitivity, self.temp_offset = TEMP_PARAMS[chip]
+        self.temp_scale = 1.0 / temp_sensitivity
+
+        self._scale = np.array([self.accel_scale] * 3 + [self.temp_scale] + [self.gyro_scale] * 3)
+        self._offset = np.array([0.0, 0.0, 0.0, self.temp_offset, 0.0, 0.0, 0.0])
+
+    def decode(self, data) -> IMUBatch:
+        """Decode every complete 14-byte sample in ``data``"""
+        count = len(data) // SAMPLE_BYTES
+        raw = np.frombuffer(data, dtype='>i2', count=count * SAMPLE_WORDS).reshape(count, SAMPLE_WORDS)
+        scaled = raw * self._scale + self._offset
+        return IMUBatch(scaled[:, 0:3], scaled[:, 4:7], scaled[:, 3])
+
+    def decode_accel(self, data) -> np.ndarray:
+        """Decode a 6-byte ACCEL_XOUT_H block into g"""
+        return np.frombuffer(data, dtype='>i2', count=3) * self.accel_scale
+
+    def decode_gyro(self, data) -> np.ndarray:
+        """Decode a 6-byte GYRO_XOUT_H block into degrees per second"""
+        return np.frombuffer(data, dtype='>i2', count=3) * self.gyro_scale
+
+    def decode_temp(self, data) -> float:
+        """Decode a 2-byte TEMP_OUT_H block into °C"""
+        return float(np.frombuffer(data, dtype='>i2', count=1)[0]) * self.temp_scale + self.temp_offset
@@ -0,0 +1,130 @@
+import logging
+import time
+
+from config import IMUFifoConfig
+from src.hardware import smbus2
+
+logger = logging.getLogger(__name__)
+
+# MPU6050 / MPU6500 / MPU9250 register map
+SMPLRT_DIV = 0x19
+CONFIG = 0x1A
+FIFO_EN = 0x23
+INT_STATUS = 0x3A
+USER_CTRL = 0x6A
+FIFO_COUNTH = 0x72
+FIFO_R_W = 0x74
+WHO_AM_I = 0x75
+
+FIFO_EN_ACCEL_TEMP_GYRO = 0xF8
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+INT_STATUS_FIFO_OFLOW = 0x10
+
+# One FIFO record: accel XYZ, temperature, gyro XYZ as big-endian int16,
+# the same layout as the ACCEL_XOUT_H register block
+FIFO_RECORD_BYTES = 14
+
+# The gyro output rate is 1 kHz whenever the digital low-pass filter is enabled
+DLPF_OUTPUT_RATE = 1000
+
+class MPUFifoReader:
+    """Samples the MPU into its hardware FIFO and drains it in bursts.
+
+    The sample-rate divider sets how often the chip pushes a 14-byte
+    accel/temp/gyro record into the FIFO; ``read_batch`` drains every
+    complete record with a single I2C read transaction, so the host only
+    needs to wake up a few dozen times a second. ``bus`` is the shared
+    ``I2CBusManager``.
+    """
+
+    def __init__(self, bus, address: int,
+                 sample_rate: int = IMUFifoConfig.SAMPLE_RATE,
+                 dlpf_cfg: int = IMUFifoConfig.DLPF_CFG):
+
+        self.bus = bus
+        self.address = address
+        self.dlpf_cfg = dlpf_cfg
+        self.divider = max(0, min(255, round(DLPF_OUTPUT_RATE / sample_rate) - 1))
+        self.sample_rate = DLPF_OUTPUT_RATE / (self.divider + 1)
+        self.fifo_size = 1024
+
+        self.batches = 0
+        self.samples = 0
+        self.overflows = 0
+        self.last_batch_size = 0
+        self.last_read_time = 0.0
+
+    def configure(self) -> bool:
+
+        try:
+            # The MPU6050 has a 1 KB FIFO, the MPU6500/9250 family 512 bytes
+            who_am_i = self.bus.read_byte_data(self.address, WHO_AM_I)
+            self.fifo_size = 1024 if who_am_i == 0x68 else 512
+
+            self.bus.write_byte_data(self.address, CONFIG, self.dlpf_cfg)
+            self.bus.write_byte_data(self.address, SMPLRT_DIV, self.divider)
+            self.reset()
+            self.bus.write_byte_data(self.address, FIFO_EN, FIFO_EN_ACCEL_TEMP_GYRO)
+
+            logger.info(f"✅ IMU FIFO enabled at {self.sample_rate:.0f} Hz "
+                        f"({self.fifo_size}-byte FIFO)")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ IMU FIFO configuration failed: {e}")
+            return False
+
+    def reset(self):
+
+        self.bus.write_byte_data(self.address, USER_CTRL, USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.address, USER_CTRL, USER_CTRL_FIFO_EN)
+        # Reading INT_STATUS clears an overflow flag latched before the reset
+        self.bus.read_byte_data(self.address, INT_STATUS)
+
+    def disable(self):
+
+        try:
+            self.bus.write_byte_data(self.address, FIFO_EN, 0)
+            self.bus.write_byte_data(self.address, USER_CTRL, 0)
+        except Exception as e:
+            logger.debug(f"IMU FIFO disable failed: {e}")
+
+    def read_batch(self) -> bytes:
+        """Return every complete record currently buffered, oldest first"""
+        status, counts = self.bus.read_blocks([(self.address, INT_STATUS, 1),
+                                               (self.address, FIFO_COUNTH, 2)])
+        status = status[0]
+        count = (counts[0] << 8) | counts[1]
+
+        if status & INT_STATUS_FIFO_OFLOW or count >= self.fifo_size:
+            # Once the FIFO has wrapped, record boundaries are lost
+            self.overflows += 1
+            logger.warning(f"⚠️ IMU FIFO overflow ({count} bytes) - resetting")
+            self.reset()
+            return b''
+
+        count -= count % FIFO_RECORD_BYTES
+        if count == 0:
+            return b''
+
+        write = smbus2.i2c_msg.write(self.address, [FIFO_R_W])
+        read = smbus2.i2c_msg.read(self.address, count)
+        self.bus.i2c_rdwr(write, read)
+
+        self.batches += 1
+        self.samples += count // FIFO_RECORD_BYTES
+        self.last_batch_size = count // FIFO_RECORD_BYTES
+        self.last_read_time = time.time()
+        return bytes(read)
+
+    def get_stats(self) -> dict:
+
+        return {
+            'sample_rate': self.sample_rate,
+            'fifo_size': self.fifo_size,
+            'batches': self.batches,
+            'samples': self.samples,
+            'overflows': self.overflows,
+            'last_batch_size': self.last_batch_size
+        }
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import IMUHistoryConfig
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FIELDS = ('ax', 'ay', 'az', 'gx', 'gy', 'gz', 'temp')
+
+class IMUHistory:
+    """Preallocated ring of timestamped IMU samples.
+
+    Samples are stored column-wise in fixed NumPy arrays and written in
+    whole batches, so appending never allocates. Reads return columnar
+    copies of every sample newer than a millisecond timestamp, oldest first.
+
+    FIFO batches are timestamped from a sample clock (anchor + index *
+    interval) rather than back-dated from each read's wall time, and every
+    timestamp is strictly greater than the one before. The clock is
+    re-anchored on ``resync`` (FIFO reset or overflow) or when it drifts
+    too far from the wall clock. Timestamps are stored as integer
+    microseconds, so a returned millisecond timestamp passed back as
+    ``since`` (even rounded to 3 decimals) lands exactly on its sample.
+    """
+
+    def __init__(self, capacity: int):
+
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((len(HISTORY_FIELDS), capacity), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+        self.total_samples = 0
+        self.resyncs = 0
+        self._next_time: Optional[float] = None
+        self._interval = 0.0
+        self._last_us: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def capacity_for(sample_rate: float, duration: float = IMUHistoryConfig.DURATION) -> int:
+
+        return max(1, int(sample_rate * duration))
+
+    @classmethod
+    def for_rate(cls, sample_rate: float, duration: float = IMUHistoryConfig.DURATION) -> 'IMUHistory':
+
+        return cls(cls.capacity_for(sample_rate, duration))
+
+    def resize(self, capacity: int):
+        """Reallocate the ring for ``capacity`` samples, keeping the newest ones"""
+        with self._lock:
+            if capacity == self.capacity:
+                return
+            order = np.concatenate([np.arange(start, stop) for start, stop in self._chronological_ranges()])
+            keep = order[-capacity:]
+            n = len(keep)
+
+            timestamps = np.zeros(capacity, dtype=np.int64)
+            values = np.zeros((len(HISTORY_FIELDS), capacity), dtype=np.float32)
+            timestamps[:n] = self.timestamps[keep]
+            values[:, :n] = self.values[:, keep]
+
+            self.timestamps = timestamps
+            self.values = values
+            self.capacity = capacity
+            self.count = n
+            self.head = n % capacity
+
+    def resync(self):
+        """Samples were lost (FIFO reset or overflow): anchor the next batch afresh"""
+        with self._lock:
+            self._next_time = None
+            self.resyncs += 1
+
+    def _timestamps(self, n: int, end_time: float, sample_interval: float) -> np.ndarray:
+
+        if sample_interval <= 0:
+            # Single register reads carry their own read time
+            start_us = int(round(end_time * 1e6))
+            if self._last_us is not None:
+                start_us = max(start_us, self._last_us + 1)
+            return start_us + np.arange(n, dtype=np.int64)
+
+        start = self._next_time
+        if (start is None or sample_interval != self._interval or
+                abs(start + (n - 1) * sample_interval - end_time) > IMUHistoryConfig.MAX_CLOCK_DRIFT):
+            if start is not None:
+                self.resyncs += 1
+            start = end_time - (n - 1) * sample_interval
+        if self._last_us is not None:
+            start = max(start, self._last_us / 1e6 + sample_interval)
+
+        self._next_time = start + n * sample_interval
+        self._interval = sample_interval
+        return np.round((start + sample_interval * np.arange(n)) * 1e6).astype(np.int64)
+
+    def append(self, batch, end_time: Optional[float] = None, sample_interval: float = 0.0):
+        """Store an IMUBatch read at ``end_time``, ``sample_interval`` seconds per sample"""
+        n = len(batch)
+        if n == 0:
+            return
+        if end_time is None:
+            end_time = time.time()
+
+        columns = (batch.accel[:, 0], batch.accel[:, 1], batch.accel[:, 2],
+                   batch.gyro[:, 0], batch.gyro[:, 1], batch.gyro[:, 2], batch.temp)
+
+        if n > self.capacity:
+            columns = tuple(column[-self.capacity:] for column in columns)
+            n = self.capacity
+
+        with self._lock:
+            timestamps = self._timestamps(len(batch), end_time, sample_interval)
+            self._last_us = int(timestamps[-1])
+            timestamps = timestamps[-n:]
+
+            first = min(n, self.capacity - self.head)
+            for start, stop, offset in ((self.head, self.head + first, 0), (0, n - first, first)):
+                if stop <= start:
+                    continue
+                self.timestamps[start:stop] = timestamps[offset:offset + stop - start]
+                for row, column in enumerate(columns):
+                    self.values[row, start:stop] = column[offset:offset + stop - start]
+
+            self.head = (self.head + n) % self.capacity
+            self.count = min(self.count + n, self.capacity)
+            self.total_samples += n
+
+    def _chronological_ranges(self) -> List[tuple]:
+
+        if self.count < self.capacity:
+            return [(0, self.head)]
+        return [(self.head, self.capacity), (0, self.head)]
+
+    def since(self, since_ms: float = 0.0, fields: Sequence[str] = HISTORY_FIELDS,
+              limit: int = IMUHistoryConfig.MAX_RESPONSE_SAMPLES) -> Dict[str, np.ndarray]:
+        """Columns for up to ``limit`` samples newer than ``since_ms``; timestamps in ms"""
+        rows = [HISTORY_FIELDS.index(field) for field in fields]
+        since_us = int(round(since_ms * 1000))
+
+        with self._lock:
+            slices = []
+            remaining = limit
+            for start, stop in self._chronological_ranges():
+                if remaining <= 0:
+                    break
+                first = start + int(np.searchsorted(self.timestamps[start:stop], since_us, side='right'))
+                last = min(stop, first + remaining)
+                if last > first:
+                    slices.append((first, last))
+                    remaining -= last - first
+
+            result = {'timestamps': np.concatenate([self.timestamps[a:b] for a, b in slices]) / 1000.0
+                      if slices else np.empty(0, dtype=np.float64)}
+            for field, row in zip(fields, rows):
+                result[field] = (np.concatenate([self.values[row, a:b] for a, b in slices])
+                                 if slices else np.empty(0, dtype=np.float32))
+
+        return result
+
+    def oldest_timestamp(self) -> Optional[float]:
+
+        with self._lock:
+            if self.count == 0:
+                return None
+            return self.timestamps[self._chronological_ranges()[0][0]] / 1e6
+
+    def get_stats(self) -> dict:
+
+        oldest = self.oldest_timestamp()
+        return {
+            'capacity': self.capacity,
+            'samples': self.count,
+            'total_samples': self.total_samples,
+            'clock_resyncs': self.resyncs,
+            'window_seconds': round(time.time() - oldest, 1) if oldest else 0.0
+        }
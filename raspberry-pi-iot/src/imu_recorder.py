@@ -0,0 +1,261 @@
+"""Append-only binary IMU recordings.
+
+File layout (little-endian unless noted)::
+
+    header   64 bytes   magic b'GIMU', version, record size, sample rate,
+                        accel/gyro full-scale range, chip name, start time
+    records  16 bytes each
+        b'S' + pad + 14-byte raw sample (big-endian register order)
+        b'I' + pad + uint32 sample number + float64 timestamp + 2 pad
+
+Samples are evenly spaced at the header sample rate; an index record
+anchors the timestamp of the next sample at least every INDEX_INTERVAL
+seconds and whenever the stream drifts (e.g. after a FIFO reset), so any
+sample's time is its preceding anchor plus its offset.
+"""
+import glob
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from config import RecorderConfig
+from src.imu_decoder import SAMPLE_BYTES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'GIMU'
+VERSION = 1
+HEADER = struct.Struct('<4sHHfHH8sd')
+HEADER_SIZE = 64
+RECORD_SIZE = 16
+RECORD_SAMPLE = ord('S')
+RECORD_INDEX = ord('I')
+INDEX_PAYLOAD = struct.Struct('<Id')
+FILE_EXTENSION = '.imu'
+
+RECORD_DTYPE = np.dtype([('type', 'u1'), ('flags', 'u1'), ('payload', 'V14')])
+
+class IMURecorder:
+    """Always-on recorder appending raw IMU batches to rotating files"""
+
+    def __init__(self, sample_rate: float, accel_range: int, gyro_range: int, chip: str,
+                 directory: str = RecorderConfig.DIRECTORY,
+                 max_file_bytes: int = RecorderConfig.MAX_FILE_BYTES,
+                 max_file_seconds: float = RecorderConfig.MAX_FILE_SECONDS,
+                 max_files: int = RecorderConfig.MAX_FILES):
+
+        self.sample_rate = sample_rate
+        self.accel_range = accel_range
+        self.gyro_range = gyro_range
+        self.chip = chip
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        self.max_files = max_files
+
+        self._lock = threading.Lock()
+        self._file = None
+        self.path: Optional[str] = None
+        self._file_bytes = 0
+        self._file_started = 0.0
+        self._file_samples = 0
+        self._next_sample_time = 0.0
+        self._last_index_time = 0.0
+        self._last_flush = 0.0
+
+        self.enabled = True
+        self.samples_written = 0
+        self.files_written = 0
+        self.errors = 0
+
+    def _open_file(self, timestamp: float):
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime('imu_%Y%m%d_%H%M%S', time.localtime(timestamp))
+        self.path = os.path.join(self.directory, name + FILE_EXTENSION)
+        suffix = 1
+        while os.path.exists(self.path):
+            self.path = os.path.join(self.directory, f"{name}_{suffix}{FILE_EXTENSION}")
+            suffix += 1
+
+        self._file = open(self.path, 'wb')
+        header = HEADER.pack(MAGIC, VERSION, RECORD_SIZE, self.sample_rate, self.accel_range,
+                             self.gyro_range, self.chip.encode()[:8], timestamp)
+        self._file.write(header.ljust(HEADER_SIZE, b'\x00'))
+        self._file_bytes = HEADER_SIZE
+        self._file_started = timestamp
+        self._file_samples = 0
+        self._last_index_time = 0.0
+        self.files_written += 1
+        logger.info(f"📼 Recording IMU samples to {self.path}")
+        self._prune()
+
+    def _prune(self):
+
+        files = sorted(glob.glob(os.path.join(self.directory, '*' + FILE_EXTENSION)),
+                       key=lambda path: (os.path.getmtime(path), path))
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.debug(f"Could not remove old recording {path}: {e}")
+
+    def _close_file(self):
+
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def append(self, raw: bytes, end_time: float, sample_interval: float = 0.0):
+        """Append a burst of raw 14-byte samples whose last sample was taken at ``end_time``"""
+        count = len(raw) // SAMPLE_BYTES
+        if not self.enabled or count == 0:
+            return
+
+        interval = sample_interval or 1.0 / self.sample_rate
+        first_time = end_time - (count - 1) * interval
+
+        with self._lock:
+            try:
+                if (self._file is None or self._file_bytes >= self.max_file_bytes or
+                        first_time - self._file_started >= self.max_file_seconds):
+                    self._close_file()
+                    self._open_file(first_time)
+
+                records = np.zeros((count, RECORD_SIZE), dtype=np.uint8)
+                records[:, 0] = RECORD_SAMPLE
+                records[:, 2:] = np.frombuffer(raw, dtype=np.uint8, count=count * SAMPLE_BYTES).reshape(count, SAMPLE_BYTES)
+
+                # Anchor the timeline periodically and whenever the batch drifts from it
+                drift = abs(first_time - self._next_sample_time)
+                if (first_time - self._last_index_time >= RecorderConfig.INDEX_INTERVAL or
+                        drift > 2 * interval):
+                    index = bytes([RECORD_INDEX, 0]) + INDEX_PAYLOAD.pack(self._file_samples, first_time) + b'\x00\x00'
+                    self._file.write(index)
+                    self._file_bytes += RECORD_SIZE
+                    self._last_index_time = first_time
+
+                self._file.write(records.tobytes())
+                self._file_bytes += count * RECORD_SIZE
+                self._file_samples += count
+                self.samples_written += count
+                self._next_sample_time = end_time + 1.0 / self.sample_rate
+
+                if end_time - self._last_flush >= RecorderConfig.FLUSH_INTERVAL:
+                    self._file.flush()
+                    self._last_flush = end_time
+
+            except OSError as e:
+                self.errors += 1
+                self.enabled = False
+                self._close_file()
+                logger.error(f"❌ IMU recording disabled: {e}")
+
+    def set_sample_rate(self, sample_rate: float):
+        """The header rate applies to a whole file, so later samples go to a new one"""
+        with self._lock:
+            if sample_rate == self.sample_rate:
+                return
+            self.sample_rate = sample_rate
+            self._close_file()
+
+    def close(self):
+
+        with self._lock:
+            self._close_file()
+
+    def get_stats(self) -> dict:
+
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'file_bytes': self._file_bytes,
+            'samples_written': self.samples_written,
+            'files_written': self.files_written,
+            'errors': self.errors
+        }
+
+class IMURecording:
+    """Memory-mapped reader for one recording file.
+
+    Sample timestamps are reconstructed lazily with vectorised NumPy from
+    the index records; raw sample bytes are sliced straight from the map.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{path}: truncated header")
+
+        (magic, version, record_size, self.sample_rate, self.accel_range,
+         self.gyro_range, chip, self.start_time) = HEADER.unpack_from(header)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path}: not an IMU recording")
+        self.version = version
+        self.chip = chip.rstrip(b'\x00').decode()
+
+        # A recording that is still being written may end in a partial record
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+        self.records = (np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+                        if count else np.zeros(0, dtype=RECORD_DTYPE))
+
+        types = self.records['type']
+        self._sample_rows = np.flatnonzero(types == RECORD_SAMPLE)
+        index_rows = np.flatnonzero(types == RECORD_INDEX)
+        index_payload = np.frombuffer(self.records['payload'][index_rows].tobytes(), dtype=np.uint8).reshape(-1, 14)
+        self.index_samples = index_payload[:, 0:4].copy().view('<u4').ravel().astype(np.int64)
+        self.index_times = index_payload[:, 4:12].copy().view('<f8').ravel()
+        self._timestamps: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+
+        return len(self._sample_rows)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+
+        if self._timestamps is None:
+            samples = np.arange(len(self))
+            if len(self.index_samples) == 0:
+                self._timestamps = self.start_time + samples / self.sample_rate
+            else:
+                anchor = np.maximum(np.searchsorted(self.index_samples, samples, side='right') - 1, 0)
+                self._timestamps = (self.index_times[anchor] +
+                                    (samples - self.index_samples[anchor]) / self.sample_rate)
+        return self._timestamps
+
+    def time_range(self) -> Tuple[float, float]:
+
+        if len(self) == 0:
+            return self.start_time, self.start_time
+        return float(self.timestamps[0]), float(self.timestamps[-1])
+
+    def find_sample(self, timestamp: float) -> int:
+        """Index of the first sample at or after ``timestamp``"""
+        return int(np.searchsorted(self.timestamps, timestamp, side='left'))
+
+    def raw(self, start: int = 0, stop: Optional[int] = None) -> bytes:
+        """Raw 14-byte samples ``start:stop`` as one contiguous buffer"""
+        rows = self._sample_rows[start:stop]
+        return self.records['payload'][rows].tobytes()
+
+    def batches(self, batch_size: int, start: int = 0,
+                stop: Optional[int] = None) -> Iterator[Tuple[bytes, float]]:
+        """Yield (raw bytes, timestamp of the last sample) in file order"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        timestamps = self.timestamps
+        for first in range(start, stop, batch_size):
+            last = min(first + batch_size, stop)
+            yield self.raw(first, last), float(timestamps[last - 1])
+
+def list_recordings(directory: str = RecorderConfig.DIRECTORY) -> list:
+
+    return sorted(glob.glob(os.path.join(directory, '*' + FILE_EXTENSION)))
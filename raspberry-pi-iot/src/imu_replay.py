@@ -0,0 +1,110 @@
+"""Replay IMU recordings through the fall/movement detection path.
+
+    python -m src.imu_replay recordings/ --speed max
+    python -m src.imu_replay recordings/imu_20240101_120000.imu --speed 1 --impact-threshold 3.0
+
+Prints one JSON line per detected event and a summary at the end.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Callable, Iterable, List
+
+from config import FallDetectorConfig, IMUFifoConfig
+from src.fall_detector import FallDetector
+from src.imu_decoder import IMUDecoder
+from src.imu_recorder import IMURecording, list_recordings
+
+logger = logging.getLogger(__name__)
+
+# Same default as MOVEMENT_THRESHOLD in imu_wifi_server.py (dps)
+DEFAULT_MOVEMENT_THRESHOLD = 20.0
+
+class IMUReplayer:
+    """Feeds a recording to ``on_batch`` in FIFO-sized bursts, paced or flat out"""
+
+    def __init__(self, recording: IMURecording, speed: float = 0.0,
+                 batch_interval: float = IMUFifoConfig.READ_INTERVAL):
+
+        self.recording = recording
+        self.speed = speed
+        self.batch_size = max(1, int(round(recording.sample_rate * batch_interval)))
+        self.decoder = IMUDecoder(recording.accel_range, recording.gyro_range, chip=recording.chip)
+
+    def run(self, on_batch: Callable, start: int = 0) -> int:
+        """Call ``on_batch(batch, end_time)`` for every burst; returns samples replayed"""
+        replayed = 0
+        wall_start = time.monotonic()
+        first_time = None
+
+        for raw, end_time in self.recording.batches(self.batch_size, start):
+            if first_time is None:
+                first_time = end_time
+            if self.speed > 0:
+                delay = wall_start + (end_time - first_time) / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            batch = self.decoder.decode(raw)
+            replayed += len(batch)
+            on_batch(batch, end_time)
+
+        return replayed
+
+def expand_paths(paths: Iterable[str]) -> List[str]:
+
+    files = []
+    for path in paths:
+        files.extend(list_recordings(path) if os.path.isdir(path) else [path])
+    return files
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Replay GuardIt IMU recordings through fall/movement detection")
+    parser.add_argument('paths', nargs='+', help="recording files or directories")
+    parser.add_argument('--speed', default='max', help="playback speed multiplier, or 'max' (default)")
+    parser.add_argument('--movement-threshold', type=float, default=DEFAULT_MOVEMENT_THRESHOLD)
+    parser.add_argument('--impact-threshold', type=float, default=FallDetectorConfig.IMPACT_THRESHOLD)
+    parser.add_argument('--free-fall-threshold', type=float, default=FallDetectorConfig.FREE_FALL_THRESHOLD)
+    parser.add_argument('--min-confidence', type=float, default=FallDetectorConfig.MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    speed = 0.0 if args.speed == 'max' else float(args.speed)
+    totals = {'files': 0, 'samples': 0, 'falls': 0, 'movements': 0}
+    started = time.perf_counter()
+
+    for path in expand_paths(args.paths):
+        recording = IMURecording(path)
+        detector = FallDetector(recording.sample_rate,
+                                free_fall_threshold=args.free_fall_threshold,
+                                impact_threshold=args.impact_threshold,
+                                min_confidence=args.min_confidence)
+        moving = False
+
+        def on_batch(batch, end_time):
+            nonlocal moving
+            fall = detector.update(batch.accel_magnitude(), end_time)
+            if fall:
+                totals['falls'] += 1
+                print(json.dumps({"event": "fall", "file": path, **fall.to_dict()}))
+
+            peak = float(batch.gyro_magnitude().max())
+            if peak > args.movement_threshold and not moving:
+                totals['movements'] += 1
+                print(json.dumps({"event": "movement", "file": path,
+                                  "timestamp": int(end_time * 1000), "gyro_dps": round(peak, 1)}))
+            moving = peak > args.movement_threshold
+
+        totals['samples'] += IMUReplayer(recording, speed).run(on_batch)
+        totals['files'] += 1
+
+    elapsed = time.perf_counter() - started
+    totals['elapsed_s'] = round(elapsed, 3)
+    totals['samples_per_s'] = round(totals['samples'] / elapsed) if elapsed > 0 else 0
+    print(json.dumps({"summary": totals}))
+
+if __name__ == '__main__':
+    main()
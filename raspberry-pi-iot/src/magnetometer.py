@@ -0,0 +1,128 @@
+"""AK8963 magnetometer decoding, calibration and heading.
+
+The AK8963 inside the MPU-9250 is read through the MPU's I2C master, which
+copies HXL..ST2 into EXT_SENS_DATA right after the accel/temp/gyro block,
+so one burst from ACCEL_XOUT_H returns all nine axes of the same sample.
+"""
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from config import MagnetometerConfig
+
+logger = logging.getLogger(__name__)
+
+# AK8963 registers
+WIA = 0x00
+ST1 = 0x02
+HXL = 0x03
+ST2 = 0x09
+CNTL1 = 0x0A
+ASAX = 0x10
+
+AK8963_DEVICE_ID = 0x48
+MODE_POWER_DOWN = 0x00
+MODE_FUSE_ROM = 0x0F
+OUTPUT_16BIT = 0x10
+CONTINUOUS_MODES = {8: 0x02, 100: 0x06}
+ST2_OVERFLOW = 0x08
+
+# HXL..HZH plus ST2, which must be read to release the next measurement
+MAG_DATA_BYTES = 7
+MAG_SENSITIVITY = 0.15  # uT/LSB at 16-bit output
+
+def continuous_mode(rate_hz: int) -> int:
+    """CNTL1 value for 16-bit continuous measurement at ``rate_hz``"""
+    if rate_hz not in CONTINUOUS_MODES:
+        raise ValueError(f"Unsupported magnetometer rate: {rate_hz} Hz")
+    return OUTPUT_16BIT | CONTINUOUS_MODES[rate_hz]
+
+def sensitivity_adjustment(asa: bytes) -> np.ndarray:
+    """Per-axis scale from the fuse ROM ASA values (datasheet 8.3.11)"""
+    return (np.frombuffer(bytes(asa), dtype=np.uint8).astype(np.float64) - 128.0) / 256.0 + 1.0
+
+def decode_mag(data: bytes, asa_scale: np.ndarray) -> Optional[np.ndarray]:
+    """Field in uT on the accel/gyro axes, or None if the sample overflowed.
+
+    The AK8963 is mounted with X and Y swapped and Z inverted relative to
+    the MPU, so the result is re-ordered to match the accelerometer frame.
+    """
+    if data[6] & ST2_OVERFLOW:
+        return None
+    hx, hy, hz = (np.frombuffer(bytes(data[:6]), dtype='<i2') * (asa_scale * MAG_SENSITIVITY)).tolist()
+    return np.array([hy, hx, -hz])
+
+@dataclass
+class MagCalibration:
+    """Hard-iron offset and soft-iron correction: corrected = soft_iron @ (raw - offset)"""
+
+    offset: List[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    soft_iron: List[List[float]] = field(default_factory=lambda: np.eye(3).tolist())
+    samples: int = 0
+
+    def apply(self, mag: np.ndarray) -> np.ndarray:
+
+        return (np.asarray(mag) - self.offset) @ np.asarray(self.soft_iron).T
+
+    @classmethod
+    def fit(cls, samples: np.ndarray,
+            min_span: float = MagnetometerConfig.MIN_CALIBRATION_SPAN) -> 'MagCalibration':
+        """Min/max fit over readings taken while the device is turned through all orientations"""
+        samples = np.asarray(samples, dtype=np.float64)
+        low, high = samples.min(axis=0), samples.max(axis=0)
+        span = high - low
+        if len(samples) < 10 or span.min() < min_span:
+            raise ValueError(f"Not enough rotation for calibration (span {np.round(span, 1).tolist()} uT)")
+
+        radii = span / 2
+        return cls(offset=((high + low) / 2).tolist(),
+                   soft_iron=np.diag(radii.mean() / radii).tolist(),
+                   samples=len(samples))
+
+    @classmethod
+    def load(cls, path: str = MagnetometerConfig.CALIBRATION_FILE) -> 'MagCalibration':
+
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(offset=data['offset'], soft_iron=data['soft_iron'], samples=data.get('samples', 0))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable magnetometer calibration {path}: {e}")
+            return cls()
+
+    def save(self, path: str = MagnetometerConfig.CALIBRATION_FILE):
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def to_dict(self) -> dict:
+
+        return {'offset': self.offset, 'soft_iron': self.soft_iron, 'samples': self.samples}
+
+def tilt_compensated_heading(accel: np.ndarray, mag: np.ndarray,
+                             declination: float = MagnetometerConfig.DECLINATION) -> Optional[float]:
+    """Heading of the sensor X axis in degrees clockwise from north (0-360).
+
+    Gravity (opposite the at-rest accelerometer reading) and the field
+    define east and north in the sensor frame, which removes tilt without
+    computing roll and pitch explicitly.
+    """
+    down = -np.asarray(accel, dtype=np.float64)
+    east = np.cross(down, mag)
+    north = np.cross(east, down)
+    if not np.any(east) or not np.any(north):
+        return None
+    heading = math.degrees(math.atan2(east[0] / np.linalg.norm(east), north[0] / np.linalg.norm(north)))
+    return (heading + declination) % 360.0
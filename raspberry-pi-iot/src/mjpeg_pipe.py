@@ -0,0 +1,247 @@
+import logging
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional
+
+from config import CSIPipeConfig
+from src.hardware import csi_pipe_command
+
+logger = logging.getLogger(__name__)
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+class MJPEGFrameParser:
+    """Splits a raw MJPEG byte stream into JPEG frames on SOI/EOI markers."""
+
+    def __init__(self, max_frame_bytes: int = CSIPipeConfig.MAX_FRAME_BYTES):
+
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+        self._frame_start = -1
+        self._scan_pos = 0
+        self.frames_parsed = 0
+        self.bytes_discarded = 0
+
+    def reset(self):
+
+        del self._buffer[:]
+        self._frame_start = -1
+        self._scan_pos = 0
+
+    def feed(self, chunk) -> List[bytes]:
+
+        buf = self._buffer
+        buf += chunk
+        frames = []
+
+        while True:
+            if self._frame_start < 0:
+                start = buf.find(JPEG_SOI, self._scan_pos)
+                if start < 0:
+                    # Keep a trailing 0xFF in case the marker is split across reads
+                    keep = 1 if buf.endswith(b'\xff') else 0
+                    self.bytes_discarded += max(0, len(buf) - keep - self._scan_pos)
+                    del buf[:len(buf) - keep]
+                    self._scan_pos = 0
+                    return frames
+                self.bytes_discarded += start - self._scan_pos
+                self._frame_start = start
+                self._scan_pos = start + 2
+
+            end = buf.find(JPEG_EOI, self._scan_pos)
+            if end < 0:
+                if len(buf) - self._frame_start > self.max_frame_bytes:
+                    logger.warning("MJPEG frame exceeded buffer limit - resynchronising")
+                    self.bytes_discarded += len(buf)
+                    self.reset()
+                    return frames
+                self._scan_pos = max(self._frame_start + 2, len(buf) - 1)
+                break
+
+            end += 2
+            with memoryview(buf) as view:
+                frames.append(bytes(view[self._frame_start:end]))
+            self.frames_parsed += 1
+            self._frame_start = -1
+            self._scan_pos = end
+
+        # Compact the buffer so it only holds the partial frame in progress
+        if self._frame_start > 0:
+            del buf[:self._frame_start]
+            self._scan_pos -= self._frame_start
+            self._frame_start = 0
+
+        return frames
+
+class RpicamMJPEGPipe:
+    """Long-lived rpicam-vid process streaming MJPEG over stdout.
+
+    Each parsed frame is handed to ``on_frame``. The process is restarted
+    when it exits, and repeated start failures step down through the
+    configured resolution/quality profiles.
+    """
+
+    def __init__(self, on_frame: Callable[[bytes], None],
+                 profiles: Optional[List[dict]] = None,
+                 command: Optional[List[str]] = None):
+
+        self.on_frame = on_frame
+        self.profiles = profiles or CSIPipeConfig.PROFILES
+        self.command = command or csi_pipe_command()
+        self.profile_index = 0
+
+        self.process = None
+        self.thread = None
+        self.running = False
+        self._process_lock = threading.Lock()
+        self._parser = MJPEGFrameParser()
+        self._chunk = bytearray(CSIPipeConfig.READ_CHUNK_SIZE)
+
+        self.frame_count = 0
+        self.restart_count = 0
+        self.started_at = 0.0
+        self.last_frame_time = 0.0
+
+    def build_command(self, profile: dict) -> List[str]:
+
+        return [
+            *self.command,
+            '--nopreview',
+            '--codec', 'mjpeg',
+            '--timeout', '0',
+            '--width', str(profile['width']),
+            '--height', str(profile['height']),
+            '--quality', str(profile['quality']),
+            '--framerate', str(profile['framerate']),
+            '--flush',
+            '--output', '-'
+        ]
+
+    def start(self) -> bool:
+
+        if self.running:
+            return True
+
+        self.running = True
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+
+        self.running = False
+        self._terminate_process()
+
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=3)
+        self.thread = None
+
+    def set_profile(self, index: int) -> bool:
+
+        if not 0 <= index < len(self.profiles):
+            return False
+
+        self.profile_index = index
+        # The capture thread relaunches with the new profile once the old process exits
+        self._terminate_process()
+        return True
+
+    def _terminate_process(self):
+
+        with self._process_lock:
+            process = self.process
+
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _run(self):
+
+        restart_delay = CSIPipeConfig.RESTART_DELAY
+        failed_starts = 0
+
+        while self.running:
+            profile = self.profiles[self.profile_index]
+            frames_before = self.frame_count
+
+            try:
+                with self._process_lock:
+                    self.process = subprocess.Popen(
+                        self.build_command(profile),
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        bufsize=0
+                    )
+                logger.info(f"📷 CSI MJPEG pipe started ({profile['width']}x{profile['height']} "
+                            f"q{profile['quality']} @ {profile['framerate']} FPS)")
+                self._read_frames(self.process)
+            except FileNotFoundError:
+                logger.error(f"❌ {self.command[0]} not found - CSI pipe disabled")
+                self.running = False
+                break
+            except Exception as e:
+                logger.error(f"CSI pipe error: {e}")
+            finally:
+                self._terminate_process()
+
+            if not self.running:
+                break
+
+            if self.frame_count > frames_before:
+                failed_starts = 0
+                restart_delay = CSIPipeConfig.RESTART_DELAY
+            else:
+                failed_starts += 1
+                if failed_starts >= CSIPipeConfig.FAILED_STARTS_BEFORE_FALLBACK:
+                    self.profile_index = (self.profile_index + 1) % len(self.profiles)
+                    failed_starts = 0
+                    logger.warning(f"🔄 Switching CSI pipe to profile {self.profile_index + 1}")
+
+            self.restart_count += 1
+            logger.warning(f"⚠️ CSI pipe exited - restarting in {restart_delay:.1f}s")
+            time.sleep(restart_delay)
+            restart_delay = min(restart_delay * 2, CSIPipeConfig.MAX_RESTART_DELAY)
+
+        logger.info(f"📷 CSI MJPEG pipe stopped after {self.frame_count} frames")
+
+    def _read_frames(self, process):
+
+        self._parser.reset()
+        chunk_view = memoryview(self._chunk)
+        stdout = process.stdout
+
+        while self.running:
+            n = stdout.readinto(chunk_view)
+            if not n:
+                break
+
+            for jpeg in self._parser.feed(chunk_view[:n]):
+                self.frame_count += 1
+                self.last_frame_time = time.time()
+                try:
+                    self.on_frame(jpeg)
+                except Exception as e:
+                    logger.debug(f"CSI frame callback error: {e}")
+
+    def get_stats(self) -> dict:
+
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        profile = self.profiles[self.profile_index]
+        return {
+            'running': self.running,
+            'profile': self.profile_index,
+            'width': profile['width'],
+            'height': profile['height'],
+            'quality': profile['quality'],
+            'frames': self.frame_count,
+            'fps': round(self.frame_count / elapsed, 1) if elapsed > 0 else 0.0,
+            'restarts': self.restart_count,
+            'bytes_discarded': self._parser.bytes_discarded,
+            'last_frame_time': self.last_frame_time
+        }
@@ -0,0 +1,92 @@
+import logging
+import threading
+from typing import Callable, Iterator, Optional
+
+from src.frame_ring import FrameRing, FrameSnapshot
+
+logger = logging.getLogger(__name__)
+
+MJPEG_BOUNDARY = 'frame'
+
+class MJPEGBroadcaster:
+    """Fans frames from one FrameRing out to any number of MJPEG clients.
+
+    Each frame's multipart chunk is built once and the same bytes object is
+    handed to every client. Clients always jump to the newest frame, so a
+    slow connection drops frames instead of building a backlog.
+    """
+
+    def __init__(self, ring: FrameRing, boundary: str = MJPEG_BOUNDARY):
+
+        self.ring = ring
+        self.boundary = boundary.encode()
+        self._part_lock = threading.Lock()
+        self._part_seq = 0
+        self._part: Optional[bytes] = None
+
+        self._clients_lock = threading.Lock()
+        self.clients = 0
+        self.parts_built = 0
+        self.parts_sent = 0
+        self.frames_skipped = 0
+
+    @property
+    def content_type(self) -> str:
+
+        return f"multipart/x-mixed-replace; boundary={self.boundary.decode()}"
+
+    def _get_part(self, snapshot: FrameSnapshot) -> Optional[bytes]:
+
+        with self._part_lock:
+            if self._part_seq == snapshot.seq:
+                return self._part
+
+            jpeg = self.ring.get_jpeg(snapshot)
+            if jpeg is None:
+                return None
+
+            header = (b'--' + self.boundary + b'\r\n'
+                      b'Content-Type: image/jpeg\r\n'
+                      b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n'
+                      b'X-Frame-Seq: ' + str(snapshot.seq).encode() + b'\r\n'
+                      b'X-Frame-Timestamp: ' + str(int(snapshot.timestamp * 1000)).encode() + b'\r\n\r\n')
+            self._part = b''.join((header, jpeg, b'\r\n'))
+            self._part_seq = snapshot.seq
+            self.parts_built += 1
+            return self._part
+
+    def stream(self, is_active: Callable[[], bool], wait_timeout: float = 1.0) -> Iterator[bytes]:
+
+        with self._clients_lock:
+            self.clients += 1
+        logger.info(f"🎥 MJPEG client connected ({self.clients} active)")
+
+        last_seq = 0
+        try:
+            while is_active():
+                snapshot = self.ring.wait_for(last_seq, timeout=wait_timeout)
+                if snapshot is None or snapshot.seq <= last_seq:
+                    continue
+
+                part = self._get_part(snapshot)
+                if part is None:
+                    continue
+
+                if last_seq:
+                    self.frames_skipped += snapshot.seq - last_seq - 1
+                last_seq = snapshot.seq
+                self.parts_sent += 1
+                yield part
+        finally:
+            with self._clients_lock:
+                self.clients -= 1
+            logger.info(f"🎥 MJPEG client disconnected ({self.clients} active)")
+
+    def get_stats(self) -> dict:
+
+        return {
+            'clients': self.clients,
+            'parts_built': self.parts_built,
+            'parts_sent': self.parts_sent,
+            'frames_skipped': self.frames_skipped
+        }
@@ -0,0 +1,134 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import MotionGateConfig
+
+logger = logging.getLogger(__name__)
+
+class MotionGate:
+    """Cheap per-frame check that decides whether the person detector runs.
+
+    Each frame is shrunk to a small grayscale thumbnail and compared with a
+    running-average background; only when enough pixels changed (or shortly
+    after they did, or on a periodic re-check) is the expensive detector
+    worth running. The thumbnail costs well under a millisecond on the Pi,
+    against tens to hundreds for a HOG pass.
+
+    ``regions`` holds the changed areas of the last passed frame in frame
+    pixels (x1, y1, x2, y2), or None when the whole frame should be scanned
+    (first frame, periodic re-check, gate disabled).
+    """
+
+    def __init__(self, width: int = MotionGateConfig.WIDTH,
+                 pixel_threshold: int = MotionGateConfig.PIXEL_THRESHOLD,
+                 min_changed_ratio: float = MotionGateConfig.MIN_CHANGED_RATIO,
+                 background_alpha: float = MotionGateConfig.BACKGROUND_ALPHA,
+                 hold_seconds: float = MotionGateConfig.HOLD_SECONDS,
+                 force_interval: float = MotionGateConfig.FORCE_INTERVAL):
+
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.background_alpha = background_alpha
+        self.hold_seconds = hold_seconds
+        self.force_interval = force_interval
+
+        self.enabled = True
+        self._background: Optional[np.ndarray] = None
+        self._last_motion = 0.0
+        self._last_pass = 0.0
+        self._motion_regions: List[Tuple[int, int, int, int]] = []
+        self.regions: Optional[List[Tuple[int, int, int, int]]] = None
+
+        self.frames = 0
+        self.passed = 0
+        self.gated = 0
+        self.motion_frames = 0
+        self.forced = 0
+        self.last_changed_ratio = 0.0
+        self.total_gate_time = 0.0
+
+    def reset(self):
+
+        self._background = None
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _find_regions(self, changed: np.ndarray, frame_shape) -> List[Tuple[int, int, int, int]]:
+
+        scale = frame_shape[1] / changed.shape[1]
+        mask = cv2.dilate(changed.astype(np.uint8), np.ones((3, 3), np.uint8), iterations=2)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        regions = []
+        for x, y, w, h, area in stats[1:count].tolist():
+            if area >= 4:
+                regions.append((int(x * scale), int(y * scale), int((x + w) * scale), int((y + h) * scale)))
+        return regions
+
+    def check(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """True if the detector should run on ``frame``"""
+        now = time.monotonic() if now is None else now
+        started = time.perf_counter()
+        self.frames += 1
+
+        thumb = self._thumbnail(frame)
+        full_frame = not self.enabled
+        if self._background is None or self._background.shape != thumb.shape:
+            self._background = thumb.astype(np.float32)
+            motion = full_frame = True
+            self.last_changed_ratio = 1.0
+        else:
+            changed = cv2.absdiff(thumb, cv2.convertScaleAbs(self._background)) > self.pixel_threshold
+            self.last_changed_ratio = np.count_nonzero(changed) / changed.size
+            motion = self.last_changed_ratio >= self.min_changed_ratio
+            cv2.accumulateWeighted(thumb, self._background, self.background_alpha)
+            if motion:
+                self._motion_regions = self._find_regions(changed, frame.shape)
+
+        if motion:
+            self.motion_frames += 1
+            self._last_motion = now
+
+        # While holding after motion, keep scanning where it last happened
+        run = (not self.enabled or motion or
+               now - self._last_motion < self.hold_seconds)
+        if not run and now - self._last_pass >= self.force_interval:
+            run = full_frame = True
+            self.forced += 1
+
+        self.regions = None if full_frame else list(self._motion_regions)
+
+        if run:
+            self.passed += 1
+            self._last_pass = now
+        else:
+            self.gated += 1
+        self.total_gate_time += time.perf_counter() - started
+        return run
+
+    def get_stats(self) -> dict:
+
+        return {
+            'enabled': self.enabled,
+            'frames': self.frames,
+            'detected': self.passed,
+            'gated': self.gated,
+            'gated_ratio': round(self.gated / self.frames, 3) if self.frames else 0.0,
+            'motion_frames': self.motion_frames,
+            'forced': self.forced,
+            'last_changed_ratio': round(float(self.last_changed_ratio), 4),
+            'avg_gate_ms': round(self.total_gate_time / self.frames * 1000, 3) if self.frames else 0.0,
+            'pixel_threshold': self.pixel_threshold,
+            'min_changed_ratio': self.min_changed_ratio
+        }
@@ -1,9 +1,16 @@
-import smbus2
+import asyncio
 import time
-import struct
 import logging
 from typing import Dict, Tuple, Optional
-from config import I2CConfig
+
+import numpy as np
+
+from config import I2CConfig, SensorConfig, MagnetometerConfig
+from src.i2c_bus import get_bus
+from src.imu_decoder import (IMUDecoder, ACCEL_SENSITIVITY, GYRO_SENSITIVITY,
+                             full_scale_bits)
+from src import magnetometer as ak8963
+from src.magnetometer import MagCalibration, decode_mag, tilt_compensated_heading
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +27,24 @@ class MPU9250:
     ACCEL_XOUT_H = 0x3B
     GYRO_XOUT_H = 0x43
     TEMP_OUT_H = 0x41
+    SENSOR_BURST_LENGTH = 14
+    
+    INT_PIN_CFG = 0x37
+    USER_CTRL = 0x6A
+    I2C_MST_CTRL = 0x24
+    I2C_SLV0_ADDR = 0x25
+    I2C_SLV0_REG = 0x26
+    I2C_SLV0_CTRL = 0x27
+    EXT_SENS_DATA_00 = 0x49
+    BYPASS_EN = 0x02
+    I2C_MST_EN = 0x20
+    I2C_MST_400KHZ = 0x0D
     
     MAG_ADDRESS = 0x0C
     MAG_CNTL1 = 0x0A
     MAG_XOUT_L = 0x03
+    # EXT_SENS_DATA follows GYRO_ZOUT_L, so the magnetometer extends the burst
+    MAG_BURST_LENGTH = SENSOR_BURST_LENGTH + ak8963.MAG_DATA_BYTES
     
     def __init__(self, bus_number: int = I2CConfig.BUS_NUMBER, 
                  address: int = I2CConfig.MPU9250_ADDRESS):
@@ -32,11 +53,18 @@ class MPU9250:
         self.address = address
         self.bus = None
         self.is_initialized = False
+        self.decoder = IMUDecoder(SensorConfig.ACCEL_RANGE, SensorConfig.GYRO_RANGE, chip='mpu9250')
+        
+        self.burst_length = self.SENSOR_BURST_LENGTH
+        self.mag_available = False
+        self.mag_scale = np.ones(3)
+        self.mag_calibration = MagCalibration.load(MagnetometerConfig.CALIBRATION_FILE)
+        self._last_mag: Optional[np.ndarray] = None
         
     async def initialize(self) -> bool:
         
         try:
-            self.bus = smbus2.SMBus(self.bus_number)
+            self.bus = get_bus(self.bus_number)
             
             device_id = self.bus.read_byte_data(self.address, self.WHO_AM_I)
             if device_id not in [0x71, 0x73]:
@@ -49,14 +77,19 @@ class MPU9250:
             self.bus.write_byte_data(self.address, self.PWR_MGMT_1, 0x00)
             await asyncio.sleep(0.1)
             
-            self.bus.write_byte_data(self.address, self.GYRO_CONFIG, 0x18)
+            self.bus.write_byte_data(self.address, self.GYRO_CONFIG,
+                                     full_scale_bits(self.decoder.gyro_range, GYRO_SENSITIVITY))
             
-            self.bus.write_byte_data(self.address, self.ACCEL_CONFIG, 0x18)
+            self.bus.write_byte_data(self.address, self.ACCEL_CONFIG,
+                                     full_scale_bits(self.decoder.accel_range, ACCEL_SENSITIVITY))
             
             self.bus.write_byte_data(self.address, 0x19, 19)
             
             self.bus.write_byte_data(self.address, self.CONFIG, 0x03)
             
+            self.mag_available = await self._initialize_magnetometer()
+            self.burst_length = self.MAG_BURST_LENGTH if self.mag_available else self.SENSOR_BURST_LENGTH
+            
             self.is_initialized = True
             logger.info("MPU-9250 initialized successfully")
             return True
@@ -65,6 +98,45 @@ class MPU9250:
             logger.error(f"Failed to initialize MPU-9250: {e}")
             return False
     
+    async def _initialize_magnetometer(self, rate_hz: int = MagnetometerConfig.RATE_HZ) -> bool:
+        """Set up the AK8963 through bypass mode, then hand it to the MPU's I2C master"""
+        try:
+            self.bus.write_byte_data(self.address, self.USER_CTRL, 0x00)
+            self.bus.write_byte_data(self.address, self.INT_PIN_CFG, self.BYPASS_EN)
+            await asyncio.sleep(0.01)
+            
+            device_id = self.bus.read_byte_data(self.MAG_ADDRESS, ak8963.WIA)
+            if device_id != ak8963.AK8963_DEVICE_ID:
+                logger.warning(f"Unexpected AK8963 device ID: 0x{device_id:02X}")
+                return False
+            
+            # Factory sensitivity adjustment lives in the fuse ROM
+            self.bus.write_byte_data(self.MAG_ADDRESS, self.MAG_CNTL1, ak8963.MODE_POWER_DOWN)
+            await asyncio.sleep(0.01)
+            self.bus.write_byte_data(self.MAG_ADDRESS, self.MAG_CNTL1, ak8963.MODE_FUSE_ROM)
+            await asyncio.sleep(0.01)
+            asa = self.bus.read_i2c_block_data(self.MAG_ADDRESS, ak8963.ASAX, 3)
+            self.mag_scale = ak8963.sensitivity_adjustment(bytes(asa))
+            self.bus.write_byte_data(self.MAG_ADDRESS, self.MAG_CNTL1, ak8963.MODE_POWER_DOWN)
+            await asyncio.sleep(0.01)
+            self.bus.write_byte_data(self.MAG_ADDRESS, self.MAG_CNTL1, ak8963.continuous_mode(rate_hz))
+            await asyncio.sleep(0.01)
+            
+            # SLV0 copies HXL..ST2 into EXT_SENS_DATA every sample period
+            self.bus.write_byte_data(self.address, self.INT_PIN_CFG, 0x00)
+            self.bus.write_byte_data(self.address, self.USER_CTRL, self.I2C_MST_EN)
+            self.bus.write_byte_data(self.address, self.I2C_MST_CTRL, self.I2C_MST_400KHZ)
+            self.bus.write_byte_data(self.address, self.I2C_SLV0_ADDR, 0x80 | self.MAG_ADDRESS)
+            self.bus.write_byte_data(self.address, self.I2C_SLV0_REG, self.MAG_XOUT_L)
+            self.bus.write_byte_data(self.address, self.I2C_SLV0_CTRL, 0x80 | ak8963.MAG_DATA_BYTES)
+            
+            logger.info(f"AK8963 magnetometer running at {rate_hz} Hz (ASA {self.mag_scale.round(3).tolist()})")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Magnetometer unavailable: {e}")
+            return False
+    
     def read_accelerometer(self) -> Tuple[float, float, float]:
         
         if not self.is_initialized:
@@ -73,13 +145,7 @@ class MPU9250:
         try:
             data = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, 6)
             
-            ax = struct.unpack('>h', bytes(data[0:2]))[0]
-            ay = struct.unpack('>h', bytes(data[2:4]))[0]
-            az = struct.unpack('>h', bytes(data[4:6]))[0]
-            
-            ax_g = ax / 2048.0
-            ay_g = ay / 2048.0
-            az_g = az / 2048.0
+            ax_g, ay_g, az_g = self.decoder.decode_accel(bytes(data)).tolist()
             
             return ax_g, ay_g, az_g
             
@@ -95,13 +161,7 @@ class MPU9250:
         try:
             data = self.bus.read_i2c_block_data(self.address, self.GYRO_XOUT_H, 6)
             
-            gx = struct.unpack('>h', bytes(data[0:2]))[0]
-            gy = struct.unpack('>h', bytes(data[2:4]))[0]
-            gz = struct.unpack('>h', bytes(data[4:6]))[0]
-            
-            gx_dps = gx / 16.384
-            gy_dps = gy / 16.384
-            gz_dps = gz / 16.384
+            gx_dps, gy_dps, gz_dps = self.decoder.decode_gyro(bytes(data)).tolist()
             
             return gx_dps, gy_dps, gz_dps
             
@@ -116,9 +176,7 @@ class MPU9250:
         
         try:
             data = self.bus.read_i2c_block_data(self.address, self.TEMP_OUT_H, 2)
-            temp_raw = struct.unpack('>h', bytes(data))[0]
-            
-            temp_c = (temp_raw / 333.87) + 21.0
+            temp_c = self.decoder.decode_temp(bytes(data))
             
             return temp_c
             
@@ -126,14 +184,26 @@ class MPU9250:
             logger.error(f"Failed to read temperature: {e}")
             return 0.0
     
+    def read_burst(self) -> Tuple[bytes, float]:
+        """Accel, temperature, gyro and magnetometer registers from one I2C transaction (blocking)"""
+        if not self.is_initialized:
+            raise RuntimeError("MPU-9250 not initialized")
+        
+        data = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, self.burst_length)
+        timestamp = time.time()
+        return bytes(data), timestamp
+    
     async def read_all_sensors(self) -> Dict[str, Dict[str, float]]:
         
         try:
-            accel_x, accel_y, accel_z = self.read_accelerometer()
-            gyro_x, gyro_y, gyro_z = self.read_gyroscope()
-            temperature = self.read_temperature()
+            # Blocking bus I/O runs in a worker thread so the event loop keeps serving
+            raw, timestamp = await asyncio.to_thread(self.read_burst)
+            batch = self.decoder.decode(raw[:self.SENSOR_BURST_LENGTH])
+            accel_x, accel_y, accel_z = batch.accel[0].tolist()
+            gyro_x, gyro_y, gyro_z = batch.gyro[0].tolist()
+            temperature = float(batch.temp[0])
             
-            return {
+            data = {
                 "accelerometer": {
                     "x": accel_x,
                     "y": accel_y,
@@ -150,18 +220,60 @@ class MPU9250:
                     "value": temperature,
                     "unit": "celsius"
                 },
-                "timestamp": time.time()
+                "timestamp": timestamp
             }
             
+            if self.mag_available:
+                mag = decode_mag(raw[self.SENSOR_BURST_LENGTH:], self.mag_scale)
+                if mag is not None:
+                    self._last_mag = self.mag_calibration.apply(mag)
+                if self._last_mag is not None:
+                    mag_x, mag_y, mag_z = self._last_mag.tolist()
+                    data["magnetometer"] = {
+                        "x": mag_x,
+                        "y": mag_y,
+                        "z": mag_z,
+                        "unit": "uT"
+                    }
+                    heading = tilt_compensated_heading(batch.accel[0], self._last_mag)
+                    if heading is not None:
+                        data["heading"] = {
+                            "value": heading,
+                            "unit": "degrees"
+                        }
+            
+            return data
+            
         except Exception as e:
             logger.error(f"Failed to read all sensors: {e}")
             return {}
     
+    async def calibrate_magnetometer(self, duration: float = MagnetometerConfig.CALIBRATION_SECONDS) -> dict:
+        """Fit hard/soft-iron correction while the device is rotated, and save it to disk"""
+        if not self.mag_available:
+            raise RuntimeError("Magnetometer not available")
+        
+        samples = []
+        interval = 1.0 / SensorConfig.IMU_SAMPLE_RATE
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            raw, _ = await asyncio.to_thread(self.read_burst)
+            mag = decode_mag(raw[self.SENSOR_BURST_LENGTH:], self.mag_scale)
+            if mag is not None:
+                samples.append(mag)
+            await asyncio.sleep(interval)
+        
+        calibration = MagCalibration.fit(np.array(samples).reshape(-1, 3))
+        calibration.save(MagnetometerConfig.CALIBRATION_FILE)
+        self.mag_calibration = calibration
+        self._last_mag = None
+        logger.info(f"Magnetometer calibrated from {calibration.samples} samples")
+        return calibration.to_dict()
+    
     def close(self):
         
         if self.bus:
             self.bus.close()
+            self.bus = None
             self.is_initialized = False
             logger.info("MPU-9250 connection closed")
-
-import asyncio
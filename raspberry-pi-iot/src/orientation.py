@@ -0,0 +1,139 @@
+import logging
+import math
+
+import numpy as np
+
+from config import OrientationConfig
+
+logger = logging.getLogger(__name__)
+
+DEG_TO_RAD = math.pi / 180.0
+RAD_TO_DEG = 180.0 / math.pi
+
+class MadgwickFilter:
+    """Incremental 6-DoF Madgwick orientation filter.
+
+    State is four floats updated in place once per sample (gyro integration
+    plus a gradient-descent correction towards the measured gravity
+    vector), so the cost is constant per sample and nothing is allocated
+    while a batch is processed. Yaw drifts without a magnetometer.
+    """
+
+    def __init__(self, beta: float = OrientationConfig.BETA):
+
+        self.beta = beta
+        self.q0, self.q1, self.q2, self.q3 = 1.0, 0.0, 0.0, 0.0
+        self.linear_accel = (0.0, 0.0, 0.0)
+        self.initialized = False
+        self.samples = 0
+
+    def reset(self):
+
+        self.q0, self.q1, self.q2, self.q3 = 1.0, 0.0, 0.0, 0.0
+        self.linear_accel = (0.0, 0.0, 0.0)
+        self.initialized = False
+
+    def _init_from_gravity(self, ax: float, ay: float, az: float):
+
+        # Start level with the measured gravity vector instead of converging from identity
+        roll = math.atan2(ay, az)
+        pitch = math.atan2(-ax, math.sqrt(ay * ay + az * az))
+        cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+        cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+        self.q0, self.q1, self.q2, self.q3 = cr * cp, sr * cp, cr * sp, -sr * sp
+        self.initialized = True
+
+    def update(self, accel: np.ndarray, gyro: np.ndarray, dt: float):
+        """Advance the filter over N samples of accel (g) and gyro (dps) spaced ``dt`` apart"""
+        if len(accel) == 0:
+            return
+
+        if not self.initialized:
+            ax, ay, az = accel[0].tolist()
+            if ax or ay or az:
+                self._init_from_gravity(ax, ay, az)
+
+        beta = self.beta
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        half_dt_rad = 0.5 * dt * DEG_TO_RAD
+
+        for (ax, ay, az), (gx, gy, gz) in zip(accel.tolist(), gyro.tolist()):
+            # Rate of change of the quaternion from the gyroscope (gyro pre-scaled by dt/2)
+            gx *= half_dt_rad
+            gy *= half_dt_rad
+            gz *= half_dt_rad
+            d0 = -q1 * gx - q2 * gy - q3 * gz
+            d1 = q0 * gx + q2 * gz - q3 * gy
+            d2 = q0 * gy - q1 * gz + q3 * gx
+            d3 = q0 * gz + q1 * gy - q2 * gx
+
+            norm = ax * ax + ay * ay + az * az
+            if norm > 0.0:
+                norm = 1.0 / math.sqrt(norm)
+                ax *= norm
+                ay *= norm
+                az *= norm
+
+                # Gradient of the gravity-direction objective function
+                s0 = 4 * q0 * q2 * q2 + 2 * q2 * ax + 4 * q0 * q1 * q1 - 2 * q1 * ay
+                s1 = (4 * q1 * q3 * q3 - 2 * q3 * ax + 4 * q0 * q0 * q1 - 2 * q0 * ay - 4 * q1
+                      + 8 * q1 * q1 * q1 + 8 * q1 * q2 * q2 + 4 * q1 * az)
+                s2 = (4 * q0 * q0 * q2 + 2 * q0 * ax + 4 * q2 * q3 * q3 - 2 * q3 * ay - 4 * q2
+                      + 8 * q2 * q1 * q1 + 8 * q2 * q2 * q2 + 4 * q2 * az)
+                s3 = 4 * q1 * q1 * q3 - 2 * q1 * ax + 4 * q2 * q2 * q3 - 2 * q2 * ay
+
+                norm = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+                if norm > 0.0:
+                    step = beta * dt / math.sqrt(norm)
+                    d0 -= step * s0
+                    d1 -= step * s1
+                    d2 -= step * s2
+                    d3 -= step * s3
+
+            q0 += d0
+            q1 += d1
+            q2 += d2
+            q3 += d3
+            norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+            q0 *= norm
+            q1 *= norm
+            q2 *= norm
+            q3 *= norm
+
+        self.q0, self.q1, self.q2, self.q3 = q0, q1, q2, q3
+        self.samples += len(accel)
+
+        gravity = self.gravity()
+        ax, ay, az = accel[-1].tolist()
+        self.linear_accel = (ax - gravity[0], ay - gravity[1], az - gravity[2])
+
+    def quaternion(self) -> tuple:
+
+        return self.q0, self.q1, self.q2, self.q3
+
+    def gravity(self) -> tuple:
+        """Gravity direction in the sensor frame (unit vector, g)"""
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        return (2 * (q1 * q3 - q0 * q2),
+                2 * (q0 * q1 + q2 * q3),
+                q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3)
+
+    def euler(self) -> tuple:
+        """Roll, pitch and yaw in degrees"""
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+        roll = math.atan2(2 * (q0 * q1 + q2 * q3), 1 - 2 * (q1 * q1 + q2 * q2))
+        pitch = math.asin(max(-1.0, min(1.0, 2 * (q0 * q2 - q3 * q1))))
+        yaw = math.atan2(2 * (q0 * q3 + q1 * q2), 1 - 2 * (q2 * q2 + q3 * q3))
+        return roll * RAD_TO_DEG, pitch * RAD_TO_DEG, yaw * RAD_TO_DEG
+
+    def get_state(self) -> dict:
+
+        roll, pitch, yaw = self.euler()
+        lx, ly, lz = self.linear_accel
+        return {
+            "quaternion": [round(q, 5) for q in self.quaternion()],
+            "roll": round(roll, 2),
+            "pitch": round(pitch, 2),
+            "yaw": round(yaw, 2),
+            "linear_accel": [round(lx, 4), round(ly, 4), round(lz, 4)]
+        }
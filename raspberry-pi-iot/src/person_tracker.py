@@ -0,0 +1,226 @@
+"""Multi-person tracking between detector passes.
+
+The detector only runs on every Nth frame (and not at all while the
+motion gate reports a static scene). Each detected person gets a track
+with a stable ID and a constant-velocity Kalman filter over its box
+centre and size; detections are matched to the tracks' predicted boxes
+greedily by IoU. In between detections, ``tracks_at`` extrapolates every
+track to any frame timestamp, which costs a few multiply-adds per track,
+so per-frame boxes are smooth at a fraction of the detector's cost.
+
+Times are wall-clock seconds, matching frame snapshot timestamps.
+"""
+import logging
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from config import TrackerConfig
+
+logger = logging.getLogger(__name__)
+
+def iou(a: Sequence[float], b: Sequence[float]) -> float:
+
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+# State: centre x, centre y, width, height and their velocities (per second)
+_H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+class Track:
+
+    def __init__(self, track_id: int, box: Sequence[float], confidence: float, timestamp: float):
+
+        x1, y1, x2, y2 = box
+        self.id = track_id
+        self.x = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1, 0, 0, 0, 0], dtype=float)
+        scale = max(self.x[3], 1.0)
+        # Position is known to within the measurement noise, velocity not at all yet
+        self.P = np.diag(np.square([TrackerConfig.MEASUREMENT_NOISE * scale] * 4 +
+                                   [TrackerConfig.INITIAL_VELOCITY_NOISE * scale] * 4))
+        self.confidence = confidence
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.updated_at = timestamp
+
+    def _transition(self, dt: float) -> np.ndarray:
+
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        return F
+
+    def predict(self, timestamp: float):
+
+        dt = timestamp - self.updated_at
+        if dt <= 0:
+            return
+        F = self._transition(dt)
+        scale = max(self.x[3], 1.0)
+        q = np.square([TrackerConfig.POSITION_NOISE * scale] * 4 +
+                      [TrackerConfig.VELOCITY_NOISE * scale] * 4) * dt
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + np.diag(q)
+        self.updated_at = timestamp
+
+    def correct(self, box: Sequence[float], confidence: float, timestamp: float):
+
+        x1, y1, x2, y2 = box
+        z = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=float)
+        R = np.diag(np.square([TrackerConfig.MEASUREMENT_NOISE * max(z[3], 1.0)] * 4))
+        S = _H @ self.P @ _H.T + R
+        K = self.P @ _H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - _H @ self.x)
+        self.P = (np.eye(8) - K @ _H) @ self.P
+
+        self.confidence = confidence
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = timestamp
+
+    def box_at(self, timestamp: float) -> List[float]:
+        """Extrapolated (x1, y1, x2, y2) without changing the filter state"""
+        dt = min(max(0.0, timestamp - self.updated_at), TrackerConfig.MAX_AGE)
+        cx, cy, w, h = self.x[:4] + self.x[4:] * dt
+        w, h = max(w, 1.0), max(h, 1.0)
+        return [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]
+
+class PersonTracker:
+
+    def __init__(self, iou_threshold: float = TrackerConfig.IOU_THRESHOLD,
+                 min_hits: int = TrackerConfig.MIN_HITS,
+                 max_age: float = TrackerConfig.MAX_AGE,
+                 max_misses: int = TrackerConfig.MAX_MISSES):
+
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.max_misses = max_misses
+
+        self.tracks: List[Track] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.last_update = 0.0
+        self.frame_size: Optional[tuple] = None
+
+        self.updates = 0
+        self.stale_updates = 0
+        self.created = 0
+        self.expired = 0
+
+    def update(self, boxes: Sequence[Sequence[float]], confidence: float, timestamp: float,
+               frame_shape: Optional[tuple] = None):
+        """Fold one detector pass, taken at ``timestamp``, into the tracks"""
+        with self._lock:
+            # Results from parallel workers can finish out of order; an older
+            # frame would drag every track backwards
+            if timestamp < self.last_update:
+                self.stale_updates += 1
+                return
+            self.last_update = timestamp
+            self.updates += 1
+            if frame_shape is not None:
+                self.frame_size = (frame_shape[1], frame_shape[0])
+
+            for track in self.tracks:
+                track.predict(timestamp)
+
+            # Greedy association, best overlap first
+            pairs = []
+            for t, track in enumerate(self.tracks):
+                predicted = track.box_at(timestamp)
+                for d, box in enumerate(boxes):
+                    overlap = iou(predicted, box)
+                    if overlap >= self.iou_threshold:
+                        pairs.append((overlap, t, d))
+            pairs.sort(reverse=True)
+
+            matched_tracks, matched_boxes = set(), set()
+            for _, t, d in pairs:
+                if t in matched_tracks or d in matched_boxes:
+                    continue
+                self.tracks[t].correct(boxes[d], confidence, timestamp)
+                matched_tracks.add(t)
+                matched_boxes.add(d)
+
+            for t, track in enumerate(self.tracks):
+                if t not in matched_tracks:
+                    track.misses += 1
+            for d, box in enumerate(boxes):
+                if d not in matched_boxes:
+                    self.tracks.append(Track(self._next_id, box, confidence, timestamp))
+                    self._next_id += 1
+                    self.created += 1
+
+            self._expire(timestamp)
+
+    def hold(self, timestamp: float):
+        """The scene did not change since the last pass: keep the tracks that pass
+        confirmed where they are. Tracks it missed keep ageing out."""
+        with self._lock:
+            for track in self.tracks:
+                if track.misses:
+                    continue
+                track.predict(timestamp)
+                track.x[4:] = 0.0
+                track.last_seen = timestamp
+
+    def prune(self, timestamp: float):
+
+        with self._lock:
+            self._expire(timestamp)
+
+    def _expire(self, timestamp: float):
+
+        alive = [track for track in self.tracks
+                 if timestamp - track.last_seen <= self.max_age and track.misses < self.max_misses]
+        if len(alive) != len(self.tracks):
+            self.expired += len(self.tracks) - len(alive)
+            self.tracks = alive
+
+    def _clip(self, box: List[float]) -> List[int]:
+
+        if self.frame_size is None:
+            return [int(round(v)) for v in box]
+        width, height = self.frame_size
+        x1, y1, x2, y2 = box
+        return [int(round(min(max(x1, 0), width))), int(round(min(max(y1, 0), height))),
+                int(round(min(max(x2, 0), width))), int(round(min(max(y2, 0), height)))]
+
+    def tracks_at(self, timestamp: float) -> List[dict]:
+        """Confirmed tracks with boxes extrapolated to ``timestamp``"""
+        with self._lock:
+            return [{
+                'id': track.id,
+                'box': self._clip(track.box_at(timestamp)),
+                'confidence': round(float(track.confidence), 3),
+                'velocity': [round(float(v), 1) for v in track.x[4:6]],
+                'age': round(timestamp - track.first_seen, 2),
+                'predicted': timestamp > track.last_seen
+            } for track in self.tracks
+                if track.hits >= self.min_hits and timestamp - track.last_seen <= self.max_age]
+
+    def boxes_at(self, timestamp: float) -> List[List[int]]:
+
+        return [track['box'] for track in self.tracks_at(timestamp)]
+
+    def __len__(self):
+
+        return sum(1 for track in self.tracks if track.hits >= self.min_hits)
+
+    def get_stats(self) -> dict:
+
+        return {
+            'active': len(self),
+            'tentative': len(self.tracks) - len(self),
+            'updates': self.updates,
+            'stale_updates': self.stale_updates,
+            'created': self.created,
+            'expired': self.expired,
+            'next_id': self._next_id
+        }
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set
+
+import websockets
+
+from config import WebSocketConfig
+
+logger = logging.getLogger(__name__)
+
+PUSH_TOPICS = ('imu', 'alert', 'detection', 'detection_results')
+
+# Fraction of a client's IMU interval a sample may arrive early and still be sent
+IMU_RATE_SLACK = 0.1
+
+class PushClient:
+
+    def __init__(self, websocket, queue_size: int):
+
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.topics: Set[str] = set(PUSH_TOPICS)
+        self.imu_rate = float(WebSocketConfig.DEFAULT_IMU_RATE)
+        self.next_imu_due = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+    def set_imu_rate(self, rate: float):
+
+        self.imu_rate = max(0.1, min(float(rate), WebSocketConfig.MAX_IMU_RATE))
+
+class PushChannel:
+    """WebSocket push channel for IMU samples, alert transitions and detections.
+
+    Runs its own asyncio loop on a background thread so the Flask server and
+    sensor threads can call ``publish`` without blocking. Each message is
+    serialized once; every client has a bounded queue that drops its oldest
+    message when the client falls behind. IMU samples are published once per
+    sampling tick, so a client's IMU rate is capped at ``max_imu_rate``,
+    which the server keeps equal to its tick rate.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = WebSocketConfig.PUSH_PORT,
+                 queue_size: int = WebSocketConfig.CLIENT_QUEUE_SIZE):
+
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.clients: Dict[object, PushClient] = {}
+        self.max_imu_rate = float(WebSocketConfig.MAX_IMU_RATE)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = None
+        self.running = False
+        self._stop_event: Optional[asyncio.Event] = None
+
+        self.published = 0
+        self.dropped = 0
+
+    def start(self) -> bool:
+
+        if self.running:
+            return True
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def set_max_imu_rate(self, rate: float):
+        """IMU samples are published at ``rate`` Hz; no client can be sent more"""
+        self.max_imu_rate = max(0.1, min(float(rate), WebSocketConfig.MAX_IMU_RATE))
+
+    def effective_imu_rate(self, client: PushClient) -> float:
+
+        return min(client.imu_rate, self.max_imu_rate)
+
+    def stop(self):
+
+        self.running = False
+        # The loop is already closed if serving failed, e.g. the port was in use
+        if self.loop and self._stop_event and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=3)
+
+    def _run_loop(self):
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            logger.error(f"❌ Push channel error: {e}")
+        finally:
+            self.running = False
+            self.loop.close()
+
+    async def _serve(self):
+
+        self._stop_event = asyncio.Event()
+        async with websockets.serve(
+            self._handle_client, self.host, self.port,
+            ping_interval=WebSocketConfig.PING_INTERVAL,
+            ping_timeout=WebSocketConfig.PING_TIMEOUT,
+            max_size=WebSocketConfig.MAX_MESSAGE_SIZE
+        ):
+            logger.info(f"📡 Push channel listening on ws://{self.host}:{self.port}")
+            await self._stop_event.wait()
+
+    async def _handle_client(self, websocket):
+
+        client = PushClient(websocket, self.queue_size)
+        self.clients[websocket] = client
+        logger.info(f"📡 Push client connected. Total clients: {len(self.clients)}")
+
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            await websocket.send(json.dumps({
+                "type": "hello",
+                "topics": sorted(client.topics),
+                "imu_rate": round(self.effective_imu_rate(client), 1),
+                "max_imu_rate": round(self.max_imu_rate, 1)
+            }))
+
+            async for message in websocket:
+                self._handle_control(client, message)
+
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.debug(f"Push client error: {e}")
+        finally:
+            sender.cancel()
+            self.clients.pop(websocket, None)
+            logger.info(f"📡 Push client disconnected. Total clients: {len(self.clients)}")
+
+    def _handle_control(self, client: PushClient, message):
+
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+
+        if data.get("type") != "subscribe":
+            return
+
+        topics = data.get("topics")
+        if isinstance(topics, list):
+            client.topics = {topic for topic in topics if topic in PUSH_TOPICS}
+        if "imu_rate" in data:
+            try:
+                client.set_imu_rate(data["imu_rate"])
+            except (TypeError, ValueError):
+                pass
+
+        # Tell the client what it will actually get, e.g. an IMU rate above the tick rate
+        if not client.queue.full():
+            client.queue.put_nowait(json.dumps({
+                "type": "subscribed",
+                "topics": sorted(client.topics),
+                "imu_rate": round(self.effective_imu_rate(client), 1),
+                "max_imu_rate": round(self.max_imu_rate, 1)
+            }))
+
+    async def _send_loop(self, client: PushClient):
+
+        try:
+            while True:
+                message = await client.queue.get()
+                await client.websocket.send(message)
+                client.sent += 1
+        except (asyncio.CancelledError, websockets.ConnectionClosed):
+            pass
+
+    def publish(self, topic: str, data: dict):
+        """Thread-safe: queue ``data`` for every client subscribed to ``topic``"""
+        if not self.running or not self.clients or self.loop is None:
+            return
+
+        message = json.dumps({"type": topic, "data": data})
+        try:
+            # Paced by publish time: callbacks can reach the loop bunched together
+            self.loop.call_soon_threadsafe(self._fan_out, topic, message, time.monotonic())
+        except RuntimeError:
+            pass
+
+    def _fan_out(self, topic: str, message: str, now: float):
+
+        self.published += 1
+
+        for client in self.clients.values():
+            if topic not in client.topics:
+                continue
+
+            if topic == 'imu':
+                # Samples come once per tick, so sends are due on a fixed schedule and
+                # the average matches a rate the tick rate is not a multiple of; the
+                # slack keeps tick jitter from skipping a sample at the full tick rate
+                interval = 1.0 / self.effective_imu_rate(client)
+                if now + interval * IMU_RATE_SLACK < client.next_imu_due:
+                    continue
+                client.next_imu_due = max(client.next_imu_due, now - interval) + interval
+
+            if client.queue.full():
+                # Drop the oldest message so a slow client always gets fresh data
+                client.queue.get_nowait()
+                client.dropped += 1
+                self.dropped += 1
+            client.queue.put_nowait(message)
+
+    def get_stats(self) -> dict:
+
+        return {
+            'running': self.running,
+            'port': self.port,
+            'clients': len(self.clients),
+            'max_imu_rate': round(self.max_imu_rate, 1),
+            'published': self.published,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,182 @@
+"""Monotonic deadline scheduler for periodic jobs.
+
+Each job keeps an absolute deadline on ``time.monotonic()`` that advances by
+exactly its interval, so cadence does not drift with callback runtime or
+wall-clock (NTP) jumps. The thread sleeps until the earliest deadline. A
+job that falls more than one interval behind is counted as an overrun and
+realigned to the next future tick instead of firing a burst of catch-up
+calls.
+"""
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Job:
+
+    def __init__(self, name: str, interval: float, callback: Callable[[], None]):
+
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.deadline = 0.0
+        self.generation = 0
+
+        self.runs = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.errors = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self.total_runtime = 0.0
+        self.max_runtime = 0.0
+
+    def get_stats(self) -> dict:
+
+        runs = self.runs or 1
+        return {
+            'interval_ms': round(self.interval * 1000, 3),
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'missed_ticks': self.missed_ticks,
+            'errors': self.errors,
+            'avg_lateness_ms': round(self.total_lateness / runs * 1000, 3),
+            'max_lateness_ms': round(self.max_lateness * 1000, 3),
+            'avg_runtime_ms': round(self.total_runtime / runs * 1000, 3),
+            'max_runtime_ms': round(self.max_runtime * 1000, 3)
+        }
+
+class DeadlineScheduler:
+    """Runs registered jobs on one thread at their own fixed rates"""
+
+    def __init__(self, name: str = "scheduler"):
+
+        self.name = name
+        self.jobs: Dict[str, Job] = {}
+        self._queue: List[Tuple[float, int, int, Job]] = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def _push(self, job: Job):
+
+        self._sequence += 1
+        heapq.heappush(self._queue, (job.deadline, self._sequence, job.generation, job))
+
+    def add_job(self, name: str, interval: float, callback: Callable[[], None],
+                delay: float = 0.0) -> Job:
+        """Run ``callback`` every ``interval`` seconds, first after ``delay``"""
+        if interval <= 0:
+            raise ValueError("Job interval must be positive")
+        with self._condition:
+            if name in self.jobs:
+                raise ValueError(f"Job '{name}' already scheduled")
+            job = Job(name, interval, callback)
+            job.deadline = time.monotonic() + delay
+            self.jobs[name] = job
+            self._push(job)
+            self._condition.notify()
+        return job
+
+    def remove_job(self, name: str):
+
+        with self._condition:
+            job = self.jobs.pop(name, None)
+            if job:
+                # Stale heap entries are skipped by generation
+                job.generation += 1
+
+    def set_interval(self, name: str, interval: float):
+        """Change a job's rate; the new cadence starts from now"""
+        if interval <= 0:
+            raise ValueError("Job interval must be positive")
+        with self._condition:
+            job = self.jobs[name]
+            job.interval = interval
+            job.generation += 1
+            job.deadline = time.monotonic() + interval
+            self._push(job)
+            self._condition.notify()
+
+    def start(self):
+
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _next_due(self) -> Optional[Tuple[Job, int]]:
+        """Wait for the earliest live deadline; returns None once stopped"""
+        with self._condition:
+            while self.running:
+                while self._queue and self._queue[0][3].generation != self._queue[0][2]:
+                    heapq.heappop(self._queue)
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+
+                deadline, _, generation, job = self._queue[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                heapq.heappop(self._queue)
+                return job, generation
+        return None
+
+    def _run(self):
+
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            job, generation = due
+
+            started = time.monotonic()
+            lateness = started - job.deadline
+            try:
+                job.callback()
+            except Exception as e:
+                job.errors += 1
+                logger.error(f"❌ Scheduled job '{job.name}' failed: {e}")
+            finished = time.monotonic()
+
+            job.runs += 1
+            job.total_lateness += lateness
+            job.max_lateness = max(job.max_lateness, lateness)
+            runtime = finished - started
+            job.total_runtime += runtime
+            job.max_runtime = max(job.max_runtime, runtime)
+
+            with self._condition:
+                if self.jobs.get(job.name) is not job or job.generation != generation:
+                    # Removed or rescheduled by set_interval while it ran
+                    continue
+                job.deadline += job.interval
+                if job.deadline <= finished:
+                    # Skip the ticks we can no longer make rather than bursting to catch up
+                    missed = int((finished - job.deadline) / job.interval) + 1
+                    job.deadline += missed * job.interval
+                    job.missed_ticks += missed
+                    job.overruns += 1
+                    logger.debug(f"Job '{job.name}' fell behind, skipped {missed} tick(s)")
+                self._push(job)
+
+    def get_stats(self) -> dict:
+
+        with self._condition:
+            return {name: job.get_stats() for name, job in self.jobs.items()}
@@ -0,0 +1,159 @@
+"""Simulated cameras: a cv2.VideoCapture stand-in and the frame sources behind it.
+
+A source is either ``pattern`` (a deterministic moving figure on a static
+background, with the frame number stamped in) or a path to a video or image
+file that is looped. Frames are delivered at the configured frame rate.
+"""
+import logging
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from config import HardwareConfig
+
+logger = logging.getLogger(__name__)
+
+class PatternSource:
+    """Deterministic synthetic scene with a person-sized figure walking across it"""
+
+    def __init__(self, width: int, height: int):
+
+        self.width = width
+        self.height = height
+        y = np.linspace(60, 140, height, dtype=np.float32)[:, None]
+        x = np.linspace(0, 40, width, dtype=np.float32)[None, :]
+        gradient = (y + x).astype(np.uint8)
+        self.background = cv2.merge([gradient, gradient + 10, gradient + 20])
+
+    def render(self, index: int, out: np.ndarray):
+
+        np.copyto(out, self.background)
+        figure_w = max(8, self.width // 8)
+        figure_h = max(16, self.height // 2)
+        span = self.width + figure_w
+        x = (index * 4) % span - figure_w
+        y = self.height - figure_h - self.height // 10
+        cv2.rectangle(out, (x, y + figure_h // 5), (x + figure_w, y + figure_h), (40, 60, 200), -1)
+        cv2.circle(out, (x + figure_w // 2, y + figure_h // 10), max(3, figure_w // 3), (80, 120, 220), -1)
+        cv2.putText(out, f"SIM {index}", (4, 14), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+
+class FileSource:
+    """Loops a video file, or repeats a single image"""
+
+    def __init__(self, path: str, width: int, height: int):
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.image = cv2.imread(path) if not path.lower().endswith(('.mp4', '.avi', '.mjpeg', '.mkv', '.mov')) else None
+        self.video = None if self.image is not None else cv2.VideoCapture(path)
+        if self.image is None and not self.video.isOpened():
+            raise ValueError(f"Cannot open simulated camera source {path}")
+        self._frame = None
+
+    def render(self, index: int, out: np.ndarray):
+
+        if self.image is not None:
+            frame = self.image
+        else:
+            ok, self._frame = self.video.read(self._frame)
+            if not ok:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, self._frame = self.video.read(self._frame)
+            frame = self._frame
+
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            cv2.resize(frame, (self.width, self.height), dst=out)
+        else:
+            np.copyto(out, frame)
+
+    def release(self):
+
+        if self.video is not None:
+            self.video.release()
+
+def create_frame_source(width: int, height: int, spec: str = HardwareConfig.SIM_CAMERA_SOURCE):
+
+    if spec == 'pattern':
+        return PatternSource(width, height)
+    return FileSource(spec, width, height)
+
+class SimVideoCapture:
+    """The subset of cv2.VideoCapture used by the camera code, paced like a real device"""
+
+    def __init__(self, device_id, api_preference: Optional[int] = None,
+                 source: str = HardwareConfig.SIM_CAMERA_SOURCE):
+
+        self.device_id = device_id
+        self.source_spec = source
+        self.props = {
+            cv2.CAP_PROP_FRAME_WIDTH: 640.0,
+            cv2.CAP_PROP_FRAME_HEIGHT: 480.0,
+            cv2.CAP_PROP_FPS: float(HardwareConfig.SIM_CAMERA_FPS),
+            cv2.CAP_PROP_BUFFERSIZE: 4.0
+        }
+        self.opened = device_id in HardwareConfig.SIM_CAMERA_DEVICES
+        self.source = None
+        self.frame_index = 0
+        self.next_frame_time = 0.0
+
+    def isOpened(self) -> bool:
+
+        return self.opened
+
+    def set(self, prop_id: int, value: float) -> bool:
+
+        if not self.opened:
+            return False
+        self.props[prop_id] = float(value)
+        if prop_id in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            self.source = None
+        return True
+
+    def get(self, prop_id: int) -> float:
+
+        return self.props.get(prop_id, 0.0)
+
+    def grab(self) -> bool:
+
+        if not self.opened:
+            return False
+        # Frames arrive at the configured rate; a caller that falls behind gets the newest one
+        now = time.monotonic()
+        if self.next_frame_time > now:
+            time.sleep(self.next_frame_time - now)
+            now = self.next_frame_time
+        fps = self.props[cv2.CAP_PROP_FPS] or HardwareConfig.SIM_CAMERA_FPS
+        self.next_frame_time = max(self.next_frame_time + 1.0 / fps, now)
+        self.frame_index += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None, flag: int = 0):
+
+        if not self.opened:
+            return False, None
+
+        width = int(self.props[cv2.CAP_PROP_FRAME_WIDTH])
+        height = int(self.props[cv2.CAP_PROP_FRAME_HEIGHT])
+        if self.source is None:
+            self.source = create_frame_source(width, height, self.source_spec)
+        if image is None or image.shape != (height, width, 3):
+            image = np.empty((height, width, 3), dtype=np.uint8)
+
+        self.source.render(self.frame_index, image)
+        return True, image
+
+    def read(self, image: Optional[np.ndarray] = None):
+
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+
+        if isinstance(self.source, FileSource):
+            self.source.release()
+        self.source = None
+        self.opened = False
@@ -0,0 +1,107 @@
+"""In-memory stand-in for the RPi.GPIO module API used by the servers."""
+import threading
+from typing import Dict
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+
+_lock = threading.Lock()
+_mode = None
+pin_modes: Dict[int, int] = {}
+pin_states: Dict[int, int] = {}
+pwm_channels: Dict[int, 'PWM'] = {}
+output_writes = 0
+
+def setmode(mode):
+
+    global _mode
+    _mode = mode
+
+def getmode():
+
+    return _mode
+
+def setwarnings(flag):
+
+    pass
+
+def setup(channel, direction, pull_up_down=PUD_OFF, initial=LOW):
+
+    with _lock:
+        pin_modes[channel] = direction
+        pin_states[channel] = HIGH if pull_up_down == PUD_UP else initial
+
+def output(channel, state):
+
+    global output_writes
+    with _lock:
+        if pin_modes.get(channel) != OUT:
+            raise RuntimeError(f"GPIO {channel} has not been set up as an OUTPUT")
+        pin_states[channel] = HIGH if state else LOW
+        output_writes += 1
+
+def input(channel):
+
+    with _lock:
+        return pin_states.get(channel, LOW)
+
+def cleanup(channel=None):
+
+    with _lock:
+        channels = [channel] if channel is not None else list(pin_modes)
+        for pin in channels:
+            pin_modes.pop(pin, None)
+            pin_states.pop(pin, None)
+            pwm_channels.pop(pin, None)
+
+class PWM:
+
+    def __init__(self, channel, frequency):
+
+        if pin_modes.get(channel) != OUT:
+            raise RuntimeError(f"GPIO {channel} has not been set up as an OUTPUT")
+        self.channel = channel
+        self.frequency = frequency
+        self.duty_cycle = 0.0
+        self.running = False
+        self.changes = 0
+        pwm_channels[channel] = self
+
+    def start(self, duty_cycle):
+
+        self.duty_cycle = duty_cycle
+        self.running = True
+
+    def ChangeDutyCycle(self, duty_cycle):
+
+        if not 0.0 <= duty_cycle <= 100.0:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+        self.duty_cycle = duty_cycle
+        self.changes += 1
+
+    def ChangeFrequency(self, frequency):
+
+        self.frequency = frequency
+        self.changes += 1
+
+    def stop(self):
+
+        self.running = False
+
+def get_state() -> dict:
+    """Snapshot of every configured pin, for tests and /status debugging"""
+    with _lock:
+        return {
+            'mode': _mode,
+            'pins': dict(pin_states),
+            'pwm': {pin: {'frequency': pwm.frequency, 'duty_cycle': pwm.duty_cycle, 'running': pwm.running}
+                    for pin, pwm in pwm_channels.items()},
+            'output_writes': output_writes
+        }
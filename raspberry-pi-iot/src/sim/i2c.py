@@ -0,0 +1,376 @@
+"""Simulated I2C bus exposing the smbus2 API, with a scripted MPU on it.
+
+``SMBus`` routes transactions to devices registered by address. The
+default bus carries a ``SimMPU`` whose register map, full-scale settings,
+sample-rate divider and FIFO behave like an MPU6050/MPU9250, with sensor
+values taken from a motion source (see ``src.sim.motion``) at the
+configured sample rate. An MPU9250 also carries a ``SimAK8963``, reachable
+at its own address in bypass mode or through the I2C master's SLV0 slot.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import HardwareConfig
+from src.sim.motion import create_motion_source
+
+logger = logging.getLogger(__name__)
+
+I2C_M_RD = 0x0001
+
+SMPLRT_DIV = 0x19
+CONFIG = 0x1A
+GYRO_CONFIG = 0x1B
+ACCEL_CONFIG = 0x1C
+FIFO_EN = 0x23
+I2C_SLV0_ADDR = 0x25
+I2C_SLV0_REG = 0x26
+I2C_SLV0_CTRL = 0x27
+INT_PIN_CFG = 0x37
+INT_STATUS = 0x3A
+ACCEL_XOUT_H = 0x3B
+SENSOR_BLOCK_END = 0x49
+EXT_SENS_DATA_00 = 0x49
+EXT_SENS_DATA_END = 0x61
+USER_CTRL = 0x6A
+PWR_MGMT_1 = 0x6B
+FIFO_COUNTH = 0x72
+FIFO_COUNTL = 0x73
+FIFO_R_W = 0x74
+WHO_AM_I = 0x75
+
+ACCEL_LSB = (16384.0, 8192.0, 4096.0, 2048.0)
+GYRO_LSB = (131.0, 65.5, 32.8, 16.4)
+TEMP_LSB = 333.87
+TEMP_OFFSET = 21.0
+FIFO_SIZE = 512
+RECORD_BYTES = 14
+
+MAG_ADDRESS = 0x0C
+MAG_WIA = 0x00
+MAG_ST1 = 0x02
+MAG_HXL = 0x03
+MAG_ST2 = 0x09
+MAG_CNTL1 = 0x0A
+MAG_ASAX = 0x10
+MAG_LSB = (0.6, 0.15)
+MAG_ASA = (0xB0, 0xB3, 0xA6)
+MAG_RATES = {0x02: 8.0, 0x06: 100.0}
+# Earth field on the accel axes with the device level and X pointing north,
+# plus the board's hard-iron offset, in uT
+EARTH_FIELD = (20.0, 0.0, -42.0)
+HARD_IRON = (12.0, -7.0, 4.0)
+MAG_NOISE = 0.3
+MPU9250_IDS = (0x71, 0x73)
+
+class i2c_msg:
+    """Minimal smbus2.i2c_msg replacement for combined transactions"""
+
+    def __init__(self, addr: int, flags: int, data: bytearray):
+
+        self.addr = addr
+        self.flags = flags
+        self.buf = data
+        self.len = len(data)
+
+    @staticmethod
+    def write(address: int, buf) -> 'i2c_msg':
+
+        if isinstance(buf, str):
+            buf = buf.encode()
+        return i2c_msg(address, 0, bytearray(buf))
+
+    @staticmethod
+    def read(address: int, length: int) -> 'i2c_msg':
+
+        return i2c_msg(address, I2C_M_RD, bytearray(length))
+
+    def __iter__(self):
+
+        return iter(self.buf)
+
+    def __len__(self) -> int:
+
+        return self.len
+
+    def __bytes__(self) -> bytes:
+
+        return bytes(self.buf)
+
+class SimAK8963:
+    """AK8963 magnetometer model: fuse ROM, measurement modes and ST2 latching"""
+
+    def __init__(self, seed: int = HardwareConfig.SIM_SEED):
+
+        self.host: Optional['SimMPU'] = None
+        self._noise = np.random.default_rng(seed + 1).standard_normal((1024, 3)) * MAG_NOISE
+        self._reset()
+
+    def _reset(self):
+
+        self.registers = bytearray(0x13)
+        self.registers[MAG_WIA] = 0x48
+        self.epoch = time.monotonic()
+        self.latched = -1
+
+    def _measure(self):
+
+        mode = self.registers[MAG_CNTL1] & 0x0F
+        rate = MAG_RATES.get(mode)
+        if rate is None:
+            return
+        index = int((time.monotonic() - self.epoch) * rate)
+        if index == self.latched:
+            return
+
+        # Readings are reported before the fuse-ROM sensitivity adjustment
+        lsb = MAG_LSB[(self.registers[MAG_CNTL1] >> 4) & 0x01]
+        asa = (np.array(MAG_ASA) - 128.0) / 256.0 + 1.0
+        field = np.array(EARTH_FIELD) + HARD_IRON + self._noise[index % len(self._noise)]
+        # Accel-frame field back onto the AK8963 axes (X/Y swapped, Z inverted)
+        hx, hy, hz = field[1], field[0], -field[2]
+        raw = np.clip(np.rint(np.array([hx, hy, hz]) / (lsb * asa)), -32760, 32760)
+        self.registers[MAG_HXL:MAG_ST2] = raw.astype('<i2').tobytes()
+        self.registers[MAG_ST1] = 0x01
+        self.registers[MAG_ST2] = (self.registers[MAG_CNTL1] & 0x10)
+        self.latched = index
+
+    def read(self, register: int, length: int) -> bytes:
+
+        if self.host and not self.host.registers[INT_PIN_CFG] & 0x02:
+            raise OSError(121, "Remote I/O error")
+        return self.read_registers(register, length)
+
+    def read_registers(self, register: int, length: int) -> bytes:
+        """Register read as seen by the MPU's I2C master (no bypass check)"""
+        if MAG_ASAX <= register < MAG_ASAX + 3 and self.registers[MAG_CNTL1] & 0x0F != 0x0F:
+            return bytes(length)
+        self._measure()
+        self.registers[MAG_ASAX:MAG_ASAX + 3] = bytes(MAG_ASA)
+        data = bytes(self.registers[register:register + length]).ljust(length, b'\x00')
+        if register <= MAG_ST2 < register + length:
+            # Reading ST2 releases the data registers for the next measurement
+            self.registers[MAG_ST1] = 0
+        return data
+
+    def write(self, register: int, data: bytes):
+
+        if self.host and not self.host.registers[INT_PIN_CFG] & 0x02:
+            raise OSError(121, "Remote I/O error")
+        for offset, value in enumerate(data):
+            reg = register + offset
+            if reg == MAG_CNTL1:
+                self.registers[reg] = value
+                self.latched = -1
+
+class SimMPU:
+    """Register-level MPU6050/MPU9250 model driven by a motion source"""
+
+    def __init__(self, motion=None, who_am_i: int = HardwareConfig.SIM_IMU_WHO_AM_I,
+                 magnetometer: Optional[SimAK8963] = None):
+
+        self.motion = motion or create_motion_source()
+        self.who_am_i = who_am_i
+        self.magnetometer = magnetometer
+        if magnetometer:
+            magnetometer.host = self
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self._reset()
+
+    def _reset(self):
+
+        self.registers = bytearray(128)
+        self.registers[WHO_AM_I] = self.who_am_i
+        self.registers[PWR_MGMT_1] = 0x40
+        self.fifo = bytearray()
+        self.epoch = time.monotonic()
+        self.fifo_index = 0
+
+    @property
+    def sample_rate(self) -> float:
+
+        dlpf = self.registers[CONFIG] & 0x07
+        base = 8000.0 if dlpf in (0, 7) else 1000.0
+        return base / (1 + self.registers[SMPLRT_DIV])
+
+    def _sample_index(self) -> int:
+
+        return int((time.monotonic() - self.epoch) * self.sample_rate)
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+
+        accel_lsb = ACCEL_LSB[(self.registers[ACCEL_CONFIG] >> 3) & 0x03]
+        gyro_lsb = GYRO_LSB[(self.registers[GYRO_CONFIG] >> 3) & 0x03]
+        scale = np.array([accel_lsb] * 3 + [TEMP_LSB] + [gyro_lsb] * 3)
+        offset = np.array([0.0, 0.0, 0.0, -TEMP_OFFSET * TEMP_LSB, 0.0, 0.0, 0.0])
+        raw = np.clip(np.rint(samples * scale + offset), -32768, 32767)
+        return raw.astype('>i2').tobytes()
+
+    def _read_slave(self):
+
+        # The I2C master mirrors SLV0's register block into EXT_SENS_DATA
+        if (not self.magnetometer or not self.registers[USER_CTRL] & 0x20 or
+                not self.registers[I2C_SLV0_CTRL] & 0x80 or
+                self.registers[I2C_SLV0_ADDR] != 0x80 | MAG_ADDRESS):
+            return
+        length = self.registers[I2C_SLV0_CTRL] & 0x0F
+        data = self.magnetometer.read_registers(self.registers[I2C_SLV0_REG], length)
+        self.registers[EXT_SENS_DATA_00:EXT_SENS_DATA_00 + length] = data
+
+    def _fill_fifo(self):
+
+        if not self.registers[USER_CTRL] & 0x40 or not self.registers[FIFO_EN]:
+            self.fifo_index = self._sample_index()
+            return
+
+        target = self._sample_index()
+        count = target - self.fifo_index
+        if count <= 0:
+            return
+
+        # Older samples would only be overwritten again
+        count = min(count, FIFO_SIZE // RECORD_BYTES + 1)
+        self.fifo += self._encode(self.motion.samples(target - count, count, self.sample_rate))
+        if len(self.fifo) > FIFO_SIZE:
+            # Like the real part, the FIFO drops its oldest bytes (breaking record
+            # alignment) and raises FIFO_OFLOW_INT
+            del self.fifo[:len(self.fifo) - FIFO_SIZE]
+            self.registers[INT_STATUS] |= 0x10
+        self.fifo_index = target
+
+    def read(self, register: int, length: int) -> bytes:
+
+        with self._lock:
+            self.reads += 1
+            if register == FIFO_R_W:
+                self._fill_fifo()
+                data = bytes(self.fifo[:length])
+                del self.fifo[:length]
+                return data.ljust(length, b'\x00')
+
+            if register in (FIFO_COUNTH, FIFO_COUNTL, INT_STATUS):
+                self._fill_fifo()
+                count = len(self.fifo)
+                self.registers[FIFO_COUNTH] = count >> 8
+                self.registers[FIFO_COUNTL] = count & 0xFF
+
+            if register < SENSOR_BLOCK_END and register + length > ACCEL_XOUT_H:
+                block = self._encode(self.motion.samples(self._sample_index(), 1, self.sample_rate))
+                self.registers[ACCEL_XOUT_H:SENSOR_BLOCK_END] = block
+            if register < EXT_SENS_DATA_END and register + length > EXT_SENS_DATA_00:
+                self._read_slave()
+
+            data = bytes(self.registers[register:register + length])
+
+            if register <= INT_STATUS < register + length:
+                # INT_STATUS clears on read
+                self.registers[INT_STATUS] = 0
+            return data
+
+    def write(self, register: int, data: bytes):
+
+        with self._lock:
+            self.writes += 1
+            for offset, value in enumerate(data):
+                reg = register + offset
+                if reg == PWR_MGMT_1 and value & 0x80:
+                    self._reset()
+                    continue
+                if reg == USER_CTRL and value & 0x04:
+                    self.fifo.clear()
+                    self.fifo_index = self._sample_index()
+                    value &= ~0x04
+                if reg == FIFO_R_W or reg in (WHO_AM_I, INT_STATUS):
+                    continue
+                self.registers[reg] = value
+
+_devices_lock = threading.Lock()
+_devices: Dict[int, Dict[int, object]] = {}
+
+def get_bus_devices(bus: int) -> Dict[int, object]:
+    """Devices on simulated bus ``bus``; the IMU is created on first use"""
+    with _devices_lock:
+        if bus not in _devices:
+            magnetometer = SimAK8963() if HardwareConfig.SIM_IMU_WHO_AM_I in MPU9250_IDS else None
+            _devices[bus] = {HardwareConfig.SIM_IMU_ADDRESS: SimMPU(magnetometer=magnetometer)}
+            if magnetometer:
+                _devices[bus][MAG_ADDRESS] = magnetometer
+        return _devices[bus]
+
+def register_device(bus: int, address: int, device):
+
+    get_bus_devices(bus)[address] = device
+
+class SMBus:
+
+    def __init__(self, bus: Optional[int] = None, force: bool = False):
+
+        self.bus = bus
+        self.devices = get_bus_devices(bus) if bus is not None else {}
+        self.fd = 1 if bus is not None else None
+
+    def open(self, bus: int):
+
+        self.bus = bus
+        self.devices = get_bus_devices(bus)
+        self.fd = 1
+
+    def close(self):
+
+        self.fd = None
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+
+        self.close()
+
+    def _device(self, address: int):
+
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(121, "Remote I/O error")
+        return device
+
+    def read_byte_data(self, i2c_addr: int, register: int, force=None) -> int:
+
+        return self._device(i2c_addr).read(register, 1)[0]
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force=None):
+
+        self._device(i2c_addr).write(register, bytes([value & 0xFF]))
+
+    def read_word_data(self, i2c_addr: int, register: int, force=None) -> int:
+
+        low, high = self._device(i2c_addr).read(register, 2)
+        return low | (high << 8)
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force=None) -> List[int]:
+
+        return list(self._device(i2c_addr).read(register, length))
+
+    def write_i2c_block_data(self, i2c_addr: int, register: int, data: List[int], force=None):
+
+        self._device(i2c_addr).write(register, bytes(data))
+
+    def i2c_rdwr(self, *i2c_msgs):
+
+        pointer = {}
+        for msg in i2c_msgs:
+            device = self._device(msg.addr)
+            if msg.flags & I2C_M_RD:
+                register = pointer.get(msg.addr, 0)
+                msg.buf[:] = device.read(register, msg.len)
+                if register != FIFO_R_W:
+                    pointer[msg.addr] = register + msg.len
+            elif msg.len:
+                pointer[msg.addr] = msg.buf[0]
+                if msg.len > 1:
+                    device.write(msg.buf[0], bytes(msg.buf[1:]))
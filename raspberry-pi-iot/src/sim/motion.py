@@ -0,0 +1,117 @@
+"""Deterministic motion sources feeding the simulated IMU.
+
+Every source returns samples in register order - accel XYZ (g), temperature
+(°C), gyro XYZ (dps) - for an absolute sample index, so the same index
+always produces the same values no matter how the reads are batched.
+"""
+import csv
+import logging
+import math
+
+import numpy as np
+
+from config import HardwareConfig
+
+logger = logging.getLogger(__name__)
+
+RECORD_FIELDS = ('ax', 'ay', 'az', 'temp', 'gx', 'gy', 'gz')
+NOISE_TABLE_SIZE = 4096
+ACCEL_NOISE = 0.01
+GYRO_NOISE = 0.3
+ROOM_TEMPERATURE = 25.0
+
+# Timeline of the synthetic fall, in seconds within each cycle
+FALL_CYCLE = 20.0
+FALL_START = 10.0
+FREE_FALL_END = 10.35
+IMPACT_END = 10.4
+SETTLE_END = 10.8
+
+class PatternMotion:
+    """Synthetic motion: ``idle``, ``walk`` or a repeating ``fall`` scenario"""
+
+    PATTERNS = ('idle', 'walk', 'fall')
+
+    def __init__(self, pattern: str = 'idle', seed: int = HardwareConfig.SIM_SEED):
+
+        if pattern not in self.PATTERNS:
+            raise ValueError(f"Unknown motion pattern '{pattern}'")
+        self.pattern = pattern
+        rng = np.random.default_rng(seed)
+        self._noise = rng.standard_normal((NOISE_TABLE_SIZE, 7))
+        self._noise_scale = np.array([ACCEL_NOISE] * 3 + [0.05] + [GYRO_NOISE] * 3)
+
+    def samples(self, start: int, count: int, rate: float) -> np.ndarray:
+
+        index = np.arange(start, start + count)
+        t = index / rate
+        out = self._noise[index % NOISE_TABLE_SIZE] * self._noise_scale
+        out[:, 2] += 1.0
+        out[:, 3] += ROOM_TEMPERATURE
+
+        if self.pattern == 'walk':
+            step = 2 * math.pi * 1.8 * t
+            sway = 2 * math.pi * 0.9 * t
+            out[:, 0] += 0.1 * np.sin(sway)
+            out[:, 2] += 0.25 * np.sin(step)
+            out[:, 4] += 8.0 * np.sin(step)
+            out[:, 5] += 15.0 * np.sin(sway)
+
+        elif self.pattern == 'fall':
+            phase = t % FALL_CYCLE
+            free_fall = (phase >= FALL_START) & (phase < FREE_FALL_END)
+            impact = (phase >= FREE_FALL_END) & (phase < IMPACT_END)
+            settle = (phase >= IMPACT_END) & (phase < SETTLE_END)
+            lying = phase >= IMPACT_END
+
+            out[free_fall, 2] -= 0.9
+            out[free_fall, 4] += 200.0
+            out[impact, 0] += 3.5
+            out[impact, 2] += 1.0
+            # Lying on the side: gravity moves from Z to X
+            out[lying, 2] -= 1.0
+            out[lying, 0] += 1.0
+            bounce = np.exp(-(phase[settle] - IMPACT_END) * 12.0) * np.sin((phase[settle] - IMPACT_END) * 60.0)
+            out[settle, 0] += 0.8 * bounce
+            out[settle, 5] += 90.0 * bounce
+
+        return out
+
+class RecordedMotion:
+    """Plays back a recording in a loop, one row per sample.
+
+    Accepts a ``.npy`` array with 6 (accel, gyro) or 7 (register order)
+    columns, or a CSV file with ax/ay/az/gx/gy/gz[/temp] header columns.
+    Rows are played at the device's configured sample rate.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        if path.endswith('.npy'):
+            data = np.load(path).astype(np.float64)
+            if data.ndim != 2 or data.shape[1] not in (6, 7):
+                raise ValueError(f"{path}: expected an (N, 6) or (N, 7) array")
+            if data.shape[1] == 6:
+                data = np.insert(data, 3, ROOM_TEMPERATURE, axis=1)
+        else:
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            data = np.array([[float(row.get(field) or (ROOM_TEMPERATURE if field == 'temp' else 0.0))
+                              for field in RECORD_FIELDS] for row in rows])
+
+        if len(data) == 0:
+            raise ValueError(f"{path}: recording is empty")
+        self.data = data
+        logger.info(f"🎞️ Loaded {len(data)} recorded IMU samples from {path}")
+
+    def samples(self, start: int, count: int, rate: float) -> np.ndarray:
+
+        index = np.arange(start, start + count) % len(self.data)
+        return self.data[index]
+
+def create_motion_source(spec: str = HardwareConfig.SIM_IMU_SOURCE):
+    """Pattern name or path to a recording"""
+    if spec in PatternMotion.PATTERNS:
+        return PatternMotion(spec)
+    return RecordedMotion(spec)
@@ -0,0 +1,54 @@
+"""Simulated ``rpicam-vid --codec mjpeg --output -``: writes JPEG frames to stdout.
+
+Accepts the options RpicamMJPEGPipe passes (width, height, quality,
+framerate) and ignores the rest, so the CSI pipeline can run unchanged.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import cv2
+
+from config import HardwareConfig
+from src.sim.camera import SimVideoCapture
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Simulated rpicam-vid MJPEG output")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--quality', type=int, default=80)
+    parser.add_argument('--framerate', type=float, default=HardwareConfig.SIM_CAMERA_FPS)
+    parser.add_argument('--list-cameras', action='store_true')
+    args, _ = parser.parse_known_args()
+
+    if args.list_cameras:
+        print("Available cameras\n-----------------\n0 : imx219 [3280x2464 10-bit RGGB] (simulated)")
+        return
+
+    capture = SimVideoCapture(0)
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
+    capture.set(cv2.CAP_PROP_FPS, args.framerate)
+    encode_params = [cv2.IMWRITE_JPEG_QUALITY, args.quality]
+    stdout = sys.stdout.buffer
+    frame = None
+
+    try:
+        while True:
+            ok, frame = capture.read(frame)
+            if not ok:
+                break
+            ok, buffer = cv2.imencode('.jpg', frame, encode_params)
+            if ok:
+                stdout.write(buffer.tobytes())
+                stdout.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        capture.release()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests run against the simulated peripherals and import modules from the project root
+os.environ.setdefault("GUARDIT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Interactive script for the real board, not a pytest module
+collect_ignore = ["test_hardware.py"]
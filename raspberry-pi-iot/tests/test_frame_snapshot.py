@@ -0,0 +1,44 @@
+import numpy as np
+from flask import Flask
+
+import imu_wifi_server
+from src.frame_ring import FrameRing
+
+class RacingCamera:
+    """Publishes a newer frame right after handing out the latest snapshot"""
+
+    def __init__(self):
+
+        self.ring = FrameRing(4)
+        self.frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        self.ring.publish(self.frame)
+
+    def get_usb_capture(self):
+
+        snapshot = self.ring.latest()
+        self.ring.publish(self.frame)
+        return snapshot
+
+    def get_frame_ring(self, camera):
+
+        return self.ring
+
+def _snapshot(query: str):
+
+    server = imu_wifi_server.GuardItIMUServer.__new__(imu_wifi_server.GuardItIMUServer)
+    server.camera = RacingCamera()
+    server.boot_id = 'test'
+    with Flask(__name__).test_request_context(query):
+        return server.get_frame_snapshot('usb')
+
+def test_frame_published_after_snapshot_is_not_304():
+
+    snapshot, not_modified = _snapshot('/camera/usb/frame?since=1')
+    assert not not_modified
+    assert snapshot.seq == 2
+
+def test_no_newer_frame_is_304():
+
+    snapshot, not_modified = _snapshot('/camera/usb/frame?since=2')
+    assert not_modified
+    assert snapshot.seq == 2
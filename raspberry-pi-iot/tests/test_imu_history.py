@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+
+from src.imu_decoder import IMUDecoder, SAMPLE_BYTES
+from src.imu_history import IMUHistory
+
+SAMPLE_RATE = 500.0
+
+def _fill(history: IMUHistory, batches: int, seed: int = 0) -> int:
+    """Append jittery FIFO-sized batches, a FIFO resync and some single polled samples"""
+    rng = np.random.default_rng(seed)
+    decoder = IMUDecoder(8, 250, chip='mpu6050')
+    interval = 1.0 / SAMPLE_RATE
+    end_time = 1792190000.123
+    appended = 0
+    for index in range(batches):
+        n = int(rng.integers(1, 12))
+        end_time += n * interval + rng.normal(0.0, 0.004)
+        history.append(decoder.decode(rng.bytes(n * SAMPLE_BYTES)), end_time, interval)
+        appended += n
+        if index == batches // 2:
+            history.resync()
+    for _ in range(5):
+        end_time += 0.0001
+        history.append(decoder.decode(rng.bytes(SAMPLE_BYTES)), end_time)
+        appended += 1
+    return appended
+
+def _page(history: IMUHistory, limit: int, cursor) -> np.ndarray:
+    """Follow the cursor page by page the way a client of /imu/history would"""
+    pages = []
+    since = 0.0
+    while True:
+        timestamps = history.since(since, ('ax',), limit)['timestamps']
+        if len(timestamps) == 0:
+            return np.concatenate(pages)
+        pages.append(timestamps)
+        since = cursor(timestamps)
+
+def test_next_since_pages_every_sample_once():
+
+    history = IMUHistory(3000)
+    _fill(history, 1500)
+    stored = history.since(0.0, ('ax',), history.capacity)['timestamps']
+    assert len(stored) == history.count
+
+    # next_since as the handler builds it, and the last timestamp as a client sees it in JSON
+    cursors = (lambda ts: float(ts[-1]),
+               lambda ts: json.loads(json.dumps(np.round(ts, 3).tolist()))[-1])
+    for cursor in cursors:
+        for limit in (1, 7, 64):
+            paged = _page(history, limit, cursor)
+            assert len(paged) == len(stored)
+            assert np.array_equal(paged, stored)
+
+def test_timestamps_strictly_increase():
+
+    history = IMUHistory(10000)
+    appended = _fill(history, 800, seed=1)
+    timestamps = history.since(0.0, ('ax',), history.capacity)['timestamps']
+    assert len(timestamps) == appended
+    assert np.all(np.diff(timestamps) > 0)
@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+import pytest
+
+import imu_wifi_server
+from config import FallDetectorConfig, IMUHistoryConfig
+from src.fall_detector import FallDetector
+from src.imu_decoder import SAMPLE_BYTES
+from src.imu_history import IMUHistory
+from src.imu_recorder import IMURecorder, IMURecording, list_recordings
+from src.push_channel import PushChannel
+from src.scheduler import DeadlineScheduler
+
+@pytest.fixture
+def poll_server(tmp_path):
+    """The IMU side of a server polling the MPU, without GPIO, cameras or sockets"""
+    server = imu_wifi_server.GuardItIMUServer.__new__(imu_wifi_server.GuardItIMUServer)
+    server.fifo = None
+    server.imu_lock = threading.Lock()
+    server.scheduler = DeadlineScheduler("test-scheduler")
+    server.scheduler.add_job("imu", imu_wifi_server.DATA_INTERVAL / 1000, lambda: None)
+    server.push = PushChannel()
+
+    sample_rate = server.get_imu_sample_rate()
+    server.history = IMUHistory.for_rate(sample_rate)
+    server.fall_detector = FallDetector(sample_rate)
+    server.recorder = IMURecorder(sample_rate, imu_wifi_server.IMU_ACCEL_RANGE, imu_wifi_server.IMU_GYRO_RANGE,
+                                  'mpu6050', directory=str(tmp_path))
+    yield server
+    server.recorder.close()
+
+def _record(recorder: IMURecorder, samples: int, sample_rate: float, start: float) -> float:
+
+    for index in range(samples):
+        recorder.append(bytes(SAMPLE_BYTES), start + index / sample_rate)
+    return start + samples / sample_rate
+
+def test_poll_interval_change_updates_sample_rate(poll_server, tmp_path):
+
+    old_rate = 1000 / imu_wifi_server.DATA_INTERVAL
+    assert poll_server.get_imu_sample_rate() == pytest.approx(old_rate)
+    next_time = _record(poll_server.recorder, 20, old_rate, 1792190000.0)
+
+    result = poll_server.set_job_interval("imu", 20)
+    assert result["success"]
+    new_rate = 50.0
+    assert poll_server.get_imu_sample_rate() == pytest.approx(new_rate)
+
+    detector = poll_server.fall_detector
+    assert detector.sample_rate == pytest.approx(new_rate)
+    assert detector.pre_samples == round(FallDetectorConfig.IMPACT_WINDOW * new_rate)
+    assert detector.delay_samples == round(FallDetectorConfig.STILLNESS_DELAY * new_rate)
+    assert detector.still_samples == round(FallDetectorConfig.STILLNESS_DURATION * new_rate)
+    assert poll_server.history.capacity == int(new_rate * IMUHistoryConfig.DURATION)
+
+    # Samples at the new rate go to a new file whose header carries the new rate
+    _record(poll_server.recorder, 50, new_rate, next_time)
+    poll_server.recorder.close()
+    old_file, new_file = (IMURecording(path) for path in list_recordings(str(tmp_path)))
+    assert old_file.sample_rate == pytest.approx(old_rate)
+    assert new_file.sample_rate == pytest.approx(new_rate)
+    assert len(new_file) == 50
+    assert np.diff(new_file.timestamps) == pytest.approx(np.full(49, 1 / new_rate), abs=1e-6)
+
+def test_history_resize_keeps_newest_samples():
+
+    history = IMUHistory(100)
+    decoder = imu_wifi_server.IMUDecoder(8, 250, chip='mpu6050')
+    for index in range(150):
+        history.append(decoder.decode(bytes(SAMPLE_BYTES)), 1792190000.0 + index * 0.1)
+    before = history.since(0.0, ('ax',), 1000)['timestamps']
+
+    history.resize(40)
+    assert np.array_equal(history.since(0.0, ('ax',), 1000)['timestamps'], before[-40:])
+    history.resize(400)
+    assert np.array_equal(history.since(0.0, ('ax',), 1000)['timestamps'], before[-40:])
+    history.append(decoder.decode(bytes(SAMPLE_BYTES)), 1792190100.0)
+    assert history.count == 41